@@ -0,0 +1,262 @@
+"""Per-call latency of the scheduling agents in `src/agent`, over grids of
+the number of nodes and of `win_len`, reported as the median and p99 per
+call, and written to a JSON file that later runs can be compared against.
+
+Operations timed, with the windows of the learning agents full:
+- "node_id_to_assign": one decision.
+- "record_exp": recording the experience of the task, for the agents that
+  learn online.
+- "state_update": notifying the agent of a change at the assigned node,
+  for the agents that track the state of the nodes.
+
+Cases with more than `--max_num_exps` experiences in the windows are
+skipped, as filling the windows would take longer than timing them.
+
+Usage:
+    python benchmarks/bench_agents.py --output bench_agents.json
+    python benchmarks/bench_agents.py --output bench_agents.json --baseline benchmarks/baseline_agents.json --fail_on_regression
+"""
+import argparse
+import datetime
+import json
+import numpy
+import platform
+import sys
+import time
+
+from typing import Callable
+
+from src.agent import (
+    agent as agent_module,
+    exp as exp_module,
+    optimal as optimal_module,
+    random as random_module,
+    ts as ts_module,
+)
+from src.prob import random_variable
+from src.sim import heap_engine
+from src.sys import task as task_module
+
+from src.utils.debug import *
+
+
+NUM_NODES_LIST = [2, 10, 100, 1000, 10000]
+WIN_LEN_LIST = [10, 100, 1000, 10000]
+
+# (name, agent given node_list and win_len, whether the agent has a window)
+AGENT_LIST = [
+    ("Random", lambda node_list, win_len: random_module.AssignToRandom(node_list=node_list), False),
+    ("AssignToLeastWorkLeft", lambda node_list, win_len: optimal_module.AssignToLeastWorkLeft(node_list=node_list), False),
+    (
+        "AssignToNoisyLeastWorkLeft",
+        lambda node_list, win_len: optimal_module.AssignToNoisyLeastWorkLeft(
+            node_list=node_list,
+            noise_rv=random_variable.CustomDiscrete(value_list=[0.5, 0.75, 1, 1.25, 1.5], prob_weight_list=[1, 1, 1, 1, 1]),
+        ),
+        False,
+    ),
+    ("AssignToFewestTasksLeft", lambda node_list, win_len: optimal_module.AssignToFewestTasksLeft(node_list=node_list), False),
+    (
+        "TS-SlidingWin",
+        lambda node_list, win_len: ts_module.AssignWithThompsonSampling_slidingWin(node_list=node_list, win_len=win_len),
+        True,
+    ),
+    (
+        "TS-SlidingWinForEachNode",
+        lambda node_list, win_len: ts_module.AssignWithThompsonSampling_slidingWinForEachNode(node_list=node_list, win_len=win_len),
+        True,
+    ),
+    (
+        "TS-SlidingWinForEachNode-WaitTimesOnly",
+        lambda node_list, win_len: ts_module.AssignWithThompsonSampling_slidingWinForEachNode(
+            node_list=node_list, win_len=win_len, store_wait_times_only=True,
+        ),
+        True,
+    ),
+    (
+        "TS-ResetWinOnRareEvent",
+        lambda node_list, win_len: ts_module.AssignWithThompsonSampling_resetWinOnRareEvent(
+            node_list=node_list, win_len=win_len, threshold_prob_rare=0.9,
+        ),
+        True,
+    ),
+    (
+        "TS-SlidingWinForEachNode-PowerOf2",
+        lambda node_list, win_len: ts_module.AssignWithThompsonSampling_slidingWinForEachNode_powerOfD(
+            node_list=node_list, win_len=win_len, d=2,
+        ),
+        True,
+    ),
+]
+
+
+def is_per_node_win(sching_agent: agent_module.SchingAgent) -> bool:
+    return isinstance(sching_agent, ts_module.AssignWithThompsonSampling_slidingWinForEachNode)
+
+
+def bench_case(
+    get_sching_agent: Callable[[list[heap_engine.Server], int], agent_module.SchingAgent],
+    num_nodes: int,
+    win_len: int,
+    max_num_calls: int,
+    max_time_per_case: float,
+    rng: numpy.random.Generator,
+) -> dict[str, list[float]]:
+    """Returns the time in seconds of each call, for each operation."""
+    env = heap_engine.Environment()
+    server_list = [heap_engine.Server(env=env, _id=f"s{i}") for i in range(num_nodes)]
+    sching_agent = get_sching_agent(server_list, win_len)
+
+    # Some work at half of the nodes. The environment is never run, so the
+    # tasks stay where they are.
+    for i, server in enumerate(server_list[::2]):
+        server.put(task_module.Task(_id=-i - 1, service_time=float(rng.exponential()), arrival_time=0.0))
+
+    learns_online = isinstance(sching_agent, agent_module.SchingAgent_wOnlineLearning)
+    if learns_online:
+        num_exps = win_len * num_nodes if is_per_node_win(sching_agent) else win_len
+        for i in range(num_exps):
+            sching_agent.record_exp(
+                node_id=server_list[i % num_nodes]._id,
+                exp=exp_module.Exp(service_time=1.0, wait_time=float(rng.exponential())),
+            )
+
+    op_to_time_list_map = {"node_id_to_assign": []}
+    if learns_online:
+        op_to_time_list_map["record_exp"] = []
+    else:
+        op_to_time_list_map["state_update"] = []
+
+    node_id_to_server_map = {server._id: server for server in server_list}
+    wait_time_array = rng.exponential(size=max_num_calls)
+    perf_counter = time.perf_counter
+    start_time = perf_counter()
+    for i in range(max_num_calls):
+        t0 = perf_counter()
+        node_id = sching_agent.node_id_to_assign(time_epoch=float(i))
+        t1 = perf_counter()
+        op_to_time_list_map["node_id_to_assign"].append(t1 - t0)
+
+        if learns_online:
+            exp = exp_module.Exp(service_time=1.0, wait_time=float(wait_time_array[i]))
+            t0 = perf_counter()
+            sching_agent.record_exp(node_id=node_id, exp=exp)
+            op_to_time_list_map["record_exp"].append(perf_counter() - t0)
+        else:
+            server = node_id_to_server_map[node_id]
+            t0 = perf_counter()
+            server.notify_state_listeners()
+            op_to_time_list_map["state_update"].append(perf_counter() - t0)
+
+        if perf_counter() - start_time > max_time_per_case:
+            break
+
+    return op_to_time_list_map
+
+
+def run(max_num_calls: int, max_time_per_case: float, max_num_exps: int, agent_name_list: list[str] = None) -> list[dict]:
+    result_list = []
+    rng = numpy.random.default_rng(0)
+    for name, get_sching_agent, has_win in AGENT_LIST:
+        if agent_name_list and name not in agent_name_list:
+            continue
+
+        for num_nodes in NUM_NODES_LIST:
+            for win_len in WIN_LEN_LIST if has_win else [None]:
+                if has_win and win_len * num_nodes > max_num_exps:
+                    continue
+
+                op_to_time_list_map = bench_case(
+                    get_sching_agent=get_sching_agent,
+                    num_nodes=num_nodes,
+                    win_len=win_len,
+                    max_num_calls=max_num_calls,
+                    max_time_per_case=max_time_per_case,
+                    rng=rng,
+                )
+                for op, time_list in op_to_time_list_map.items():
+                    time_array = 1e6 * numpy.array(time_list)
+                    result = dict(
+                        agent=name,
+                        num_nodes=num_nodes,
+                        win_len=win_len,
+                        op=op,
+                        num_calls=len(time_list),
+                        median_us=float(numpy.median(time_array)),
+                        p99_us=float(numpy.quantile(time_array, 0.99)),
+                    )
+                    result_list.append(result)
+                    log(INFO, f"{name}: num_nodes= {num_nodes}, win_len= {win_len}, {op}: "
+                        f"median= {result['median_us']:.1f} us, p99= {result['p99_us']:.1f} us, num_calls= {result['num_calls']}")
+
+    return result_list
+
+
+def result_key(result: dict) -> tuple:
+    return (result["agent"], result["num_nodes"], result["win_len"], result["op"])
+
+
+def compare(result_list: list[dict], baseline_result_list: list[dict], threshold: float) -> list[dict]:
+    """Logs the ratio of each median to that in the baseline, and returns
+    the results whose median grew by more than `threshold` (relative).
+    """
+    key_to_baseline_result_map = {result_key(result): result for result in baseline_result_list}
+    regressed_result_list = []
+    for result in result_list:
+        baseline_result = key_to_baseline_result_map.get(result_key(result))
+        if baseline_result is None:
+            continue
+
+        ratio = result["median_us"] / baseline_result["median_us"]
+        log(INFO, f"{result['agent']}: num_nodes= {result['num_nodes']}, win_len= {result['win_len']}, {result['op']}: "
+            f"median= {result['median_us']:.1f} us vs {baseline_result['median_us']:.1f} us in baseline, ratio= {ratio:.2f}")
+        if ratio > 1 + threshold:
+            regressed_result_list.append(dict(result, baseline_median_us=baseline_result["median_us"], ratio=ratio))
+
+    return regressed_result_list
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the per-call latency of the scheduling agents.")
+    parser.add_argument("--output", default="bench_agents.json")
+    parser.add_argument("--baseline", help="JSON output of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative growth of a median that counts as a regression")
+    parser.add_argument("--fail_on_regression", action="store_true", help="Exit with 1 if a case regressed against the baseline")
+    parser.add_argument("--max_num_calls", type=int, default=2000)
+    parser.add_argument("--max_time_per_case", type=float, default=1.0, help="Seconds")
+    parser.add_argument("--max_num_exps", type=int, default=10**6)
+    parser.add_argument("--agent", action="append", help="Only the agents with this name (may be repeated)")
+    args = parser.parse_args()
+
+    result_list = run(
+        max_num_calls=args.max_num_calls,
+        max_time_per_case=args.max_time_per_case,
+        max_num_exps=args.max_num_exps,
+        agent_name_list=args.agent,
+    )
+    with open(args.output, "w") as f:
+        json.dump(
+            dict(
+                meta=dict(
+                    time=datetime.datetime.now().isoformat(timespec="seconds"),
+                    python=platform.python_version(),
+                    numpy=numpy.__version__,
+                    machine=platform.machine(),
+                    processor=platform.processor(),
+                ),
+                result_list=result_list,
+            ),
+            f,
+            indent=2,
+        )
+    log(INFO, f"Wrote {len(result_list)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_result_list = json.load(f)["result_list"]
+
+        regressed_result_list = compare(result_list, baseline_result_list, threshold=args.threshold)
+        if regressed_result_list:
+            log(WARNING, f"{len(regressed_result_list)} regressions", regressed_result_list=regressed_result_list)
+            if args.fail_on_regression:
+                sys.exit(1)
@@ -0,0 +1,84 @@
+"""Simpy events per second on the workload of
+`tests/test_optimal_vs_ts.py::test_optimal_vs_ts`: 2 servers, service time
+DiscreteUniform(1, 1), loads 0.1, 0.5 and 0.8, the agents Random,
+TS-ResetWinOnRareEvent and AssignToFewestTasksLeft, and 1000 tasks per
+run. The logger is at its default level (INFO), so this mostly measures
+the cost of the DEBUG calls on the per-task path.
+
+Only the arguments of `sim.sim()` that it has had from the start are used,
+so that the same script can be run on older trees for a before/after
+comparison.
+
+Measured on one machine, about 54k events per repetition:
+- Before the log level was checked first (8f80dff^):   1,900 events/s
+  (median of 3 repetitions, 28 s each)
+- After (8f80dff):                                   266,000 events/s
+  (median of 5 repetitions, 0.2 s each)
+
+Usage: python benchmarks/bench_optimal_vs_ts.py --num_repetitions 5
+"""
+import argparse
+import numpy
+import simpy
+import time
+
+from src.agent import optimal as optimal_module, random as random_module, ts as ts_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+
+from src.utils.debug import *
+
+
+NUM_SERVERS = 2
+LOAD_LIST = [0.1, 0.5, 0.8]
+
+AGENT_NAME_TO_SCHING_AGENT_GIVEN_SERVER_LIST_MAP = {
+    "Random": lambda server_list: random_module.AssignToRandom(node_list=server_list),
+    "TS-ResetWinOnRareEvent": lambda server_list: ts_module.AssignWithThompsonSampling_resetWinOnRareEvent(
+        node_list=server_list, win_len=100, threshold_prob_rare=0.9,
+    ),
+    "AssignToFewestTasksLeft": lambda server_list: optimal_module.AssignToFewestTasksLeft(node_list=server_list),
+}
+
+
+class CountingEnvironment(simpy.Environment):
+    """Counts the events scheduled, for the events per second."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_events = 0
+
+    def schedule(self, event: simpy.events.Event, priority: int = simpy.core.NORMAL, delay: float = 0):
+        self.num_events += 1
+        super().schedule(event, priority, delay)
+
+
+def events_per_sec(num_tasks: int) -> tuple[int, float]:
+    """Returns the number of events in the workload and the events per second."""
+    num_events, wall_time = 0, 0
+    for sching_agent_given_server_list in AGENT_NAME_TO_SCHING_AGENT_GIVEN_SERVER_LIST_MAP.values():
+        for load in LOAD_LIST:
+            env = CountingEnvironment()
+            start_time = time.perf_counter()
+            sim_module.sim(
+                env=env,
+                num_servers=NUM_SERVERS,
+                inter_task_gen_time_rv=random_variable.Exponential(mu=load * NUM_SERVERS),
+                task_service_time_rv=random_variable.DiscreteUniform(min_value=1, max_value=1),
+                num_tasks_to_recv=num_tasks,
+                sching_agent_given_server_list=sching_agent_given_server_list,
+            )
+            wall_time += time.perf_counter() - start_time
+            num_events += env.num_events
+
+    return num_events, num_events / wall_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the simpy events per second on the test_optimal_vs_ts workload.")
+    parser.add_argument("--num_tasks", type=int, default=1000)
+    parser.add_argument("--num_repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    result_list = [events_per_sec(num_tasks=args.num_tasks) for _ in range(args.num_repetitions)]
+    log(INFO, f"num_events= {result_list[0][0]}, median events/s= {numpy.median([r for _, r in result_list]):.0f}")
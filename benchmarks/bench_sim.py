@@ -0,0 +1,188 @@
+"""End-to-end throughput of `sim.sim()` on a fixed set of scenarios: each
+agent at loads 0.1, 0.5 and 0.9 with 2, 32 and 1024 servers, Poisson
+arrivals and Exp(1) service times.
+
+Reported per scenario: the wall time, the simulated tasks per second, the
+simpy events per second (with the "simpy" backend) and the peak RSS. Each
+scenario runs in a fresh process, so that its peak RSS is its own.
+
+Usage:
+    python benchmarks/bench_sim.py --output bench_sim.json
+    python benchmarks/bench_sim.py --output bench_sim.json --baseline benchmarks/baseline_sim.json --fail_on_regression
+"""
+import argparse
+import concurrent.futures
+import datetime
+import json
+import numpy
+import platform
+import resource
+import simpy
+import sys
+import time
+
+from src.agent import optimal as optimal_module, random as random_module, ts as ts_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+
+from src.utils.debug import *
+
+
+LOAD_LIST = [0.1, 0.5, 0.9]
+NUM_SERVERS_LIST = [2, 32, 1024]
+
+AGENT_NAME_TO_SCHING_AGENT_GIVEN_SERVER_LIST_MAP = {
+    "Random": lambda server_list: random_module.AssignToRandom(node_list=server_list),
+    "AssignToLeastWorkLeft": lambda server_list: optimal_module.AssignToLeastWorkLeft(node_list=server_list),
+    "AssignToNoisyLeastWorkLeft": lambda server_list: optimal_module.AssignToNoisyLeastWorkLeft(
+        node_list=server_list,
+        noise_rv=random_variable.CustomDiscrete(value_list=[0.5, 0.75, 1, 1.25, 1.5], prob_weight_list=[1, 1, 1, 1, 1]),
+    ),
+    "AssignToFewestTasksLeft": lambda server_list: optimal_module.AssignToFewestTasksLeft(node_list=server_list),
+    "TS-SlidingWin": lambda server_list: ts_module.AssignWithThompsonSampling_slidingWin(node_list=server_list, win_len=100),
+    "TS-SlidingWinForEachNode": lambda server_list: ts_module.AssignWithThompsonSampling_slidingWinForEachNode(
+        node_list=server_list, win_len=100,
+    ),
+    "TS-ResetWinOnRareEvent": lambda server_list: ts_module.AssignWithThompsonSampling_resetWinOnRareEvent(
+        node_list=server_list, win_len=100, threshold_prob_rare=0.9,
+    ),
+    "TS-SlidingWinForEachNode-PowerOf2": lambda server_list: ts_module.AssignWithThompsonSampling_slidingWinForEachNode_powerOfD(
+        node_list=server_list, win_len=100, d=2,
+    ),
+}
+
+
+class CountingEnvironment(simpy.Environment):
+    """Counts the events scheduled, for the events per second."""
+
+    def __init__(self):
+        super().__init__()
+        self.num_events = 0
+
+    def schedule(self, event: simpy.events.Event, priority: int = simpy.core.NORMAL, delay: float = 0):
+        self.num_events += 1
+        super().schedule(event, priority, delay)
+
+
+def peak_rss_MB() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # In kilobytes on Linux, and in bytes on macOS.
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 2**10
+
+
+def run_scenario(agent_name: str, load: float, num_servers: int, num_tasks: int, backend: str) -> dict:
+    env = CountingEnvironment()
+    start_time = time.perf_counter()
+    sim_result = sim_module.sim(
+        env=env,
+        num_servers=num_servers,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=load * num_servers),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=num_tasks,
+        sching_agent_given_server_list=AGENT_NAME_TO_SCHING_AGENT_GIVEN_SERVER_LIST_MAP[agent_name],
+        seed=0,
+        backend=backend,
+    )
+    wall_time = time.perf_counter() - start_time
+
+    return dict(
+        agent=agent_name,
+        load=load,
+        num_servers=num_servers,
+        num_tasks=sim_result.num_tasks,
+        backend=backend,
+        wall_time=wall_time,
+        tasks_per_sec=sim_result.num_tasks / wall_time,
+        events_per_sec=env.num_events / wall_time if backend == "simpy" else None,
+        peak_rss_MB=peak_rss_MB(),
+    )
+
+
+def run(num_tasks: int, backend: str, agent_name_list: list[str] = None) -> list[dict]:
+    result_list = []
+    for agent_name in agent_name_list or AGENT_NAME_TO_SCHING_AGENT_GIVEN_SERVER_LIST_MAP:
+        for num_servers in NUM_SERVERS_LIST:
+            for load in LOAD_LIST:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                    result = executor.submit(
+                        run_scenario,
+                        agent_name=agent_name,
+                        load=load,
+                        num_servers=num_servers,
+                        num_tasks=num_tasks,
+                        backend=backend,
+                    ).result()
+
+                result_list.append(result)
+                log(INFO, f"{agent_name}: num_servers= {num_servers}, load= {load}: "
+                    f"wall_time= {result['wall_time']:.2f} s, tasks/s= {result['tasks_per_sec']:.0f}, "
+                    f"events/s= {result['events_per_sec'] or float('nan'):.0f}, peak_rss= {result['peak_rss_MB']:.0f} MB")
+
+    return result_list
+
+
+def result_key(result: dict) -> tuple:
+    return (result["agent"], result["num_servers"], result["load"], result["num_tasks"], result["backend"])
+
+
+def compare(result_list: list[dict], baseline_result_list: list[dict], threshold: float) -> list[dict]:
+    """Logs the throughput and peak RSS of each scenario relative to the
+    baseline, and returns the scenarios whose tasks/s dropped, or whose
+    peak RSS grew, by more than `threshold` (relative).
+    """
+    key_to_baseline_result_map = {result_key(result): result for result in baseline_result_list}
+    regressed_result_list = []
+    for result in result_list:
+        baseline_result = key_to_baseline_result_map.get(result_key(result))
+        if baseline_result is None:
+            continue
+
+        speedup = result["tasks_per_sec"] / baseline_result["tasks_per_sec"]
+        rss_ratio = result["peak_rss_MB"] / baseline_result["peak_rss_MB"]
+        log(INFO, f"{result['agent']}: num_servers= {result['num_servers']}, load= {result['load']}: "
+            f"speedup= {speedup:.2f}x, peak_rss_ratio= {rss_ratio:.2f}")
+        if speedup < 1 / (1 + threshold) or rss_ratio > 1 + threshold:
+            regressed_result_list.append(dict(result, speedup=speedup, rss_ratio=rss_ratio))
+
+    return regressed_result_list
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the end-to-end throughput of the simulator.")
+    parser.add_argument("--output", default="bench_sim.json")
+    parser.add_argument("--num_tasks", type=int, default=20000)
+    parser.add_argument("--backend", default="simpy", choices=["simpy", "heap"])
+    parser.add_argument("--agent", action="append", help="Only the agents with this name (may be repeated)")
+    parser.add_argument("--baseline", help="JSON output of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative change that counts as a regression")
+    parser.add_argument("--fail_on_regression", action="store_true", help="Exit with 1 if a scenario regressed against the baseline")
+    args = parser.parse_args()
+
+    result_list = run(num_tasks=args.num_tasks, backend=args.backend, agent_name_list=args.agent)
+    with open(args.output, "w") as f:
+        json.dump(
+            dict(
+                meta=dict(
+                    time=datetime.datetime.now().isoformat(timespec="seconds"),
+                    python=platform.python_version(),
+                    numpy=numpy.__version__,
+                    simpy=simpy.__version__,
+                    machine=platform.machine(),
+                    processor=platform.processor(),
+                ),
+                result_list=result_list,
+            ),
+            f,
+            indent=2,
+        )
+    log(INFO, f"Wrote {len(result_list)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_result_list = json.load(f)["result_list"]
+
+        regressed_result_list = compare(result_list, baseline_result_list, threshold=args.threshold)
+        if regressed_result_list:
+            log(WARNING, f"{len(regressed_result_list)} regressions", regressed_result_list=regressed_result_list)
+            if args.fail_on_regression:
+                sys.exit(1)
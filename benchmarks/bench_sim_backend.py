@@ -0,0 +1,46 @@
+"""Simulated tasks per second with the simpy and heap engine backends of
+`sim.sim()`, for a few agents and numbers of servers at load 0.9.
+
+Usage: python benchmarks/bench_sim_backend.py
+"""
+import simpy
+import time
+
+from src.agent import optimal, random as random_module, ts as ts_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+
+from src.utils.debug import *
+
+
+def tasks_per_sec(sching_agent_given_server_list, num_servers: int, backend: str, num_tasks: int = 50000) -> float:
+    start_time = time.perf_counter()
+    sim_module.sim(
+        env=simpy.Environment(),
+        num_servers=num_servers,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=0.9 * num_servers),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=num_tasks,
+        sching_agent_given_server_list=sching_agent_given_server_list,
+        seed=0,
+        backend=backend,
+    )
+
+    return num_tasks / (time.perf_counter() - start_time)
+
+
+if __name__ == "__main__":
+    for name, sching_agent_given_server_list in [
+        ("AssignToRandom", lambda server_list: random_module.AssignToRandom(node_list=server_list)),
+        ("AssignToLeastWorkLeft", lambda server_list: optimal.AssignToLeastWorkLeft(node_list=server_list)),
+        (
+            "TS-SlidingWinForEachNode",
+            lambda server_list: ts_module.AssignWithThompsonSampling_slidingWinForEachNode(node_list=server_list, win_len=100),
+        ),
+    ]:
+        for num_servers in [2, 32, 1024]:
+            tasks_per_sec_w_simpy = tasks_per_sec(sching_agent_given_server_list, num_servers, backend="simpy")
+            tasks_per_sec_w_heap = tasks_per_sec(sching_agent_given_server_list, num_servers, backend="heap")
+            log(INFO, f"{name}: num_servers= {num_servers}: "
+                f"simpy= {tasks_per_sec_w_simpy:.0f}, heap= {tasks_per_sec_w_heap:.0f} tasks/s, "
+                f"speedup= {tasks_per_sec_w_heap / tasks_per_sec_w_simpy:.1f}x")
@@ -0,0 +1,67 @@
+"""Memory and allocation pressure of the per-task objects: the size of
+`Task` and `Exp`, and the peak traced memory and the number of GC runs in
+a simulation with a TS agent that keeps `win_len` experiences per node,
+with and without `store_wait_times_only`.
+
+Usage: python benchmarks/bench_task_memory.py
+"""
+import gc
+import time
+import tracemalloc
+
+from src.agent import exp as exp_module, ts as ts_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+from src.sys import task as task_module
+
+from src.utils.debug import *
+
+
+def bytes_per_obj(new_obj, num_objs: int = 100000) -> float:
+    tracemalloc.start()
+    obj_list = [new_obj(i) for i in range(num_objs)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj_list
+
+    return size / num_objs
+
+
+def sim_memory(num_servers: int, win_len: int, num_tasks: int, **agent_kwargs) -> dict:
+    def sching_agent_given_server_list(server_list):
+        return ts_module.AssignWithThompsonSampling_slidingWinForEachNode(node_list=server_list, win_len=win_len, **agent_kwargs)
+
+    num_gc_runs = sum(gen_stats["collections"] for gen_stats in gc.get_stats())
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    sim_module.sim(
+        env=None,
+        num_servers=num_servers,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=0.9 * num_servers),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=num_tasks,
+        sching_agent_given_server_list=sching_agent_given_server_list,
+        seed=0,
+        backend="heap",
+    )
+    wall_time = time.perf_counter() - start_time
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(
+        peak_MB=peak_size / 2**20,
+        gc_runs_per_1k_tasks=(sum(gen_stats["collections"] for gen_stats in gc.get_stats()) - num_gc_runs) / num_tasks * 1000,
+        tasks_per_sec=num_tasks / wall_time,
+    )
+
+
+if __name__ == "__main__":
+    log(INFO, "",
+        bytes_per_Task=bytes_per_obj(lambda i: task_module.Task(_id=i, service_time=1.0, arrival_time=float(i))),
+        bytes_per_Exp=bytes_per_obj(lambda i: exp_module.Exp(service_time=1.0, wait_time=float(i))),
+    )
+
+    num_servers, win_len, num_tasks = 100, 1000, 200000
+    for agent_kwargs in [dict(), dict(store_wait_times_only=True)]:
+        log(INFO, f"TS-SlidingWinForEachNode: num_servers= {num_servers}, win_len= {win_len}, num_tasks= {num_tasks}, agent_kwargs= {agent_kwargs}",
+            **sim_memory(num_servers=num_servers, win_len=win_len, num_tasks=num_tasks, **agent_kwargs))
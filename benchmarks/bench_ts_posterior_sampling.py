@@ -0,0 +1,41 @@
+"""Time to draw one posterior sample per node: a frozen `scipy.stats.truncnorm`
+per node vs `random_variable.sample_truncated_normal()` over all nodes.
+
+Usage: python benchmarks/bench_ts_posterior_sampling.py
+"""
+import numpy
+import scipy.stats
+import time
+
+from src.prob import random_variable
+
+from src.utils.debug import *
+
+
+def time_per_decision(sample_fn, num_decisions: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(num_decisions):
+        sample_fn()
+
+    return (time.perf_counter() - start_time) / num_decisions
+
+
+if __name__ == "__main__":
+    for num_nodes in [10, 100, 500]:
+        mean_array = numpy.random.uniform(0, 10, size=num_nodes)
+        stdev_array = numpy.random.uniform(0.01, 5, size=num_nodes)
+
+        def sample_w_scipy():
+            return numpy.argmin(
+                [
+                    scipy.stats.truncnorm(a=-mu / sigma, b=10, loc=mu, scale=sigma).rvs(size=1)[0]
+                    for mu, sigma in zip(mean_array, stdev_array)
+                ]
+            )
+
+        def sample_batched():
+            return numpy.argmin(random_variable.sample_truncated_normal(mu=mean_array, sigma=stdev_array))
+
+        t_scipy = time_per_decision(sample_w_scipy, num_decisions=20)
+        t_batched = time_per_decision(sample_batched, num_decisions=1000)
+        log(INFO, f"num_nodes= {num_nodes}: scipy= {1e6 * t_scipy:.1f} us, batched= {1e6 * t_batched:.1f} us, speedup= {t_scipy / t_batched:.0f}x")
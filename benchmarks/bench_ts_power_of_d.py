@@ -0,0 +1,134 @@
+"""E[T] and decision latency of the power-of-d TS agent vs `d`, against the
+full scan over all the nodes, plotted to
+`plot_ts_power_of_d_vs_full_scan_numServers_<num_servers>.png`.
+
+Usage: python benchmarks/bench_ts_power_of_d.py
+"""
+import simpy
+import time
+
+from src.agent import ts as ts_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+from src.sys import server as server_module
+
+from src.utils.debug import *
+from src.utils.plot import *
+
+
+def power_of_d_vs_full_scan(
+    num_servers: int,
+    arrival_rate: float,
+    task_service_time_rv: random_variable.RandomVariable,
+    d_list: list[int],
+    num_tasks_to_recv: int = 1000,
+    win_len: int = 100,
+    num_decisions_to_time: int = 1000,
+):
+    log(INFO, "Started",
+        num_servers=num_servers,
+        arrival_rate=arrival_rate,
+        task_service_time_rv=task_service_time_rv,
+        d_list=d_list,
+        num_tasks_to_recv=num_tasks_to_recv,
+    )
+
+    inter_task_gen_time_rv = random_variable.Exponential(mu=arrival_rate)
+
+    def sim_(sching_agent_given_server_list):
+        """Returns the sim result and the mean time per decision, measured on
+        the agent as it is at the end of the sim.
+        """
+        sching_agent_list = []
+        def sching_agent_given_server_list_(server_list: list[server_module.Server]):
+            sching_agent = sching_agent_given_server_list(server_list=server_list)
+            sching_agent_list.append(sching_agent)
+            return sching_agent
+
+        sim_result = sim_module.sim(
+            env=simpy.Environment(),
+            num_servers=num_servers,
+            inter_task_gen_time_rv=inter_task_gen_time_rv,
+            task_service_time_rv=task_service_time_rv,
+            num_tasks_to_recv=num_tasks_to_recv,
+            sching_agent_given_server_list=sching_agent_given_server_list_,
+            seed=0,
+        )
+
+        sching_agent = sching_agent_list[0]
+        start_time = time.perf_counter()
+        for _ in range(num_decisions_to_time):
+            sching_agent.node_id_to_assign()
+        time_per_decision = (time.perf_counter() - start_time) / num_decisions_to_time
+
+        return sim_result, time_per_decision
+
+    def assign_w_ts_sliding_win_for_each_node(server_list: list[server_module.Server]):
+        return ts_module.AssignWithThompsonSampling_slidingWinForEachNode(
+            node_list=server_list,
+            win_len=win_len,
+        )
+
+    sim_result_for_full_scan, time_per_decision_for_full_scan = sim_(assign_w_ts_sliding_win_for_each_node)
+    log(INFO, "Full scan", sim_result=sim_result_for_full_scan, time_per_decision=time_per_decision_for_full_scan)
+
+    ET_list, time_per_decision_list = [], []
+    for d in d_list:
+        def assign_w_ts_power_of_d(server_list: list[server_module.Server]):
+            return ts_module.AssignWithThompsonSampling_slidingWinForEachNode_powerOfD(
+                node_list=server_list,
+                win_len=win_len,
+                d=d,
+            )
+
+        sim_result, time_per_decision = sim_(assign_w_ts_power_of_d)
+        log(INFO, f">> d= {d}", sim_result=sim_result, time_per_decision=time_per_decision)
+
+        ET_list.append(sim_result.ET)
+        time_per_decision_list.append(time_per_decision)
+
+    fig, axs = plot.subplots(1, 2)
+    fontsize = 14
+
+    # E[T] vs d
+    ax = axs[0]
+    plot.sca(ax)
+    plot.plot(d_list, ET_list, color=next(dark_color_cycle), label="TS-PowerOfD", marker=next(marker_cycle), linestyle="dotted", lw=2, mew=3, ms=5)
+    plot.axhline(y=sim_result_for_full_scan.ET, color=next(dark_color_cycle), label="TS-SlidingWinForEachNode", linestyle="dashed", lw=2)
+    plot.legend(fontsize=fontsize)
+    plot.ylabel(r"$E[T]$", fontsize=fontsize)
+    plot.xlabel(r"$d$", fontsize=fontsize)
+
+    # Time per decision vs d
+    ax = axs[1]
+    plot.sca(ax)
+    plot.plot(d_list, [1e6 * t for t in time_per_decision_list], color=next(dark_color_cycle), label="TS-PowerOfD", marker=next(marker_cycle), linestyle="dotted", lw=2, mew=3, ms=5)
+    plot.axhline(y=1e6 * time_per_decision_for_full_scan, color=next(dark_color_cycle), label="TS-SlidingWinForEachNode", linestyle="dashed", lw=2)
+    plot.legend(fontsize=fontsize)
+    plot.ylabel(r"Time per decision ($\mu s$)", fontsize=fontsize)
+    plot.xlabel(r"$d$", fontsize=fontsize)
+
+    # Save the plot
+    plot.subplots_adjust(wspace=0.3)
+    suptitle = plot.suptitle(
+        r"$N_{\textrm{server}}= $" + f"{num_servers}, "
+        fr"$X \sim \textrm{{Exp}}({arrival_rate})$, "
+        fr"$S \sim {task_service_time_rv.to_latex()}$, "
+        r"$N_{\textrm{tasks}}= " + f"{num_tasks_to_recv}$"
+    )
+    plot.gcf().set_size_inches(12, 4)
+    plot.savefig(f"plot_ts_power_of_d_vs_full_scan_numServers_{num_servers}.png", bbox_extra_artists=(suptitle,), bbox_inches="tight")
+    plot.gcf().clear()
+
+    log(INFO, "Done")
+
+
+if __name__ == "__main__":
+    num_servers = 1000
+    power_of_d_vs_full_scan(
+        num_servers=num_servers,
+        arrival_rate=0.8 * num_servers,
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        d_list=[1, 2, 4, 8, 16, 32],
+        num_tasks_to_recv=100000,
+    )
@@ -0,0 +1,37 @@
+"""Decision latency of the sliding window TS agents vs `win_len`, with the
+windows full.
+
+Usage: python benchmarks/bench_ts_win_len.py
+"""
+import random
+import time
+
+from src.agent import exp as exp_module, ts as ts_module
+from src.sys import node as node_module
+
+from src.utils.debug import *
+
+
+def time_per_decision(sching_agent_class, num_nodes: int, win_len: int, num_decisions: int = 200) -> float:
+    node_list = [node_module.Node(env=None, _id=f"s{i}") for i in range(num_nodes)]
+    agent = sching_agent_class(node_list=node_list, win_len=win_len)
+    for node in node_list:
+        for _ in range(win_len):
+            agent.record_exp(node_id=node._id, exp=exp_module.Exp(service_time=1, wait_time=random.expovariate(1)))
+
+    start_time = time.perf_counter()
+    for _ in range(num_decisions):
+        agent.node_id_to_assign()
+
+    return (time.perf_counter() - start_time) / num_decisions
+
+
+if __name__ == "__main__":
+    num_nodes = 10
+    for sching_agent_class in [
+        ts_module.AssignWithThompsonSampling_slidingWin,
+        ts_module.AssignWithThompsonSampling_slidingWinForEachNode,
+    ]:
+        for win_len in [10, 100, 1000, 10000]:
+            t = time_per_decision(sching_agent_class, num_nodes, win_len)
+            log(INFO, f"{sching_agent_class.__name__}: num_nodes= {num_nodes}, win_len= {win_len}: {1e6 * t:.1f} us/decision")
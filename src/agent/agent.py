@@ -1,12 +1,20 @@
 import abc
+import numpy
 
 from src.sys import node
 from src.agent import exp as exp_module
 
 
 class SchingAgent(abc.ABC):
+    # Set by the agents whose decisions do not depend on the state of the
+    # nodes. These implement `node_index_array_to_assign()` and can be
+    # simulated without an event loop with `src.sim.lindley`.
+    state_independent = False
+
     def __init__(self):
-        pass
+        # Agents that randomize their decisions draw from `rng`, which
+        # `sim()` replaces with a generator spawned from the run's seed.
+        self.rng = numpy.random.default_rng()
 
     def __repr__(self):
         return "SchingAgent()"
@@ -15,9 +23,35 @@ class SchingAgent(abc.ABC):
     def node_id_to_assign(self, time_epoch: float=None):
         pass
 
+    def set_rng(self, rng: numpy.random.Generator):
+        self.rng = rng
+
+    def node_ids_to_assign(
+        self,
+        k: int,
+        time_epoch: float = None,
+        task_service_time_list: list[float] = None,
+    ) -> list[str]:
+        """Returns the node ids to assign a batch of k tasks arriving at
+        `time_epoch`. `task_service_time_list` is used by agents that account
+        for the work added by the earlier tasks in the batch.
+
+        Falls back to k independent calls to `node_id_to_assign()`, which is
+        only correct for agents whose decision does not depend on the tasks
+        assigned earlier in the same batch.
+        """
+        return [self.node_id_to_assign(time_epoch=time_epoch) for _ in range(k)]
+
+    def node_index_array_to_assign(self, n: int) -> numpy.ndarray:
+        """Returns the indices (in the node list) of the nodes to assign the
+        next `n` tasks. Only for the agents that are `state_independent`.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} is not state-independent")
+
 
 class SchingAgent_wOnlineLearning(SchingAgent):
     def __init__(self, node_list: list[node.Node]):
+        super().__init__()
         self.node_list = node_list
 
         self.node_id_list = [node._id for node in self.node_list]
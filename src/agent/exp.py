@@ -3,7 +3,7 @@ import dataclasses
 from src.sys import task as task_module
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class Exp:
     service_time: float
     wait_time: float
@@ -0,0 +1,119 @@
+import array
+import collections
+
+from typing import Iterator, Tuple
+
+from src.agent import exp as exp_module
+from src.prob import running_stats
+
+
+class ExpQueue:
+    """Bounded FIFO of `Exp`s that keeps running statistics of the wait times
+    in the window, so that their mean and stdev are O(1) to read.
+
+    Evicted wait times are removed from the running statistics, and the
+    statistics are recomputed from the window once every `win_len` evictions
+    to keep floating point drift from accumulating.
+    """
+
+    def __init__(self, win_len: int):
+        self.win_len = win_len
+
+        self.exp_queue = collections.deque()
+        self.wait_time_stats = running_stats.RunningStats()
+        self.num_evictions_since_recompute = 0
+
+    def __repr__(self):
+        return (
+            "ExpQueue( \n"
+            f"\t win_len= {self.win_len} \n"
+            f"\t wait_time_stats= {self.wait_time_stats} \n"
+            ")"
+        )
+
+    def __len__(self) -> int:
+        return len(self.exp_queue)
+
+    def __iter__(self) -> Iterator[exp_module.Exp]:
+        return iter(self.exp_queue)
+
+    def append(self, exp: exp_module.Exp):
+        if len(self.exp_queue) == self.win_len:
+            exp_evicted = self.exp_queue.popleft()
+            self.wait_time_stats.remove(exp_evicted.wait_time)
+            self.num_evictions_since_recompute += 1
+
+        self.exp_queue.append(exp)
+        self.wait_time_stats.add(exp.wait_time)
+
+        if self.num_evictions_since_recompute >= self.win_len:
+            self.wait_time_stats.reset(exp.wait_time for exp in self.exp_queue)
+            self.num_evictions_since_recompute = 0
+
+    def clear(self):
+        self.exp_queue.clear()
+        self.wait_time_stats.reset()
+        self.num_evictions_since_recompute = 0
+
+    def mean_stdev_wait_time(self) -> Tuple[float, float]:
+        return self.wait_time_stats.mean(), self.wait_time_stats.stdev()
+
+
+class WaitTimeRingBuffer:
+    """Alternative to `ExpQueue` that keeps only the wait times of the
+    `Exp`s, in a ring buffer over a preallocated `array("d")`, so that the
+    window holds no Python objects.
+    """
+
+    def __init__(self, win_len: int):
+        self.win_len = win_len
+
+        self.wait_time_array = array.array("d", [0.0]) * win_len
+        self.start_index = 0
+        self.length = 0
+        self.wait_time_stats = running_stats.RunningStats()
+        self.num_evictions_since_recompute = 0
+
+    def __repr__(self):
+        return (
+            "WaitTimeRingBuffer( \n"
+            f"\t win_len= {self.win_len} \n"
+            f"\t wait_time_stats= {self.wait_time_stats} \n"
+            ")"
+        )
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[float]:
+        """Yields the wait times in the window, oldest first."""
+        for i in range(self.length):
+            yield self.wait_time_array[(self.start_index + i) % self.win_len]
+
+    def append(self, exp: exp_module.Exp):
+        self.append_wait_time(exp.wait_time)
+
+    def append_wait_time(self, wait_time: float):
+        if self.length == self.win_len:
+            self.wait_time_stats.remove(self.wait_time_array[self.start_index])
+            self.wait_time_array[self.start_index] = wait_time
+            self.start_index = (self.start_index + 1) % self.win_len
+            self.num_evictions_since_recompute += 1
+        else:
+            self.wait_time_array[(self.start_index + self.length) % self.win_len] = wait_time
+            self.length += 1
+
+        self.wait_time_stats.add(wait_time)
+
+        if self.num_evictions_since_recompute >= self.win_len:
+            self.wait_time_stats.reset(self.wait_time_array)
+            self.num_evictions_since_recompute = 0
+
+    def clear(self):
+        self.start_index = 0
+        self.length = 0
+        self.wait_time_stats.reset()
+        self.num_evictions_since_recompute = 0
+
+    def mean_stdev_wait_time(self) -> Tuple[float, float]:
+        return self.wait_time_stats.mean(), self.wait_time_stats.stdev()
@@ -1,14 +1,46 @@
+import heapq
+import numpy
+
 from src.agent import agent
 from src.prob import random_variable
 from src.sys import node
+from src.utils import indexed_heap
 
 from src.utils.debug import *
 
 
 class AssignToLeastWorkLeft(agent.SchingAgent):
+    """Nodes are kept in two indexed heaps that the nodes update through
+    their state listeners: idle nodes by index, and busy nodes by the time
+    they will finish all their work left. The work left at every busy node
+    decreases at the same rate, so the order of the busy nodes changes only
+    when a node notifies, and the node with the least work left is the idle
+    node with the smallest index or, if there is none, the busy node that
+    finishes first. This is the node a linear scan over `work_left()` picks,
+    up to floating point near-ties.
+    """
+
     def __init__(self, node_list: list[node.Node]):
+        super().__init__()
         self.node_list = node_list
 
+        self.node_id_to_index_map = {node._id: i for i, node in enumerate(node_list)}
+        self.idle_node_index_heap = indexed_heap.IndexedMinHeap(n=len(node_list))
+        self.busy_node_index_heap = indexed_heap.IndexedMinHeap(n=len(node_list))
+        for node in node_list:
+            self.update_node_index(node)
+            node.add_state_listener(self.update_node_index)
+
+    def update_node_index(self, node: node.Node):
+        i = self.node_id_to_index_map[node._id]
+        work_left = node.work_left()
+        if work_left <= 0:
+            self.busy_node_index_heap.remove(i)
+            self.idle_node_index_heap.update(i, 0)
+        else:
+            self.idle_node_index_heap.remove(i)
+            self.busy_node_index_heap.update(i, node.env.now + work_left)
+
     def __repr__(self):
         return (
             "AssignToLeastWorkLeft( \n"
@@ -17,21 +49,32 @@ class AssignToLeastWorkLeft(agent.SchingAgent):
         )
 
     def node_id_to_assign(self, time_epoch: float=None) -> str:
-        node_w_least_work = None
-        least_work = float("Inf")
-        for node in self.node_list:
-            work_left = node.work_left()
-
-            if work_left < least_work:
-                least_work = work_left
-                node_w_least_work = node
-
-        return node_w_least_work._id
+        if len(self.idle_node_index_heap):
+            return self.node_list[self.idle_node_index_heap.peek()]._id
+
+        return self.node_list[self.busy_node_index_heap.peek()]._id
+
+    def node_ids_to_assign(
+        self,
+        k: int,
+        time_epoch: float = None,
+        task_service_time_list: list[float] = None,
+    ) -> list[str]:
+        """Each task in the batch is assigned as if the service time of the
+        earlier ones were already added to the work left at their nodes. Tasks
+        count as one unit of work if `task_service_time_list` is not given.
+        """
+        node_index_list = node_indices_w_least_virtual_load(
+            load_list=[node.work_left() for node in self.node_list],
+            load_increment_list=task_service_time_list if task_service_time_list is not None else [1] * k,
+        )
+        return [self.node_list[i]._id for i in node_index_list]
 
 
-class AssignToNoisyLeastWorkLeft(AssignToLeastWorkLeft):
+class AssignToNoisyLeastWorkLeft(agent.SchingAgent):
     def __init__(self, node_list: list[node.Node], noise_rv: random_variable.RandomVariable):
-        super().__init__(node_list=node_list)
+        super().__init__()
+        self.node_list = node_list
         self.noise_rv = noise_rv
 
         check(self.noise_rv.min_value > 0 and self.noise_rv.max_value > 0,
@@ -45,6 +88,10 @@ class AssignToNoisyLeastWorkLeft(AssignToLeastWorkLeft):
             ")"
         )
 
+    def set_rng(self, rng: numpy.random.Generator):
+        super().set_rng(rng)
+        self.noise_rv = self.noise_rv.with_rng(rng)
+
     def node_id_to_assign(self, time_epoch: float=None) -> str:
         node_w_least_work = None
         least_work = float("Inf")
@@ -59,11 +106,45 @@ class AssignToNoisyLeastWorkLeft(AssignToLeastWorkLeft):
 
         return node_w_least_work._id
 
+    def node_ids_to_assign(
+        self,
+        k: int,
+        time_epoch: float = None,
+        task_service_time_list: list[float] = None,
+    ) -> list[str]:
+        if task_service_time_list is None:
+            task_service_time_list = [1] * k
+
+        work_left_array = numpy.array([node.work_left() for node in self.node_list], dtype=float)
+        noise_array = self.noise_rv.sample_n(k * len(self.node_list)).reshape(k, len(self.node_list))
+
+        node_id_list = []
+        for i, service_time in enumerate(task_service_time_list):
+            node_index = int(numpy.argmin(work_left_array * noise_array[i]))
+            work_left_array[node_index] += service_time
+            node_id_list.append(self.node_list[node_index]._id)
+
+        return node_id_list
+
 
 class AssignToFewestTasksLeft(agent.SchingAgent):
+    """Nodes are kept in an indexed heap by the number of tasks left, which
+    the nodes update through their state listeners.
+    """
+
     def __init__(self, node_list: list[node.Node]):
+        super().__init__()
         self.node_list = node_list
 
+        self.node_id_to_index_map = {node._id: i for i, node in enumerate(node_list)}
+        self.node_index_heap = indexed_heap.IndexedMinHeap(n=len(node_list))
+        for node in node_list:
+            self.update_node_index(node)
+            node.add_state_listener(self.update_node_index)
+
+    def update_node_index(self, node: node.Node):
+        self.node_index_heap.update(self.node_id_to_index_map[node._id], node.num_tasks_left())
+
     def __repr__(self):
         return (
             "AssignToFewestTasksLeft( \n"
@@ -72,13 +153,33 @@ class AssignToFewestTasksLeft(agent.SchingAgent):
         )
 
     def node_id_to_assign(self, time_epoch: float=None) -> str:
-        node_w_fewest_tasks_left = None
-        fewest_tasks_left = float("Inf")
-        for node in self.node_list:
-            num_tasks_left = node.num_tasks_left()
+        return self.node_list[self.node_index_heap.peek()]._id
+
+    def node_ids_to_assign(
+        self,
+        k: int,
+        time_epoch: float = None,
+        task_service_time_list: list[float] = None,
+    ) -> list[str]:
+        node_index_list = node_indices_w_least_virtual_load(
+            load_list=[node.num_tasks_left() for node in self.node_list],
+            load_increment_list=[1] * k,
+        )
+        return [self.node_list[i]._id for i in node_index_list]
+
+
+def node_indices_w_least_virtual_load(load_list: list[float], load_increment_list: list[float]) -> list[int]:
+    """Assigns the i-th item to the node with the least load, after adding
+    `load_increment_list[j]` to the node that item j < i was assigned to.
+    Ties go to the node with the smallest index, as in the linear scans.
+    """
+    heap = [(load, i) for i, load in enumerate(load_list)]
+    heapq.heapify(heap)
 
-            if num_tasks_left < fewest_tasks_left:
-                fewest_tasks_left = num_tasks_left
-                node_w_fewest_tasks_left = node
+    node_index_list = []
+    for load_increment in load_increment_list:
+        load, i = heap[0]
+        node_index_list.append(i)
+        heapq.heapreplace(heap, (load + load_increment, i))
 
-        return node_w_fewest_tasks_left._id
+    return node_index_list
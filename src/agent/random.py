@@ -1,4 +1,4 @@
-import random
+import numpy
 
 from src.agent import agent
 from src.sys import node
@@ -7,7 +7,10 @@ from src.utils.debug import *
 
 
 class AssignToRandom(agent.SchingAgent):
+    state_independent = True
+
     def __init__(self, node_list: list[node.Node]):
+        super().__init__()
         self.node_list = node_list
 
     def __repr__(self):
@@ -18,4 +21,7 @@ class AssignToRandom(agent.SchingAgent):
         )
 
     def node_id_to_assign(self, time_epoch: float=None) -> str:
-        return random.sample(self.node_list, 1)[0]._id
+        return self.node_list[self.rng.integers(len(self.node_list))]._id
+
+    def node_index_array_to_assign(self, n: int) -> numpy.ndarray:
+        return self.rng.integers(len(self.node_list), size=n)
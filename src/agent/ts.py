@@ -1,82 +1,176 @@
+import abc
+import array
 import collections
 import numpy
 
 from typing import Tuple
 
-from src.agent import agent, exp as exp_module
-from src.prob import random_variable
+from src.agent import agent, exp as exp_module, exp_queue as exp_queue_module
+from src.prob import random_variable, running_stats
 from src.sys import node
 from src.utils.debug import *
 
 
-class AssignWithThompsonSampling_slidingWin(agent.SchingAgent_wOnlineLearning):
-    def __init__(self, node_list: list[node.Node], win_len: int):
+class AssignWithThompsonSampling(agent.SchingAgent_wOnlineLearning):
+    """Assigns to the node with the minimum wait time sampled from a
+    TruncatedNormal posterior per node.
+    """
+
+    @abc.abstractmethod
+    def mean_stdev_wait_time(self, node_id: str) -> Tuple[float, float]:
+        pass
+
+    def mean_stdev_wait_time_arrays(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        mean_array, stdev_array = numpy.array(
+            [self.mean_stdev_wait_time(node_id) for node_id in self.node_id_list]
+        ).T
+        log(DEBUG, "", mean_array=mean_array, stdev_array=stdev_array)
+
+        return mean_array, stdev_array
+
+    def node_id_to_assign(self, time_epoch: float=None) -> str:
+        mean_array, stdev_array = self.mean_stdev_wait_time_arrays()
+
+        # Choose the node with min wait time sample
+        sample_array = random_variable.sample_truncated_normal(mu=mean_array, sigma=stdev_array, rng=self.rng)
+        return self.node_id_list[int(numpy.argmin(sample_array))]
+
+    def node_ids_to_assign(
+        self,
+        k: int,
+        time_epoch: float = None,
+        task_service_time_list: list[float] = None,
+    ) -> list[str]:
+        mean_array, stdev_array = self.mean_stdev_wait_time_arrays()
+
+        # Posteriors do not change until the next `record_exp()`, so the k
+        # decisions are independent draws from the same posteriors.
+        sample_array = random_variable.sample_truncated_normal(mu=mean_array, sigma=stdev_array, num_samples=k, rng=self.rng)
+        return [self.node_id_list[i] for i in numpy.argmin(sample_array, axis=1)]
+
+
+class AssignWithThompsonSampling_slidingWin(AssignWithThompsonSampling):
+    """With `store_wait_times_only`, the window keeps the node index and the
+    wait time of each experience in ring buffers over preallocated arrays,
+    rather than (node_id, Exp) tuples.
+    """
+
+    def __init__(self, node_list: list[node.Node], win_len: int, store_wait_times_only: bool = False):
         super().__init__(node_list=node_list)
         self.win_len = win_len
-
-        self.node_id_and_exp_queue = collections.deque(maxlen=win_len)
+        self.store_wait_times_only = store_wait_times_only
+
+        if self.store_wait_times_only:
+            self.node_id_to_index_map = {node_id: i for i, node_id in enumerate(self.node_id_list)}
+            self.node_index_array = array.array("l", [0]) * win_len
+            self.wait_time_array = array.array("d", [0.0]) * win_len
+            self.win_start_index = 0
+            self.win_size = 0
+        else:
+            self.node_id_and_exp_queue = collections.deque()
+        # Running stats of the wait times in the window for each node, updated
+        # on every append and eviction so that decisions do not scan the window.
+        self.node_id_to_wait_time_stats_map = {node_id: running_stats.RunningStats() for node_id in self.node_id_list}
+        self.num_evictions_since_recompute = 0
 
     def __repr__(self):
         return (
             "AssignWithThompsonSampling_slidingWin( \n"
             f"\t node_id_list= {self.node_id_list} \n"
             f"\t win_len= {self.win_len} \n"
+            f"\t store_wait_times_only= {self.store_wait_times_only} \n"
             ")"
         )
 
     def record_exp(self, node_id: str, exp: exp_module.Exp):
+        if self.store_wait_times_only:
+            self.record_wait_time(node_id=node_id, wait_time=exp.wait_time)
+            return
+
+        if len(self.node_id_and_exp_queue) == self.win_len:
+            node_id_evicted, exp_evicted = self.node_id_and_exp_queue.popleft()
+            self.node_id_to_wait_time_stats_map[node_id_evicted].remove(exp_evicted.wait_time)
+            self.num_evictions_since_recompute += 1
+
         self.node_id_and_exp_queue.append((node_id, exp))
+        self.node_id_to_wait_time_stats_map[node_id].add(exp.wait_time)
         log(DEBUG, "recorded", node_id=node_id, exp=exp)
 
-    def node_id_to_assign(self, time_epoch: float=None):
-        # Construct `node_id_to_wait_times_map`
-        node_id_to_wait_times_map = collections.defaultdict(list)
-        for (node_id, exp) in self.node_id_and_exp_queue:
-            node_id_to_wait_times_map[node_id].append(exp.wait_time)
+        # Recompute from the window once in a while to keep the floating point
+        # drift from the removals bounded.
+        if self.num_evictions_since_recompute >= self.win_len:
+            for wait_time_stats in self.node_id_to_wait_time_stats_map.values():
+                wait_time_stats.reset()
+            for (node_id_, exp_) in self.node_id_and_exp_queue:
+                self.node_id_to_wait_time_stats_map[node_id_].add(exp_.wait_time)
+
+            self.num_evictions_since_recompute = 0
+
+    def record_wait_time(self, node_id: str, wait_time: float):
+        node_index = self.node_id_to_index_map[node_id]
+        if self.win_size == self.win_len:
+            i = self.win_start_index
+            self.node_id_to_wait_time_stats_map[self.node_id_list[self.node_index_array[i]]].remove(self.wait_time_array[i])
+            self.win_start_index = (i + 1) % self.win_len
+            self.num_evictions_since_recompute += 1
+        else:
+            i = (self.win_start_index + self.win_size) % self.win_len
+            self.win_size += 1
 
-        for node_id in self.node_id_list:
-            if node_id not in node_id_to_wait_times_map:
-                node_id_to_wait_times_map[node_id].append(0)
+        self.node_index_array[i] = node_index
+        self.wait_time_array[i] = wait_time
+        self.node_id_to_wait_time_stats_map[node_id].add(wait_time)
+        log(DEBUG, "recorded", node_id=node_id, wait_time=wait_time)
 
-        log(DEBUG, "", node_id_to_wait_times_map=node_id_to_wait_times_map)
+        if self.num_evictions_since_recompute >= self.win_len:
+            for wait_time_stats in self.node_id_to_wait_time_stats_map.values():
+                wait_time_stats.reset()
+            for node_index_, wait_time_ in zip(self.node_index_array, self.wait_time_array):
+                self.node_id_to_wait_time_stats_map[self.node_id_list[node_index_]].add(wait_time_)
 
-        # Choose the node with min wait time sample
-        node_id_to_return, min_sample = None, float("Inf")
-        for node_id, wait_times in node_id_to_wait_times_map.items():
-            mean = numpy.mean(wait_times) if len(wait_times) else 0
-            stdev = numpy.std(wait_times) if len(wait_times) else 1
-            check(stdev >= 0, "Stdev cannot be negative")
-            if stdev == 0:
-                stdev = 1
+            self.num_evictions_since_recompute = 0
+
+    def mean_stdev_wait_time(self, node_id: str) -> Tuple[float, float]:
+        wait_time_stats = self.node_id_to_wait_time_stats_map[node_id]
+        if wait_time_stats.count == 0:
+            return 0, 1
+
+        mean, stdev = wait_time_stats.mean(), wait_time_stats.stdev()
+        check(stdev >= 0, "Stdev cannot be negative")
+        if stdev == 0:
+            stdev = 1
 
-            s = random_variable.TruncatedNormal(mu=mean, sigma=stdev).sample()
-            if s < min_sample:
-                min_sample = s
-                node_id_to_return = node_id
-                # log(DEBUG, "s < min_sample", s=s, min_sample=min_sample, node_id_to_return=node_id_to_return)
+        return mean, stdev
 
-        return node_id_to_return
 
+class AssignWithThompsonSampling_slidingWinForEachNode(AssignWithThompsonSampling):
+    """With `store_wait_times_only`, the window of each node keeps only the
+    wait times, in an `exp_queue.WaitTimeRingBuffer`, rather than the `Exp`s.
+    """
 
-class AssignWithThompsonSampling_slidingWinForEachNode(agent.SchingAgent_wOnlineLearning):
-    def __init__(self, node_list: list[node.Node], win_len: int):
+    def __init__(self, node_list: list[node.Node], win_len: int, store_wait_times_only: bool = False):
         super().__init__(node_list=node_list)
         self.win_len = win_len
+        self.store_wait_times_only = store_wait_times_only
 
-        self.node_id_to_exp_queue_map = {node_id: collections.deque(maxlen=win_len) for node_id in self.node_id_list}
+        exp_queue_class = exp_queue_module.WaitTimeRingBuffer if store_wait_times_only else exp_queue_module.ExpQueue
+        self.node_id_to_exp_queue_map = {node_id: exp_queue_class(win_len=win_len) for node_id in self.node_id_list}
 
     def __repr__(self):
         return (
             "AssignWithThompsonSampling_slidingWinForEachNode( \n"
             f"\t node_id_list= {self.node_id_list} \n"
             f"\t win_len= {self.win_len} \n"
+            f"\t store_wait_times_only= {self.store_wait_times_only} \n"
             ")"
         )
 
     def mean_stdev_wait_time(self, node_id: str) -> Tuple[float, float]:
-        wait_times = [exp.wait_time for exp in self.node_id_to_exp_queue_map[node_id]]
-        mean = numpy.mean(wait_times) if len(wait_times) else 0
-        stdev = numpy.std(wait_times) if len(wait_times) else 0.01
+        exp_queue = self.node_id_to_exp_queue_map[node_id]
+        if len(exp_queue) == 0:
+            return 0, 0.01
+
+        mean, stdev = exp_queue.mean_stdev_wait_time()
         check(stdev >= 0, "Stdev cannot be negative")
         if stdev == 0:
             stdev = 0.01
@@ -87,26 +181,10 @@ class AssignWithThompsonSampling_slidingWinForEachNode(agent.SchingAgent_wOnline
         self.node_id_to_exp_queue_map[node_id].append(exp)
         log(DEBUG, "recorded", node_id=node_id, exp=exp)
 
-    def node_id_to_assign(self, time_epoch: float=None):
-        log(DEBUG, "", node_id_to_exp_queue_map=self.node_id_to_exp_queue_map)
-
-        # Choose the node with min wait time sample
-        node_id_to_return, min_sample = None, float("Inf")
-        for node_id in self.node_id_to_exp_queue_map:
-            mean, stdev = self.mean_stdev_wait_time(node_id)
-
-            s = random_variable.TruncatedNormal(mu=mean, sigma=stdev).sample()
-            if s < min_sample:
-                min_sample = s
-                node_id_to_return = node_id
-                # log(DEBUG, "s < min_sample", s=s, min_sample=min_sample, node_id_to_return=node_id_to_return)
-
-        return node_id_to_return
-
 
 class AssignWithThompsonSampling_resetWinOnRareEvent(AssignWithThompsonSampling_slidingWinForEachNode):
-    def __init__(self, node_list: list[node.Node], win_len: int, threshold_prob_rare: float):
-        super().__init__(node_list=node_list, win_len=win_len)
+    def __init__(self, node_list: list[node.Node], win_len: int, threshold_prob_rare: float, store_wait_times_only: bool = False):
+        super().__init__(node_list=node_list, win_len=win_len, store_wait_times_only=store_wait_times_only)
         self.threshold_prob_rare = threshold_prob_rare
 
         self.node_id_to_time_last_assigned_map = {node_id: 0 for node_id in self.node_id_list}
@@ -129,6 +207,7 @@ class AssignWithThompsonSampling_resetWinOnRareEvent(AssignWithThompsonSampling_
             record()
 
         else:
+            cost = exp.wait_time
             mean, stdev = self.mean_stdev_wait_time(node_id)
             cost_rv = random_variable.TruncatedNormal(mu=mean, sigma=stdev)
 
@@ -142,31 +221,105 @@ class AssignWithThompsonSampling_resetWinOnRareEvent(AssignWithThompsonSampling_
                 record()
 
     def node_id_to_assign(self, time_epoch: float):
-        log(DEBUG, "",
-            node_id_to_exp_queue_map=self.node_id_to_exp_queue_map,
-            node_list=[node.repr_w_state() for node in self.node_list],
-            time_epoch=time_epoch,
-        )
-
-        # Choose the node with min-cost sample
-        node_id_to_return, min_sample = None, float("Inf")
-        for node_id in self.node_id_to_exp_queue_map:
-            time_last_assigned = self.node_id_to_time_last_assigned_map[node_id]
-
+        return self.node_ids_to_assign(k=1, time_epoch=time_epoch)[0]
+
+    def node_ids_to_assign(
+        self,
+        k: int,
+        time_epoch: float,
+        task_service_time_list: list[float] = None,
+    ) -> list[str]:
+        if is_enabled(DEBUG):
+            log(DEBUG, "",
+                node_id_to_exp_queue_map=self.node_id_to_exp_queue_map,
+                node_list=[node.repr_w_state() for node in self.node_list],
+                time_epoch=time_epoch,
+            )
+
+        mean_list, stdev_list = [], []
+        for node_id in self.node_id_list:
             _mean, _stdev = self.mean_stdev_wait_time(node_id)
             mean = _mean - (time_epoch - self.node_id_to_time_last_assigned_map[node_id])
             if mean <= 0:
                 log(DEBUG, "Mean < 0, resetting memory buffer", node_id=node_id)
                 self.node_id_to_exp_queue_map[node_id].clear()
-                s = mean
+                stdev = 0
             else:
                 stdev = _stdev * (1 - mean / _mean)
-                s = random_variable.TruncatedNormal(mu=mean, sigma=stdev).sample()
 
-            if s < min_sample:
-                min_sample = s
-                node_id_to_return = node_id
-                # log(DEBUG, "s < min_sample", s=s, min_sample=min_sample, node_id_to_return=node_id_to_return)
+            mean_list.append(mean)
+            stdev_list.append(stdev)
+
+        # Sample the cost of each node for each of the k decisions. Nodes with
+        # non-positive mean are not sampled; their cost is the mean itself.
+        mean_array = numpy.array(mean_list)
+        sample_array = numpy.where(
+            mean_array <= 0,
+            mean_array,
+            random_variable.sample_truncated_normal(mu=mean_array, sigma=stdev_list, num_samples=k, rng=self.rng),
+        )
+
+        # Once a node is assigned a task in this batch, no time passes since
+        # its last assignment, so its cost for the rest of the batch is its
+        # unshifted mean (with stdev 0).
+        mean_at_assignment_array = numpy.array([self.mean_stdev_wait_time(node_id)[0] for node_id in self.node_id_list])
+        assigned_array = numpy.zeros(len(self.node_id_list), dtype=bool)
+        node_id_list = []
+        for i in range(k):
+            node_index = int(numpy.argmin(numpy.where(assigned_array, mean_at_assignment_array, sample_array[i])))
+            assigned_array[node_index] = True
+            node_id_list.append(self.node_id_list[node_index])
+
+        for node_id in node_id_list:
+            self.node_id_to_time_last_assigned_map[node_id] = time_epoch
+
+        return node_id_list
+
 
-        self.node_id_to_time_last_assigned_map[node_id_to_return] = time_epoch
-        return node_id_to_return
+class AssignWithThompsonSampling_slidingWinForEachNode_powerOfD(AssignWithThompsonSampling_slidingWinForEachNode):
+    """Samples the posterior of only `d` nodes chosen uniformly at random (with
+    replacement), plus the node assigned at the previous decision if
+    `sample_prev_best` is set, and assigns to the one with the min sample.
+    Decision cost is O(d) regardless of the number of nodes.
+    """
+
+    def __init__(self, node_list: list[node.Node], win_len: int, d: int, sample_prev_best: bool = True, store_wait_times_only: bool = False):
+        super().__init__(node_list=node_list, win_len=win_len, store_wait_times_only=store_wait_times_only)
+        self.d = d
+        self.sample_prev_best = sample_prev_best
+
+        self.prev_best_node_index = None
+
+    def __repr__(self):
+        return (
+            "AssignWithThompsonSampling_slidingWinForEachNode_powerOfD( \n"
+            f"\t num_nodes= {len(self.node_id_list)} \n"
+            f"\t win_len= {self.win_len} \n"
+            f"\t d= {self.d} \n"
+            f"\t sample_prev_best= {self.sample_prev_best} \n"
+            ")"
+        )
+
+    def node_id_to_assign(self, time_epoch: float=None) -> str:
+        node_index_list = self.rng.integers(len(self.node_id_list), size=self.d).tolist()
+        if self.sample_prev_best and self.prev_best_node_index is not None:
+            node_index_list.append(self.prev_best_node_index)
+
+        mean_array, stdev_array = numpy.array(
+            [self.mean_stdev_wait_time(self.node_id_list[i]) for i in node_index_list]
+        ).T
+        log(DEBUG, "", node_index_list=node_index_list, mean_array=mean_array, stdev_array=stdev_array)
+
+        # Choose the node with min wait time sample
+        sample_array = random_variable.sample_truncated_normal(mu=mean_array, sigma=stdev_array, rng=self.rng)
+        self.prev_best_node_index = node_index_list[int(numpy.argmin(sample_array))]
+        return self.node_id_list[self.prev_best_node_index]
+
+    def node_ids_to_assign(
+        self,
+        k: int,
+        time_epoch: float = None,
+        task_service_time_list: list[float] = None,
+    ) -> list[str]:
+        # Each decision samples a different subset of nodes
+        return [self.node_id_to_assign(time_epoch=time_epoch) for _ in range(k)]
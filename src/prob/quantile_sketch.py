@@ -0,0 +1,106 @@
+import collections
+import math
+import numpy
+
+
+class QuantileSketch:
+    """DDSketch-style quantile sketch: positive values are counted in
+    logarithmically spaced buckets so that every quantile estimate is within
+    a relative error of `relative_accuracy`. Memory is bounded by
+    `max_num_buckets`, beyond which the lowest buckets are collapsed (losing
+    accuracy only at the low quantiles). Two sketches with the same
+    `relative_accuracy` are merged exactly by adding their bucket counts.
+
+    Ref: Masson et al., "DDSketch: A fast and fully-mergeable quantile sketch
+    with relative-error guarantees", VLDB 2019.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-9,
+        max_num_buckets: int = 2048,
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_num_buckets = max_num_buckets
+
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        self.bucket_to_count_map = collections.defaultdict(int)
+        # Values at or below `min_value` (incl. 0) are counted as 0.
+        self.zero_count = 0
+        self.count = 0
+
+    def __repr__(self):
+        return (
+            f"QuantileSketch(relative_accuracy= {self.relative_accuracy}, "
+            f"count= {self.count}, num_buckets= {len(self.bucket_to_count_map)})"
+        )
+
+    def add(self, x: float):
+        self.count += 1
+        if x <= self.min_value:
+            self.zero_count += 1
+            return
+
+        bucket = math.ceil(math.log(x) / self.log_gamma)
+        num_buckets = len(self.bucket_to_count_map)
+        self.bucket_to_count_map[bucket] += 1
+        if len(self.bucket_to_count_map) > num_buckets and num_buckets >= self.max_num_buckets:
+            self._collapse()
+
+    def add_array(self, x_array: numpy.ndarray):
+        is_zero_array = x_array <= self.min_value
+        self.count += len(x_array)
+        self.zero_count += int(numpy.count_nonzero(is_zero_array))
+
+        bucket_array, count_array = numpy.unique(
+            numpy.ceil(numpy.log(x_array[~is_zero_array]) / self.log_gamma).astype(int),
+            return_counts=True,
+        )
+        for bucket, count in zip(bucket_array.tolist(), count_array.tolist()):
+            self.bucket_to_count_map[bucket] += count
+
+        if len(self.bucket_to_count_map) > self.max_num_buckets:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError(f"Can not merge sketches with different accuracy: {self} vs {other}")
+
+        for bucket, count in other.bucket_to_count_map.items():
+            self.bucket_to_count_map[bucket] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+        if len(self.bucket_to_count_map) > self.max_num_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Merges the lowest buckets into the lowest one to keep."""
+        bucket_list = sorted(self.bucket_to_count_map)
+        num_to_collapse = len(bucket_list) - self.max_num_buckets
+        bucket_to_keep = bucket_list[num_to_collapse]
+        for bucket in bucket_list[:num_to_collapse]:
+            self.bucket_to_count_map[bucket_to_keep] += self.bucket_to_count_map.pop(bucket)
+
+    def quantile(self, q: float) -> float:
+        """Returns the estimated `q`-quantile for `q` in [0, 1], or NaN if the
+        sketch is empty.
+        """
+        if self.count == 0:
+            return float("NaN")
+
+        rank = q * (self.count - 1)
+        cum_count = self.zero_count
+        if rank < cum_count:
+            return 0.0
+
+        for bucket in sorted(self.bucket_to_count_map):
+            cum_count += self.bucket_to_count_map[bucket]
+            if rank < cum_count:
+                break
+
+        return 2 * self.gamma**bucket / (self.gamma + 1)
@@ -1,20 +1,72 @@
+import copy
 import math
-import random
 
 import numpy
 import scipy
+import scipy.special
 import scipy.stats
 
 
+# Number of variates generated at once to refill the buffer behind `sample()`.
+DEFAULT_BUFFER_SIZE = 4096
+
+# Generator used for sampling when none is given.
+default_rng = numpy.random.default_rng()
+
+
+def to_seed_seq(seed: int | numpy.random.SeedSequence) -> numpy.random.SeedSequence:
+    """Returns a `SeedSequence` for `seed` that has not spawned any children.
+    Spawning changes the state of a `SeedSequence`, so a given one is copied
+    rather than spawned from, and the same `seed` always spawns the same
+    children.
+    """
+    if isinstance(seed, numpy.random.SeedSequence):
+        return numpy.random.SeedSequence(entropy=seed.entropy, spawn_key=seed.spawn_key, pool_size=seed.pool_size)
+
+    return numpy.random.SeedSequence(seed)
+
+
+def spawn_rngs(seed: int | numpy.random.SeedSequence, n: int) -> list[numpy.random.Generator]:
+    """Returns `n` generators with independent streams spawned from `seed`."""
+    return [numpy.random.default_rng(child_seed_seq) for child_seed_seq in to_seed_seq(seed).spawn(n)]
+
+
 class RandomVariable:
-    def __init__(self, min_value: float, max_value: float):
+    def __init__(self, min_value: float, max_value: float, buffer_size: int = DEFAULT_BUFFER_SIZE):
         self.min_value = min_value
         self.max_value = max_value
+        self.buffer_size = buffer_size
+
+        self.rng = default_rng
+        self.buffer = []
+        self.buffer_index = 0
+
+    def with_rng(self, rng: numpy.random.Generator) -> "RandomVariable":
+        """Returns a copy that draws from `rng`, starting with an empty buffer."""
+        rv = copy.copy(self)
+        rv.rng = rng
+        rv.buffer = []
+        rv.buffer_index = 0
+        return rv
+
+    def sample_n(self, n: int) -> numpy.ndarray:
+        raise NotImplementedError
+
+    def sample(self) -> float:
+        # Variates are generated `buffer_size` at a time, so a single sample
+        # is a list lookup except once per block.
+        if self.buffer_index == len(self.buffer):
+            self.buffer = self.sample_n(self.buffer_size).tolist()
+            self.buffer_index = 0
+
+        x = self.buffer[self.buffer_index]
+        self.buffer_index += 1
+        return x
 
 
 class Normal(RandomVariable):
-    def __init__(self, mu: float, sigma: float):
-        super().__init__(min_value=-numpy.inf, max_value=numpy.inf)
+    def __init__(self, mu: float, sigma: float, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(min_value=-numpy.inf, max_value=numpy.inf, buffer_size=buffer_size)
 
         self.mu = mu
         self.sigma = sigma
@@ -33,11 +85,18 @@ class Normal(RandomVariable):
     def mean(self) -> float:
         return self.mu
 
-    def sample(self) -> float:
-        return self.dist.rvs(size=1)[0]
+    def sample_n(self, n: int) -> numpy.ndarray:
+        return self.rng.normal(self.mu, self.sigma, size=n)
 
 
 class TruncatedNormal(RandomVariable):
+    """Normal(mu, sigma) truncated to [0, mu + 10 * sigma].
+
+    cdf, tail_prob and the moments are computed in closed form, and sampling
+    goes through `sample_truncated_normal()`, so constructing one is cheap
+    enough to do per decision.
+    """
+
     def __init__(self, mu: float, sigma: float):
         super().__init__(min_value=0, max_value=numpy.inf)
 
@@ -46,9 +105,11 @@ class TruncatedNormal(RandomVariable):
 
         lower, upper = 0, mu + 10 * sigma
         self.max_value = upper
-        self.dist = scipy.stats.truncnorm(
-            a=(lower - mu) / sigma, b=(upper - mu) / sigma, loc=mu, scale=sigma
-        )
+        self.a = (lower - mu) / sigma
+        self.b = (upper - mu) / sigma
+        self.cdf_a = std_normal_cdf(self.a)
+        self.cdf_b = std_normal_cdf(self.b)
+        self.Z = self.cdf_b - self.cdf_a
 
     def __repr__(self):
         return f"TruncatedNormal(mu= {self.mu}, sigma= {self.sigma})"
@@ -57,24 +118,95 @@ class TruncatedNormal(RandomVariable):
         return r"N^+({}, {})".format(self.mu, self.sigma)
 
     def cdf(self, x: float) -> float:
-        return self.dist.cdf(x)
+        if x <= self.min_value:
+            return 0
+        elif x >= self.max_value:
+            return 1
+
+        return (std_normal_cdf((x - self.mu) / self.sigma) - self.cdf_a) / self.Z
 
     def tail_prob(self, x: float) -> float:
-        return 1 - self.cdf(x)
+        if x <= self.min_value:
+            return 1
+        elif x >= self.max_value:
+            return 0
+
+        return (self.cdf_b - std_normal_cdf((x - self.mu) / self.sigma)) / self.Z
 
     def mean(self) -> float:
-        return self.dist.mean()
+        return self.mu + self.sigma * (std_normal_pdf(self.a) - std_normal_pdf(self.b)) / self.Z
 
     def std(self) -> float:
-        return self.dist.std()
+        pdf_a, pdf_b = std_normal_pdf(self.a), std_normal_pdf(self.b)
+        var = 1 + (self.a * pdf_a - self.b * pdf_b) / self.Z - ((pdf_a - pdf_b) / self.Z) ** 2
+        return self.sigma * math.sqrt(var)
 
-    def sample(self) -> float:
-        return self.dist.rvs(size=1)[0]
+    def sample(self, n: int = None) -> float | numpy.ndarray:
+        """Returns a single sample, or an array of `n` samples if `n` is given."""
+        if n is None:
+            if self.a > 0:
+                return float(sample_truncated_normal(mu=self.mu, sigma=self.sigma, rng=self.rng))
+
+            u = self.cdf_a + self.rng.random() * self.Z
+            return self.mu + self.sigma * float(scipy.special.ndtri(u))
+
+        return sample_truncated_normal(mu=self.mu, sigma=self.sigma, num_samples=n, rng=self.rng)
+
+    def sample_n(self, n: int) -> numpy.ndarray:
+        return self.sample(n=n)
+
+
+def std_normal_pdf(x: float) -> float:
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+
+def std_normal_cdf(x: float) -> float:
+    # Same as `scipy.special.ndtr()` but without the ufunc overhead on scalars.
+    return math.erfc(-x / math.sqrt(2)) / 2
+
+
+def sample_truncated_normal(
+    mu: numpy.ndarray,
+    sigma: numpy.ndarray,
+    num_samples: int = None,
+    rng: numpy.random.Generator = None,
+) -> numpy.ndarray:
+    """Draws from `TruncatedNormal(mu[i], sigma[i])` for every i in a single
+    vectorized inverse-CDF pass, i.e., without building a scipy distribution
+    per (mu, sigma) pair.
+
+    Returns an array of shape `mu.shape`, or `(num_samples,) + mu.shape` if
+    `num_samples` is given. `sigma = 0` is treated as a point mass at `mu`.
+    """
+    if rng is None:
+        rng = default_rng
+
+    mu = numpy.asarray(mu, dtype=float)
+    sigma = numpy.asarray(sigma, dtype=float)
+    shape = mu.shape if num_samples is None else (num_samples,) + mu.shape
+
+    # Same support as `TruncatedNormal`: [0, mu + 10 * sigma]. Entries with
+    # `sigma = 0` go through the math below as inf/nan and are masked out.
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        a = -mu / sigma
+        b = 10.0
+
+        # Invert the CDF on the side of the standard normal where `a` lies so
+        # that `ndtr` does not lose all precision to 1 for large `a`.
+        flip = a > 0
+        a_ = numpy.where(flip, -b, a)
+        b_ = numpy.where(flip, -a, b)
+        cdf_a = scipy.special.ndtr(a_)
+        cdf_b = scipy.special.ndtr(b_)
+        z = scipy.special.ndtri(cdf_a + rng.random(shape) * (cdf_b - cdf_a))
+        z = numpy.where(flip, -z, z)
+
+        return numpy.where(sigma > 0, mu + sigma * z, numpy.maximum(mu, 0))
 
 
 class Exponential(RandomVariable):
-    def __init__(self, mu: float, D: float = 0):
-        super().__init__(min_value=D, max_value=numpy.inf)
+    def __init__(self, mu: float, D: float = 0, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(min_value=D, max_value=numpy.inf, buffer_size=buffer_size)
         self.D = D
         self.mu = mu
 
@@ -119,26 +251,27 @@ class Exponential(RandomVariable):
 
         return self.mu / (s + self.mu)
 
-    def sample(self) -> float:
-        return self.D + random.expovariate(self.mu)
+    def sample_n(self, n: int) -> numpy.ndarray:
+        return self.D + self.rng.exponential(1 / self.mu, size=n)
 
 
 class Uniform(RandomVariable):
-    def __init__(self, min_value: float, max_value: float):
-        super().__init__(min_value=min_value, max_value=max_value)
-
-        self.dist = scipy.stats.uniform(loc=min_value, scale=max_value - min_value)
+    def __init__(self, min_value: float, max_value: float, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(min_value=min_value, max_value=max_value, buffer_size=buffer_size)
 
     def __repr__(self):
         return f"Uniform({self.min_value}, {self.max_value})"
 
-    def sample(self) -> float:
-        return self.dist.rvs()
+    def mean(self) -> float:
+        return (self.max_value + self.min_value) / 2
+
+    def sample_n(self, n: int) -> numpy.ndarray:
+        return self.rng.uniform(self.min_value, self.max_value, size=n)
 
 
 class DiscreteUniform(RandomVariable):
-    def __init__(self, min_value: float, max_value: float):
-        super().__init__(min_value=min_value, max_value=max_value)
+    def __init__(self, min_value: float, max_value: float, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(min_value=min_value, max_value=max_value, buffer_size=buffer_size)
 
         self.value_list = numpy.arange(self.min_value, self.max_value + 1)
         weight_list = [1 for _ in self.value_list]
@@ -172,13 +305,18 @@ class DiscreteUniform(RandomVariable):
     def moment(self, i: int) -> float:
         return self.dist.moment(i)
 
-    def sample(self) -> float:
-        return self.dist.rvs()  # [0]
+    def sample_n(self, n: int) -> numpy.ndarray:
+        return self.rng.choice(self.value_list, size=n)
 
 
 class CustomDiscrete(RandomVariable):
-    def __init__(self, value_list: list[float], prob_weight_list: list[float]):
-        super().__init__(min_value=min(value_list), max_value=max(value_list))
+    def __init__(
+        self,
+        value_list: list[float],
+        prob_weight_list: list[float],
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        super().__init__(min_value=min(value_list), max_value=max(value_list), buffer_size=buffer_size)
         self.value_list = value_list
         self.prob_weight_list = prob_weight_list
 
@@ -195,18 +333,21 @@ class CustomDiscrete(RandomVariable):
             ")"
         )
 
-    def sample(self) -> float:
-        return self.dist.rvs()
+    def mean(self) -> float:
+        return sum(value * prob for value, prob in zip(self.value_list, self.prob_list))
+
+    def sample_n(self, n: int) -> numpy.ndarray:
+        return self.rng.choice(self.value_list, size=n, p=self.prob_list)
 
 
 class BoundedZipf(RandomVariable):
-    def __init__(self, min_value, max_value, a=1):
-        super().__init__(min_value=min_value, max_value=max_value)
+    def __init__(self, min_value, max_value, a=1, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(min_value=min_value, max_value=max_value, buffer_size=buffer_size)
         self.a = a
 
         self.value_list = numpy.arange(self.min_value, self.max_value + 1)
         weight_list = [float(value) ** (-a) for value in self.value_list]
-        self.prob_list = [weight / sum(weight_l) for weight in weight_list]
+        self.prob_list = [weight / sum(weight_list) for weight in weight_list]
         self.dist = scipy.stats.rv_discrete(
             name="bounded_zipf", values=(self.value_list, self.prob_list)
         )
@@ -233,5 +374,5 @@ class BoundedZipf(RandomVariable):
     def mean(self) -> float:
         return self.dist.mean()
 
-    def sample(self) -> float:
-        return self.dist.rvs(size=1)[0]
+    def sample_n(self, n: int) -> numpy.ndarray:
+        return self.rng.choice(self.value_list, size=n, p=self.prob_list)
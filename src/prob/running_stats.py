@@ -0,0 +1,124 @@
+import math
+import numpy
+
+
+class RunningStats:
+    """Welford accumulator for the mean and (population) variance of a
+    stream of values, with support for exact removal of a previously added
+    value so that it can back a sliding window.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._mean = 0.0
+        self.m2 = 0.0
+
+    def __repr__(self):
+        return f"RunningStats(count= {self.count}, mean= {self.mean()}, stdev= {self.stdev()})"
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self.m2 += delta * (x - self._mean)
+
+    def remove(self, x: float):
+        if self.count <= 1:
+            self.reset()
+            return
+
+        mean_prev = self._mean
+        self.count -= 1
+        self._mean = (mean_prev * (self.count + 1) - x) / self.count
+        self.m2 -= (x - mean_prev) * (x - self._mean)
+
+    def add_array(self, x_array: numpy.ndarray):
+        if len(x_array) == 0:
+            return
+
+        mean = numpy.mean(x_array)
+        self._merge_moments(count=len(x_array), mean=float(mean), m2=float(numpy.sum((x_array - mean)**2)))
+
+    def merge(self, other: "RunningStats"):
+        """Adds the values summarized in `other`, with the pairwise update of
+        Chan et al., so that the result is the same as if they were added one
+        by one.
+        """
+        self._merge_moments(count=other.count, mean=other._mean, m2=other.m2)
+
+    def _merge_moments(self, count: int, mean: float, m2: float):
+        if count == 0:
+            return
+
+        count_total = self.count + count
+        delta = mean - self._mean
+        self.m2 += m2 + delta**2 * self.count * count / count_total
+        self._mean += delta * count / count_total
+        self.count = count_total
+
+    def reset(self, value_list: list[float] = ()):
+        self.count = 0
+        self._mean = 0.0
+        self.m2 = 0.0
+        for x in value_list:
+            self.add(x)
+
+    def mean(self) -> float:
+        return self._mean
+
+    def var(self) -> float:
+        # Cancellation in `remove()` can leave a tiny negative residue in
+        # `m2` when the values left are all equal. A tiny positive residue is
+        # returned as is, since a threshold on it would also zero out small
+        # real variances; the users of `remove()` recompute `m2` exactly from
+        # their window once in a while.
+        if self.count == 0 or self.m2 <= 0:
+            return 0.0
+
+        return self.m2 / self.count
+
+    def stdev(self) -> float:
+        return math.sqrt(self.var())
+
+
+class StreamStats(RunningStats):
+    """`RunningStats` that also tracks the min and max, for a stream that is
+    only added to (or merged with) and never removed from.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.min_value = math.inf
+        self.max_value = -math.inf
+
+    def __repr__(self):
+        return (
+            f"StreamStats(count= {self.count}, mean= {self.mean()}, stdev= {self.stdev()}, "
+            f"min_value= {self.min_value}, max_value= {self.max_value})"
+        )
+
+    def add(self, x: float):
+        super().add(x)
+        if x < self.min_value:
+            self.min_value = x
+        if x > self.max_value:
+            self.max_value = x
+
+    def add_array(self, x_array: numpy.ndarray):
+        super().add_array(x_array)
+        if len(x_array):
+            self.min_value = min(self.min_value, float(numpy.min(x_array)))
+            self.max_value = max(self.max_value, float(numpy.max(x_array)))
+
+    def remove(self, x: float):
+        raise NotImplementedError("StreamStats can not remove values")
+
+    def merge(self, other: "StreamStats"):
+        super().merge(other)
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+    def reset(self, value_list: list[float] = ()):
+        self.min_value = math.inf
+        self.max_value = -math.inf
+        super().reset(value_list)
@@ -0,0 +1,236 @@
+"""On-disk cache of simulation results, keyed by a hash of the simulation
+config and of the source code under `src/`, so that a result is reused
+only if neither has changed.
+
+Entries are npz files of the arrays that summarize a result, and the
+least recently used ones are evicted once the cache exceeds its size.
+
+Usage:
+    python -m src.sim.cache info
+    python -m src.sim.cache clear
+"""
+import argparse
+import dataclasses
+import functools
+import hashlib
+import json
+import numpy
+import os
+import pathlib
+import tempfile
+import zipfile
+
+from typing import Any
+
+from src.utils.debug import *
+
+
+DEFAULT_CACHE_DIR = os.environ.get("SIM_CACHE_DIR", ".sim_cache")
+DEFAULT_MAX_SIZE_BYTES = int(os.environ.get("SIM_CACHE_MAX_SIZE_MB", "1024")) * 2**20
+# Eviction frees up space down to this fraction of the max size, so that it
+# is not needed again on the next few writes.
+EVICT_TO_FRACTION = 0.9
+
+SRC_DIR = pathlib.Path(__file__).resolve().parents[1]
+
+# Attributes that hold the random state or derived objects rather than the
+# parameters of a random variable or an agent.
+ATTR_TO_SKIP_SET = {"rng", "buffer", "buffer_index", "dist"}
+
+
+class UncacheableConfig(Exception):
+    pass
+
+
+@functools.cache
+def code_version() -> str:
+    """Returns a hash of the source files under `src/`."""
+    hasher = hashlib.sha256()
+    for path in sorted(SRC_DIR.rglob("*.py")):
+        hasher.update(str(path.relative_to(SRC_DIR)).encode())
+        hasher.update(path.read_bytes())
+
+    return hasher.hexdigest()
+
+
+def to_key_obj(obj: Any) -> Any:
+    """Returns a JSON-serializable form of `obj` that only depends on its
+    parameters. Raises `UncacheableConfig` for objects that can not be
+    identified by their parameters, such as closures.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+
+    elif isinstance(obj, (list, tuple)):
+        return [to_key_obj(o) for o in obj]
+
+    elif isinstance(obj, dict):
+        return {str(k): to_key_obj(v) for k, v in sorted(obj.items())}
+
+    elif isinstance(obj, numpy.ndarray):
+        # Hashed rather than listed, and in chunks, as it may be a long task
+        # stream or a memory-mapped trace.
+        hasher = hashlib.sha256()
+        flat_array = obj.reshape(-1)
+        for i in range(0, len(flat_array), 2**20):
+            hasher.update(numpy.ascontiguousarray(flat_array[i : i + 2**20]).tobytes())
+        return {"ndarray": [str(obj.dtype), list(obj.shape), hasher.hexdigest()]}
+
+    elif isinstance(obj, numpy.generic):
+        return obj.item()
+
+    elif isinstance(obj, numpy.random.SeedSequence):
+        return {"SeedSequence": [str(obj.entropy), list(obj.spawn_key)]}
+
+    elif isinstance(obj, type):
+        return f"{obj.__module__}.{obj.__qualname__}"
+
+    elif callable(obj) and not dataclasses.is_dataclass(obj):
+        raise UncacheableConfig(f"Can not key on callable= {obj}")
+
+    elif hasattr(obj, "__dict__"):
+        return {
+            to_key_obj(type(obj)): {
+                k: to_key_obj(v) for k, v in sorted(vars(obj).items()) if k not in ATTR_TO_SKIP_SET
+            }
+        }
+
+    raise UncacheableConfig(f"Can not key on obj= {obj}")
+
+
+def get_key(config: dict[str, Any]) -> str | None:
+    """Returns the cache key for `config`, or None if it can not be cached,
+    e.g., because it has no seed (so its result is not reproducible), the
+    agent is given as a closure rather than an `AgentSpec`, or the run
+    writes a task record file that a cached result would not.
+    """
+    if config.get("seed") is None or config.get("task_record_path") is not None:
+        return None
+
+    try:
+        key_obj = to_key_obj(config)
+    except UncacheableConfig as e:
+        log(DEBUG, "Not caching", e=e)
+        return None
+
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps(key_obj, sort_keys=True).encode())
+    hasher.update(code_version().encode())
+    return hasher.hexdigest()
+
+
+class Cache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+
+        # Size of the entries as of the last scan of `cache_dir`, plus the
+        # sizes of the entries written since. The entries written by other
+        # processes are only counted at the next scan, which is done when the
+        # estimate goes over `max_size_bytes`.
+        self.size_bytes_estimate = None
+
+    def __repr__(self):
+        return f"Cache(cache_dir= {self.cache_dir}, max_size_bytes= {self.max_size_bytes})"
+
+    def path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def path_list(self) -> list[pathlib.Path]:
+        if not self.cache_dir.exists():
+            return []
+
+        return list(self.cache_dir.glob("*.npz"))
+
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.path_list())
+
+    def get(self, key: str) -> dict[str, numpy.ndarray] | None:
+        path = self.path(key)
+        try:
+            with numpy.load(path) as npz_file:
+                array_dict = dict(npz_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile) as e:
+            # A corrupt entry, e.g., left by a copy or a write interrupted
+            # outside of `put()`, is a miss.
+            log(WARNING, "Removing corrupt entry", path=path, e=e)
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark as recently used for eviction.
+        os.utime(path)
+        return array_dict
+
+    def put(self, key: str, array_dict: dict[str, numpy.ndarray]):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Written to a temp file and renamed, so that concurrent workers never
+        # read a partially written entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                numpy.savez(f, **array_dict)
+            size_bytes = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            pathlib.Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        if self.size_bytes_estimate is None:
+            self.size_bytes_estimate = self.size_bytes()
+        else:
+            self.size_bytes_estimate += size_bytes
+
+        # Scans the entries only when they may not fit anymore, rather than on
+        # every write.
+        if self.size_bytes_estimate > self.max_size_bytes:
+            self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in
+        `EVICT_TO_FRACTION * max_size_bytes`.
+        """
+        path_and_stat_list = []
+        for path in self.path_list():
+            try:
+                path_and_stat_list.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+
+        size_bytes = sum(stat.st_size for _, stat in path_and_stat_list)
+        path_and_stat_list.sort(key=lambda path_and_stat: path_and_stat[1].st_mtime)
+        for path, stat in path_and_stat_list:
+            if size_bytes <= EVICT_TO_FRACTION * self.max_size_bytes:
+                break
+
+            path.unlink(missing_ok=True)
+            size_bytes -= stat.st_size
+
+        self.size_bytes_estimate = size_bytes
+
+    def clear(self) -> int:
+        """Removes all entries and returns the number removed."""
+        path_list = self.path_list()
+        for path in path_list:
+            path.unlink(missing_ok=True)
+        self.size_bytes_estimate = None
+
+        return len(path_list)
+
+
+default_cache = Cache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manages the on-disk cache of simulation results.")
+    parser.add_argument("command", choices=["info", "clear"])
+    parser.add_argument("--cache_dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    cache = Cache(cache_dir=args.cache_dir)
+    if args.command == "info":
+        log(INFO, f"{cache}: num_entries= {len(cache.path_list())}, size_bytes= {cache.size_bytes()}, code_version= {code_version()}")
+    elif args.command == "clear":
+        log(INFO, f"Removed {cache.clear()} entries from {cache.cache_dir}")
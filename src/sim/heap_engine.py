@@ -0,0 +1,244 @@
+"""Minimal discrete-event engine as an alternative to simpy, for the same
+topology of `Source` -> `Scheduler` -> `Server`s -> `Sink`.
+
+Events are (time, seq, callback, arg) entries in a heap, and nodes pass
+tasks to each other with direct method calls, so a task costs two heap
+operations (arrival and service completion) and no simpy events, stores or
+generator resumptions. `src.sys.scheduler.Scheduler` and the agents are
+used as they are.
+"""
+import collections
+import heapq
+import itertools
+
+from typing import Any, Callable
+
+from src.agent import (
+    agent,
+    exp as exp_module,
+)
+from src.prob import quantile_sketch, random_variable, running_stats
+from src.sys import (
+    node,
+    task as task_module,
+    task_stream as task_stream_module,
+)
+
+from src.utils.debug import *
+
+
+class Environment:
+    def __init__(self):
+        self.now = 0.0
+        self.event_heap = []
+        self.seq_counter = itertools.count()
+        self.stopped = False
+
+    def __repr__(self):
+        return f"Environment(now= {self.now}, num_events= {len(self.event_heap)})"
+
+    def schedule(self, delay: float, callback: Callable[[Any], None], arg: Any = None):
+        """Calls `callback(arg)` after `delay`. Events at the same time are
+        processed in the order they are scheduled.
+        """
+        heapq.heappush(self.event_heap, (self.now + delay, next(self.seq_counter), callback, arg))
+
+    def stop(self):
+        self.stopped = True
+
+    def run(self):
+        """Processes the events until there are none left or `stop()` is called."""
+        event_heap = self.event_heap
+        heappop = heapq.heappop
+        while event_heap and not self.stopped:
+            self.now, _, callback, arg = heappop(event_heap)
+            callback(arg)
+
+
+class Source(node.Node):
+    def __init__(
+        self,
+        env: Environment,
+        _id: str,
+        inter_task_gen_time_rv: random_variable.RandomVariable,
+        task_service_time_rv: random_variable.RandomVariable,
+        next_hop: node.Node,
+        task_batch_size_rv: random_variable.RandomVariable = None,
+        task_stream: task_stream_module.TaskStream = None,
+    ):
+        super().__init__(env=env, _id=_id)
+        self.inter_task_gen_time_rv = inter_task_gen_time_rv
+        self.task_service_time_rv = task_service_time_rv
+        self.next_hop = next_hop
+        self.task_batch_size_rv = task_batch_size_rv
+        self.task_stream = task_stream
+
+        self.task_id = 0
+        if self.task_stream is None:
+            self.env.schedule(self.inter_task_gen_time_rv.sample(), self.send_tasks)
+        else:
+            self.task_iter = iter(self.task_stream)
+            self.schedule_next_task_from_stream()
+
+    def __repr__(self):
+        return f"Source(id= {self._id})"
+
+    def send_tasks(self, _=None):
+        num_tasks = 1 if self.task_batch_size_rv is None else int(self.task_batch_size_rv.sample())
+        task_list = []
+        for _ in range(num_tasks):
+            task_list.append(
+                task_module.Task(
+                    _id=self.task_id,
+                    service_time=self.task_service_time_rv.sample(),
+                    arrival_time=self.env.now,
+                )
+            )
+            self.task_id += 1
+
+        slog(DEBUG, self.env, self, "sending", task_list=task_list)
+        if self.task_batch_size_rv is None:
+            self.next_hop.put(task_list[0])
+        elif task_list:
+            self.next_hop.put(task_list)
+
+        self.env.schedule(self.inter_task_gen_time_rv.sample(), self.send_tasks)
+
+    def schedule_next_task_from_stream(self):
+        arrival_and_service_time = next(self.task_iter, None)
+        if arrival_and_service_time is not None:
+            arrival_time, _ = arrival_and_service_time
+            self.env.schedule(max(arrival_time - self.env.now, 0), self.send_task_from_stream, arrival_and_service_time)
+
+    def send_task_from_stream(self, arrival_and_service_time: tuple[float, float]):
+        task = task_module.Task(
+            _id=self.task_id,
+            service_time=arrival_and_service_time[1],
+            arrival_time=self.env.now,
+        )
+        self.task_id += 1
+
+        slog(DEBUG, self.env, self, "sending", task=task)
+        self.next_hop.put(task)
+        self.schedule_next_task_from_stream()
+
+
+class Server(node.Node):
+    def __init__(
+        self,
+        env: Environment,
+        _id: str,
+        sink: node.Node = None,
+    ):
+        super().__init__(env=env, _id=_id)
+        self.sink = sink
+
+        self.task_in_serv = None
+        self.serv_start_time = None
+        self.task_queue = collections.deque()
+        self.queued_work = 0
+
+    def __repr__(self):
+        return f"Server(id= {self._id})"
+
+    def repr_w_state(self):
+        return (
+            "Server( \n"
+            f"\t num_tasks_left= {self.num_tasks_left()} \n"
+            f"\t work_left= {self.work_left()} \n"
+            ")"
+        )
+
+    def num_tasks_left(self) -> int:
+        return len(self.task_queue) + int(self.task_in_serv is not None)
+
+    def work_left(self) -> float:
+        remaining_serv_time = 0
+        if self.task_in_serv:
+            remaining_serv_time = self.task_in_serv.service_time - (self.env.now - self.serv_start_time)
+
+        return remaining_serv_time + self.queued_work
+
+    def put(self, task: task_module.Task):
+        slog(DEBUG, self.env, self, "recved", task=task)
+
+        task.node_id = self._id
+        if self.task_in_serv is None:
+            self.start_serv(task)
+        else:
+            self.task_queue.append(task)
+            self.queued_work += task.service_time
+
+        self.notify_state_listeners()
+
+    def start_serv(self, task: task_module.Task):
+        self.task_in_serv = task
+        self.serv_start_time = self.env.now
+        self.env.schedule(task.service_time, self.finish_serv)
+
+    def finish_serv(self, _=None):
+        slog(DEBUG, self.env, self, "processed", task_in_serv=self.task_in_serv)
+
+        self.sink.put(self.task_in_serv)
+        self.task_in_serv = None
+        if self.task_queue:
+            task = self.task_queue.popleft()
+            if self.task_queue:
+                self.queued_work -= task.service_time
+            else:
+                # Reset rather than subtract to not accumulate rounding error
+                self.queued_work = 0
+
+            self.start_serv(task)
+
+        self.notify_state_listeners()
+
+
+class Sink(node.Node):
+    def __init__(
+        self,
+        env: Environment,
+        _id: str,
+        sching_agent: agent.SchingAgent = None,
+        num_tasks_to_recv: int = None,
+    ):
+        super().__init__(env=env, _id=_id)
+        self.sching_agent = sching_agent
+        self.num_tasks_to_recv = num_tasks_to_recv
+
+        self.num_tasks_recved = 0
+        self.response_time_stats = running_stats.StreamStats()
+        self.response_time_sketch = quantile_sketch.QuantileSketch()
+        # If set, called with each response time, and the sink stops
+        # receiving tasks once it returns True.
+        self.response_time_listener = None
+        # If set, records each task received.
+        self.task_recorder = None
+
+    def __repr__(self):
+        return f"Sink(id= {self._id})"
+
+    def put(self, task: task_module.Task):
+        self.num_tasks_recved += 1
+        slog(DEBUG, self.env, self, "recved", task=task, num_tasks_recved=self.num_tasks_recved)
+
+        if self.task_recorder:
+            self.task_recorder.record(task=task, completion_time=self.env.now)
+
+        if self.sching_agent:
+            response_time = self.env.now - task.arrival_time
+            self.response_time_stats.add(response_time)
+            self.response_time_sketch.add(response_time)
+
+            if isinstance(self.sching_agent, agent.SchingAgent_wOnlineLearning):
+                exp = exp_module.get_exp(time_epoch=self.env.now, task=task)
+                self.sching_agent.record_exp(node_id=task.node_id, exp=exp)
+
+            if self.response_time_listener and self.response_time_listener(response_time):
+                slog(DEBUG, self.env, self, "stopped by response_time_listener", num_tasks_recved=self.num_tasks_recved)
+                self.env.stop()
+                return
+
+        if self.num_tasks_recved >= self.num_tasks_to_recv:
+            slog(DEBUG, self.env, self, "recved requested # tasks", num_tasks_recved=self.num_tasks_recved)
+            self.env.stop()
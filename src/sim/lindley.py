@@ -0,0 +1,148 @@
+"""Simulation without an event loop, for the agents whose decisions do not
+depend on the state of the nodes (`SchingAgent.state_independent`).
+
+The tasks and their assignments are then drawn up front, and each server
+is a FCFS queue whose departure times follow the Lindley recursion
+
+    D_n = max(D_{n-1}, A_n) + S_n,
+
+which unrolls into a running max over NumPy arrays
+
+    D_n = C_n + max_{k <= n} (A_k - C_{k-1}),  C_n = S_1 + ... + S_n.
+"""
+import numpy
+
+from src.agent import agent as agent_module
+from src.prob import random_variable
+from src.sys import node as node_module
+
+from src.utils.debug import *
+
+
+class StatelessNode(node_module.Node):
+    """Node given to the agents, whose state is not simulated: an agent
+    that reads it is not state-independent.
+    """
+
+    def __init__(self, _id: str):
+        super().__init__(env=None, _id=_id)
+
+    def __repr__(self):
+        return f"StatelessNode(id= {self._id})"
+
+    def num_tasks_left(self):
+        raise ValueError(f"The state of {self} is not simulated with backend= lindley")
+
+    def work_left(self):
+        raise ValueError(f"The state of {self} is not simulated with backend= lindley")
+
+
+def departure_times(arrival_time_array: numpy.ndarray, service_time_array: numpy.ndarray) -> numpy.ndarray:
+    """Returns the departure times of the tasks at a FCFS queue, given their
+    arrival times in increasing order.
+    """
+    cum_service_time_array = numpy.cumsum(service_time_array)
+    return cum_service_time_array + numpy.maximum.accumulate(
+        arrival_time_array - (cum_service_time_array - service_time_array)
+    )
+
+
+def sample_tasks(
+    num_tasks: int,
+    start_time: float,
+    inter_task_gen_time_rv: random_variable.RandomVariable,
+    task_service_time_rv: random_variable.RandomVariable,
+    task_batch_size_rv: random_variable.RandomVariable = None,
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Returns the arrival and service times of the next (at least)
+    `num_tasks` tasks generated after `start_time`, as `Source` would.
+    """
+    if task_batch_size_rv is None:
+        arrival_time_array = start_time + numpy.cumsum(inter_task_gen_time_rv.sample_n(num_tasks))
+
+    else:
+        arrival_time_list = []
+        num_tasks_sampled = 0
+        while num_tasks_sampled < num_tasks:
+            n = max(num_tasks - num_tasks_sampled, 16)
+            batch_arrival_time_array = start_time + numpy.cumsum(inter_task_gen_time_rv.sample_n(n))
+            batch_size_array = task_batch_size_rv.sample_n(n).astype(int)
+            arrival_time_list.append(numpy.repeat(batch_arrival_time_array, batch_size_array))
+
+            start_time = batch_arrival_time_array[-1]
+            num_tasks_sampled += len(arrival_time_list[-1])
+
+        arrival_time_array = numpy.concatenate(arrival_time_list)
+
+    return arrival_time_array, task_service_time_rv.sample_n(len(arrival_time_array)).astype(float)
+
+
+def get_response_time_array(
+    num_servers: int,
+    inter_task_gen_time_rv: random_variable.RandomVariable,
+    task_service_time_rv: random_variable.RandomVariable,
+    num_tasks_to_recv: int,
+    sching_agent: agent_module.SchingAgent,
+    task_batch_size_rv: random_variable.RandomVariable = None,
+) -> numpy.ndarray:
+    """Returns the response times of the first `num_tasks_to_recv` tasks to
+    finish, which are the ones `Sink` records in `sim.sim()`.
+
+    Tasks are drawn in chunks until the last one arrives after the
+    `num_tasks_to_recv`-th departure, so that no task still to arrive could
+    finish earlier. Adding tasks does not change the departure times of the
+    earlier ones, so each chunk only needs the last departure time at each
+    server from the previous chunks.
+    """
+    check(sching_agent.state_independent, f"Agent is not state-independent: {sching_agent}")
+
+    arrival_time_list, departure_time_list = [], []
+    last_departure_time_array = numpy.zeros(num_servers)
+    num_tasks_sampled = 0
+    start_time = 0
+    while True:
+        arrival_time_array, service_time_array = sample_tasks(
+            num_tasks=max(num_tasks_to_recv, num_tasks_sampled),
+            start_time=start_time,
+            inter_task_gen_time_rv=inter_task_gen_time_rv,
+            task_service_time_rv=task_service_time_rv,
+            task_batch_size_rv=task_batch_size_rv,
+        )
+        node_index_array = sching_agent.node_index_array_to_assign(len(arrival_time_array))
+
+        # Task indices grouped by node, in the order of arrival at each node.
+        task_index_array = numpy.argsort(node_index_array, kind="stable")
+        node_end_array = numpy.cumsum(numpy.bincount(node_index_array, minlength=num_servers))
+
+        departure_time_array = numpy.empty_like(arrival_time_array)
+        for node_index in range(num_servers):
+            node_start = node_end_array[node_index - 1] if node_index else 0
+            task_indices = task_index_array[node_start : node_end_array[node_index]]
+            if len(task_indices) == 0:
+                continue
+
+            # Starting each queue with a dummy task that departs at the last
+            # departure time from the earlier chunks.
+            departure_time_array_ = departure_times(
+                arrival_time_array=numpy.concatenate(([last_departure_time_array[node_index]], arrival_time_array[task_indices])),
+                service_time_array=numpy.concatenate(([0], service_time_array[task_indices])),
+            )[1:]
+            departure_time_array[task_indices] = departure_time_array_
+            last_departure_time_array[node_index] = departure_time_array_[-1]
+
+        arrival_time_list.append(arrival_time_array)
+        departure_time_list.append(departure_time_array)
+        num_tasks_sampled += len(arrival_time_array)
+        start_time = arrival_time_array[-1]
+
+        if num_tasks_sampled < num_tasks_to_recv:
+            continue
+
+        departure_time_array = numpy.concatenate(departure_time_list)
+        index_array = numpy.argpartition(departure_time_array, num_tasks_to_recv - 1)[:num_tasks_to_recv]
+        if start_time >= departure_time_array[index_array].max():
+            break
+
+        log(DEBUG, "Sampling more tasks", num_tasks_sampled=num_tasks_sampled)
+
+    return departure_time_array[index_array] - numpy.concatenate(arrival_time_list)[index_array]
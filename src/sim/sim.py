@@ -10,42 +10,126 @@ from src.sys import (
     server as server_module,
     sink as sink_module,
     source as source_module,
+    task_recorder as task_recorder_module,
+    task_stream as task_stream_module,
 )
 from src.agent import (
     agent as agent_module,
     ts as ts_module,
 )
-from src.prob import random_variable
+from src.prob import quantile_sketch, random_variable, running_stats
+from src.sim import (
+    cache as cache_module,
+    heap_engine,
+    lindley as lindley_module,
+    stopping as stopping_module,
+)
 
 from src.utils.debug import *
 
 
 @dataclasses.dataclass(repr=False)
 class SimResult:
-    t_l: list[float]
-
-    ET: float = None
-    std_T: float = None
+    """Summary of the task response times, accumulated as the tasks finish
+    so that a result takes constant memory regardless of the number of
+    tasks, and merging results costs O(1). Quantiles of the response time
+    are estimated from a sketch, within its relative accuracy (1%).
+    """
+    response_time_stats: running_stats.StreamStats = dataclasses.field(default_factory=running_stats.StreamStats)
+    response_time_sketch: quantile_sketch.QuantileSketch = dataclasses.field(default_factory=quantile_sketch.QuantileSketch)
 
     def __repr__(self):
         return (
             "SimResult( \n"
+            f"\t num_tasks= {self.num_tasks} \n"
             f"\t ET= {self.ET} \n"
             f"\t std_T= {self.std_T} \n"
+            f"\t min_T= {self.min_T} \n"
+            f"\t max_T= {self.max_T} \n"
+            f"\t p50_T= {self.quantile_T(0.5)} \n"
+            f"\t p95_T= {self.quantile_T(0.95)} \n"
+            f"\t p99_T= {self.quantile_T(0.99)} \n"
+            f"\t p999_T= {self.quantile_T(0.999)} \n"
             ")"
         )
 
-    def __post_init__(self):
-        self.ET = numpy.mean(self.t_l)
-        self.std_T = numpy.std(self.t_l)
+    @property
+    def num_tasks(self) -> int:
+        return self.response_time_stats.count
+
+    @property
+    def ET(self) -> float:
+        return self.response_time_stats.mean() if self.num_tasks else float("NaN")
+
+    @property
+    def std_T(self) -> float:
+        return self.response_time_stats.stdev() if self.num_tasks else float("NaN")
+
+    @property
+    def min_T(self) -> float:
+        return self.response_time_stats.min_value
+
+    @property
+    def max_T(self) -> float:
+        return self.response_time_stats.max_value
+
+    def quantile_T(self, q: float) -> float:
+        return self.response_time_sketch.quantile(q)
+
+    def percentile_T(self, p: float) -> float:
+        return self.quantile_T(p / 100)
+
+    def add(self, response_time: float):
+        self.response_time_stats.add(response_time)
+        self.response_time_sketch.add(response_time)
+
+    def add_array(self, response_time_array: numpy.ndarray):
+        self.response_time_stats.add_array(response_time_array)
+        self.response_time_sketch.add_array(response_time_array)
+
+    def merge(self, other: "SimResult"):
+        self.response_time_stats.merge(other.response_time_stats)
+        self.response_time_sketch.merge(other.response_time_sketch)
+
+    def to_array_dict(self) -> dict[str, numpy.ndarray]:
+        stats, sketch = self.response_time_stats, self.response_time_sketch
+        bucket_list = sorted(sketch.bucket_to_count_map)
+        return dict(
+            stats=numpy.array([stats.count, stats._mean, stats.m2, stats.min_value, stats.max_value]),
+            sketch_params=numpy.array([sketch.relative_accuracy, sketch.min_value, sketch.max_num_buckets, sketch.zero_count, sketch.count]),
+            sketch_buckets=numpy.array(bucket_list, dtype=numpy.int64),
+            sketch_counts=numpy.array([sketch.bucket_to_count_map[bucket] for bucket in bucket_list], dtype=numpy.int64),
+        )
+
+    @classmethod
+    def from_array_dict(cls, array_dict: dict[str, numpy.ndarray]) -> "SimResult":
+        sim_result = cls()
+
+        stats = sim_result.response_time_stats
+        count, stats._mean, stats.m2, stats.min_value, stats.max_value = array_dict["stats"].tolist()
+        stats.count = int(count)
+
+        relative_accuracy, min_value, max_num_buckets, zero_count, count = array_dict["sketch_params"].tolist()
+        sketch = quantile_sketch.QuantileSketch(
+            relative_accuracy=relative_accuracy,
+            min_value=min_value,
+            max_num_buckets=int(max_num_buckets),
+        )
+        sketch.zero_count, sketch.count = int(zero_count), int(count)
+        sketch.bucket_to_count_map.update(
+            zip(array_dict["sketch_buckets"].tolist(), array_dict["sketch_counts"].tolist())
+        )
+        sim_result.response_time_sketch = sketch
+
+        return sim_result
 
 
 def combine_sim_results(sim_result_list: list[SimResult]) -> SimResult:
-    t_l = []
-    for sim_result in sim_result_list:
-        t_l.extend(sim_result.t_l)
+    sim_result = SimResult()
+    for sim_result_ in sim_result_list:
+        sim_result.merge(sim_result_)
 
-    return SimResult(t_l=t_l)
+    return sim_result
 
 
 def sim(
@@ -55,15 +139,168 @@ def sim(
     task_service_time_rv: random_variable.RandomVariable,
     num_tasks_to_recv: int,
     sching_agent_given_server_list: Callable[[list[server_module.Server]], agent_module.SchingAgent],
-    sim_result_list: list[SimResult] = None,
-):
+    task_batch_size_rv: random_variable.RandomVariable = None,
+    seed: int | numpy.random.SeedSequence = None,
+    backend: str = "simpy",
+    stopping_rule: stopping_module.StoppingRule = None,
+    task_stream: task_stream_module.TaskStream = None,
+    task_record_path: str = None,
+) -> SimResult:
+    """The random variables and the agent draw from their own generators,
+    spawned from `seed`, so a run is reproduced by passing the same `seed`.
+    A new seed is drawn from the OS if `seed` is None.
+
+    `backend` is one of
+    - "simpy": runs the system on `env`.
+    - "heap": runs the system on the event engine in `heap_engine`, which
+      is faster than simpy (`env` is not used).
+    - "lindley": computes the response times with the Lindley recursion in
+      `lindley`, without an event loop (`env` is not used). Only for the
+      agents that are `state_independent`.
+
+    If `stopping_rule` is given, the run stops as soon as the rule is met,
+    with `num_tasks_to_recv` as a cap on the number of tasks, and the
+    result only covers the tasks after the warm-up (see `stopping`). Not
+    supported with the "lindley" backend.
+
+    If `task_stream` is given, the tasks are replayed from it rather than
+    sampled from `inter_task_gen_time_rv`, `task_service_time_rv` and
+    `task_batch_size_rv`, which may then be None. The run ends when the
+    stream runs out, if that is before `num_tasks_to_recv`. Not supported
+    with the "lindley" backend.
+
+    If `task_record_path` is given, a record of each task that finishes is
+    written to it (see `task_recorder`), with the servers indexed in the
+    order of their ids "s0", "s1", ... Not supported with the "lindley"
+    backend.
+    """
     log(DEBUG, "Started",
         num_servers=num_servers,
         inter_task_gen_time_rv=inter_task_gen_time_rv,
         task_service_time_rv=task_service_time_rv,
         num_tasks_to_recv=num_tasks_to_recv,
+        seed=seed,
+        backend=backend,
     )
 
+    (
+        inter_task_gen_time_rng,
+        task_service_time_rng,
+        task_batch_size_rng,
+        sching_agent_rng,
+    ) = random_variable.spawn_rngs(seed=seed, n=4)
+    if inter_task_gen_time_rv is not None:
+        inter_task_gen_time_rv = inter_task_gen_time_rv.with_rng(inter_task_gen_time_rng)
+    if task_service_time_rv is not None:
+        task_service_time_rv = task_service_time_rv.with_rng(task_service_time_rng)
+    if task_batch_size_rv is not None:
+        task_batch_size_rv = task_batch_size_rv.with_rng(task_batch_size_rng)
+
+    if backend == "lindley":
+        # Checked before the agent is built, which may read the state of the
+        # nodes, when the agent class is known, e.g., from an `AgentSpec`.
+        agent_class = getattr(sching_agent_given_server_list, "agent_class", None)
+        if agent_class is not None and not agent_class.state_independent:
+            raise ValueError(f"{agent_class.__name__} is not state-independent, so it can not be run with backend= lindley")
+
+    check(task_stream is None or backend != "lindley", "task_stream is not supported with the lindley backend")
+    if task_stream is not None:
+        num_tasks_to_recv = min(num_tasks_to_recv, len(task_stream))
+
+    stopper = None
+    if stopping_rule is not None:
+        check(backend != "lindley", "stopping_rule is not supported with the lindley backend")
+        stopper = stopping_module.Stopper(stopping_rule=stopping_rule)
+
+    task_recorder = None
+    if task_record_path is not None:
+        check(backend != "lindley", "task_record_path is not supported with the lindley backend")
+        task_recorder = task_recorder_module.TaskRecorder(
+            path=task_record_path,
+            node_id_list=[f"s{i}" for i in range(num_servers)],
+        )
+
+    # The task records are closed, so that the ones so far are in the file,
+    # even if the run fails or is interrupted.
+    try:
+        if backend == "simpy":
+            sim_result = sim_w_simpy(
+                env=env,
+                num_servers=num_servers,
+                inter_task_gen_time_rv=inter_task_gen_time_rv,
+                task_service_time_rv=task_service_time_rv,
+                num_tasks_to_recv=num_tasks_to_recv,
+                sching_agent_given_server_list=sching_agent_given_server_list,
+                sching_agent_rng=sching_agent_rng,
+                task_batch_size_rv=task_batch_size_rv,
+                response_time_listener=stopper.add if stopper else None,
+                task_stream=task_stream,
+                task_recorder=task_recorder,
+            )
+
+        elif backend == "heap":
+            sim_result = sim_w_heap_engine(
+                num_servers=num_servers,
+                inter_task_gen_time_rv=inter_task_gen_time_rv,
+                task_service_time_rv=task_service_time_rv,
+                num_tasks_to_recv=num_tasks_to_recv,
+                sching_agent_given_server_list=sching_agent_given_server_list,
+                sching_agent_rng=sching_agent_rng,
+                task_batch_size_rv=task_batch_size_rv,
+                response_time_listener=stopper.add if stopper else None,
+                task_stream=task_stream,
+                task_recorder=task_recorder,
+            )
+
+        elif backend == "lindley":
+            node_list = [lindley_module.StatelessNode(_id=f"s{i}") for i in range(num_servers)]
+            sching_agent = sching_agent_given_server_list(server_list=node_list)
+            if not sching_agent.state_independent:
+                raise ValueError(f"{sching_agent.__class__.__name__} is not state-independent, so it can not be run with backend= lindley")
+            sching_agent.set_rng(sching_agent_rng)
+
+            sim_result = SimResult()
+            sim_result.add_array(
+                lindley_module.get_response_time_array(
+                    num_servers=num_servers,
+                    inter_task_gen_time_rv=inter_task_gen_time_rv,
+                    task_service_time_rv=task_service_time_rv,
+                    num_tasks_to_recv=num_tasks_to_recv,
+                    sching_agent=sching_agent,
+                    task_batch_size_rv=task_batch_size_rv,
+                )
+            )
+
+        else:
+            raise ValueError(f"Unknown backend= {backend}")
+
+    finally:
+        if task_recorder:
+            task_recorder.close()
+
+    if stopper:
+        log(INFO, "Stopped", stopper=stopper)
+        response_time_stats, response_time_sketch = stopper.steady_state_stats_and_sketch()
+        sim_result = SimResult(response_time_stats=response_time_stats, response_time_sketch=response_time_sketch)
+
+    log(INFO, "Done", sim_result=sim_result)
+
+    return sim_result
+
+
+def sim_w_simpy(
+    env: simpy.Environment,
+    num_servers: int,
+    inter_task_gen_time_rv: random_variable.RandomVariable,
+    task_service_time_rv: random_variable.RandomVariable,
+    num_tasks_to_recv: int,
+    sching_agent_given_server_list: Callable[[list[server_module.Server]], agent_module.SchingAgent],
+    sching_agent_rng: numpy.random.Generator,
+    task_batch_size_rv: random_variable.RandomVariable = None,
+    response_time_listener: Callable[[float], bool] = None,
+    task_stream: task_stream_module.TaskStream = None,
+    task_recorder: task_recorder_module.TaskRecorder = None,
+) -> SimResult:
     sink = sink_module.Sink(env=env, _id="sink")
 
     server_list = [
@@ -71,6 +308,7 @@ def sim(
     ]
 
     sching_agent = sching_agent_given_server_list(server_list=server_list)
+    sching_agent.set_rng(sching_agent_rng)
 
     scher = scheduler_module.Scheduler(
         env=env,
@@ -85,31 +323,114 @@ def sim(
         inter_task_gen_time_rv=inter_task_gen_time_rv,
         task_service_time_rv=task_service_time_rv,
         next_hop=scher,
+        task_batch_size_rv=task_batch_size_rv,
+        task_stream=task_stream,
     )
 
     sink.sching_agent = sching_agent
     sink.num_tasks_to_recv = num_tasks_to_recv
+    sink.response_time_listener = response_time_listener
+    sink.task_recorder = task_recorder
 
     env.run(until=sink.recv_tasks_proc)
 
-    sim_result = SimResult(t_l=sink.task_response_time_list)
-    log(INFO, "Done", sim_result=sim_result)
+    return SimResult(
+        response_time_stats=sink.response_time_stats,
+        response_time_sketch=sink.response_time_sketch,
+    )
+
+
+def sim_w_heap_engine(
+    num_servers: int,
+    inter_task_gen_time_rv: random_variable.RandomVariable,
+    task_service_time_rv: random_variable.RandomVariable,
+    num_tasks_to_recv: int,
+    sching_agent_given_server_list: Callable[[list[server_module.Server]], agent_module.SchingAgent],
+    sching_agent_rng: numpy.random.Generator,
+    task_batch_size_rv: random_variable.RandomVariable = None,
+    response_time_listener: Callable[[float], bool] = None,
+    task_stream: task_stream_module.TaskStream = None,
+    task_recorder: task_recorder_module.TaskRecorder = None,
+) -> SimResult:
+    env = heap_engine.Environment()
+
+    sink = heap_engine.Sink(env=env, _id="sink", num_tasks_to_recv=num_tasks_to_recv)
+
+    server_list = [
+        heap_engine.Server(env=env, _id=f"s{i}", sink=sink) for i in range(num_servers)
+    ]
+
+    sching_agent = sching_agent_given_server_list(server_list=server_list)
+    sching_agent.set_rng(sching_agent_rng)
+    sink.sching_agent = sching_agent
+    sink.response_time_listener = response_time_listener
+    sink.task_recorder = task_recorder
+
+    scher = scheduler_module.Scheduler(
+        env=env,
+        _id="scher",
+        node_list=server_list,
+        sching_agent=sching_agent,
+    )
+
+    source = heap_engine.Source(
+        env=env,
+        _id="source",
+        inter_task_gen_time_rv=inter_task_gen_time_rv,
+        task_service_time_rv=task_service_time_rv,
+        next_hop=scher,
+        task_batch_size_rv=task_batch_size_rv,
+        task_stream=task_stream,
+    )
 
-    if sim_result_list is not None:
-        sim_result_list.append(sim_result)
+    env.run()
+
+    return SimResult(
+        response_time_stats=sink.response_time_stats,
+        response_time_sketch=sink.response_time_sketch,
+    )
+
+
+def sim_w_fresh_env(use_cache: bool = False, **kwargs) -> SimResult:
+    """Runs `sim()` on a new `simpy.Environment`. If `use_cache`, the result
+    is looked up in and added to `cache.default_cache`, for the runs whose
+    config can be keyed (see `cache.get_key()`).
+    """
+    key = cache_module.get_key(kwargs) if use_cache else None
+    if key is not None:
+        array_dict = cache_module.default_cache.get(key)
+        if array_dict is not None:
+            log(DEBUG, "Found in cache", key=key)
+            return SimResult.from_array_dict(array_dict)
+
+    sim_result = sim(env=simpy.Environment(), **kwargs)
+
+    if key is not None:
+        cache_module.default_cache.put(key, sim_result.to_array_dict())
 
     return sim_result
 
 
 def sim_w_joblib(
-    env: simpy.Environment,
     num_servers: int,
     inter_task_gen_time_rv: random_variable.RandomVariable,
     task_service_time_rv: random_variable.RandomVariable,
     num_tasks_to_recv: int,
     sching_agent_given_server_list: Callable[[list[server_module.Server]], agent_module.SchingAgent],
     num_sim_runs: int = 1,
+    n_jobs: int = -1,
+    seed: int | numpy.random.SeedSequence = None,
+    backend: str = "simpy",
+    use_cache: bool = False,
+    stopping_rule: stopping_module.StoppingRule = None,
 ) -> SimResult:
+    """Runs `num_sim_runs` independent replications of `sim()`, each on its
+    own environment, in a pool of `n_jobs` worker processes, and combines
+    their results. Each replication is seeded with its own child of `seed`,
+    so the combined result depends only on `seed`, not on `n_jobs` or on the
+    order the workers finish in. With `use_cache`, replications are read
+    from `cache.default_cache` when found (see `sim_w_fresh_env()`).
+    """
     log(DEBUG, "Started",
         num_servers=num_servers,
         inter_task_gen_time_rv=inter_task_gen_time_rv,
@@ -117,32 +438,30 @@ def sim_w_joblib(
         num_tasks_to_recv=num_tasks_to_recv,
         sching_agent_given_server_list=sching_agent_given_server_list,
         num_sim_runs=num_sim_runs,
+        seed=seed,
     )
 
-    sim_result_list = []
+    seed_seq = random_variable.to_seed_seq(seed)
+    sim_kwargs = dict(
+        num_servers=num_servers,
+        inter_task_gen_time_rv=inter_task_gen_time_rv,
+        task_service_time_rv=task_service_time_rv,
+        num_tasks_to_recv=num_tasks_to_recv,
+        sching_agent_given_server_list=sching_agent_given_server_list,
+        backend=backend,
+        stopping_rule=stopping_rule,
+        # Without a seed, the runs are not reproducible so are not cached.
+        # `cache.get_key()` can not tell, as they are seeded with children of
+        # a new `SeedSequence`.
+        use_cache=use_cache and seed is not None,
+    )
     if num_sim_runs == 1:
-        sim(
-            env=env,
-            num_servers=num_servers,
-            inter_task_gen_time_rv=inter_task_gen_time_rv,
-            task_service_time_rv=task_service_time_rv,
-            num_tasks_to_recv=num_tasks_to_recv,
-            sching_agent_given_server_list=sching_agent_given_server_list,
-            sim_result_list=sim_result_list,
-        )
+        sim_result_list = [sim_w_fresh_env(**sim_kwargs, seed=seed_seq)]
 
     else:
-        joblib.Parallel(n_jobs=-1, prefer="threads")(
-            joblib.delayed(sim)(
-                env=env,
-                num_servers=num_servers,
-                inter_task_gen_time_rv=inter_task_gen_time_rv,
-                task_service_time_rv=task_service_time_rv,
-                num_tasks_to_recv=num_tasks_to_recv,
-                sching_agent_given_server_list=sching_agent_given_server_list,
-                sim_result_list=sim_result_list,
-            )
-            for i in range(num_sim_runs)
+        sim_result_list = joblib.Parallel(n_jobs=n_jobs)(
+            joblib.delayed(sim_w_fresh_env)(**sim_kwargs, seed=child_seed_seq)
+            for child_seed_seq in seed_seq.spawn(num_sim_runs)
         )
 
     sim_result = combine_sim_results(sim_result_list=sim_result_list)
@@ -0,0 +1,300 @@
+"""Sequential stopping of a simulation run: the run stops once the
+confidence interval of the steady-state E[T] (or a quantile of T) is
+narrow enough, rather than after a fixed number of tasks.
+
+The warm-up is detected with MSER-5 and dropped, and the confidence
+interval is computed with batch means (or batch quantiles) over what is
+left. The response times are not kept, so the memory used does not grow
+with the length of the run: `Stopper` keeps the sums of blocks of
+response times for MSER and the batch means, and the stats and quantile
+sketches of a bounded number of segments of the run for the batch
+quantiles and the steady-state result. Adjacent blocks (segments) are
+merged in pairs when there are too many, doubling their size, so MSER-5
+becomes MSER-10, MSER-20, ... as the run grows.
+
+Ref: White et al., "An effective truncation heuristic for bias reduction
+in simulation output", Simulation 1997.
+"""
+import array
+import dataclasses
+import math
+import numpy
+import scipy.stats
+
+from src.prob import quantile_sketch as quantile_sketch_module, running_stats
+
+from src.utils.debug import *
+
+
+# Number of response times in a block for MSER, before any merging.
+MSER_BATCH_SIZE = 5
+
+
+@dataclasses.dataclass
+class StoppingRule:
+    """Run until the half-width of the `confidence` interval of the
+    estimate is at most `rel_half_width` times the estimate. The estimate is
+    E[T], or the `quantile` of T if given. The rule is checked once there
+    are `min_num_tasks` response times, and then each time their number has
+    grown by `check_growth`.
+
+    Memory is bounded by `max_num_blocks` block sums, and by
+    `4 * num_batches` segments of a `QuantileSketch` each.
+    """
+    rel_half_width: float = 0.05
+    quantile: float = None
+    confidence: float = 0.95
+    num_batches: int = 20
+    min_num_tasks: int = 1000
+    check_growth: float = 1.1
+    max_num_blocks: int = 4096
+
+    def __post_init__(self):
+        if self.max_num_blocks < 2:
+            raise ValueError(f"max_num_blocks= {self.max_num_blocks} should be at least 2")
+
+
+def mser_truncation_point(x_array: numpy.ndarray, batch_size: int = 5) -> int:
+    """Returns the number of initial observations to drop as warm-up, which
+    minimizes the MSER statistic over the batch means of size `batch_size`.
+    Only truncation points in the first half are considered; a minimum at
+    the end of that range means that the run may not be past the warm-up
+    yet.
+    """
+    num_batches = len(x_array) // batch_size
+    if num_batches < 2:
+        return 0
+
+    batch_mean_array = x_array[:num_batches * batch_size].reshape(num_batches, batch_size).mean(axis=1)
+
+    # Sums over the batch means after each truncation point d.
+    suffix_sum_array = numpy.cumsum(batch_mean_array[::-1])[::-1]
+    suffix_sum_sq_array = numpy.cumsum(batch_mean_array[::-1]**2)[::-1]
+    num_left_array = numpy.arange(num_batches, 0, -1)
+
+    d_max = num_batches // 2
+    num_left_array = num_left_array[:d_max + 1]
+    sum_sq_dev_array = suffix_sum_sq_array[:d_max + 1] - suffix_sum_array[:d_max + 1]**2 / num_left_array
+    mser_array = sum_sq_dev_array / num_left_array**2
+
+    return int(numpy.argmin(mser_array)) * batch_size
+
+
+def batch_means_ci(
+    x_array: numpy.ndarray,
+    num_batches: int,
+    confidence: float,
+    quantile: float = None,
+) -> tuple[float, float]:
+    """Returns the estimate of the mean (or of `quantile`) of `x_array` and
+    the half-width of its `confidence` interval, computed from the means (or
+    quantiles) of `num_batches` contiguous batches.
+    """
+    batch_size = len(x_array) // num_batches
+    batch_array = x_array[len(x_array) - num_batches * batch_size:].reshape(num_batches, batch_size)
+    if quantile is None:
+        estimate_array = batch_array.mean(axis=1)
+    else:
+        estimate_array = numpy.quantile(batch_array, quantile, axis=1)
+
+    t = scipy.stats.t.ppf((1 + confidence) / 2, df=num_batches - 1)
+    return float(estimate_array.mean()), float(t * estimate_array.std(ddof=1) / math.sqrt(num_batches))
+
+
+def batch_quantiles_ci(
+    sketch_list: list[quantile_sketch_module.QuantileSketch],
+    confidence: float,
+    quantile: float,
+) -> tuple[float, float]:
+    """Returns the estimate of `quantile` and the half-width of its
+    `confidence` interval, computed from the quantiles of the batches that
+    the sketches in `sketch_list` summarize.
+    """
+    estimate_array = numpy.array([sketch.quantile(quantile) for sketch in sketch_list])
+    t = scipy.stats.t.ppf((1 + confidence) / 2, df=len(sketch_list) - 1)
+    return float(estimate_array.mean()), float(t * estimate_array.std(ddof=1) / math.sqrt(len(sketch_list)))
+
+
+class Segment:
+    """Stats and quantile sketch of the response times in a segment of the run."""
+
+    def __init__(self):
+        self.stats = running_stats.StreamStats()
+        self.sketch = quantile_sketch_module.QuantileSketch()
+
+    def add(self, x: float):
+        self.stats.add(x)
+        self.sketch.add(x)
+
+    def merge(self, other: "Segment"):
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+
+
+def merged_segment(segment_list: list[Segment]) -> Segment:
+    segment = Segment()
+    for segment_ in segment_list:
+        segment.merge(segment_)
+
+    return segment
+
+
+class Stopper:
+    """Keeps summaries of the response times of a run, in the order they
+    are recorded, and decides when `stopping_rule` is met.
+    """
+
+    def __init__(self, stopping_rule: StoppingRule):
+        self.stopping_rule = stopping_rule
+
+        self.num_tasks = 0
+        # Sums of the response times in consecutive blocks of `block_size`,
+        # and of the ones in the block being filled.
+        self.block_size = MSER_BATCH_SIZE
+        self.block_sum_array = array.array("d")
+        self.block_sum = 0.0
+        self.num_tasks_in_block = 0
+        # Consecutive segments of `segment_size`, with the one being filled
+        # last.
+        self.max_num_segments = 4 * stopping_rule.num_batches
+        self.segment_size = max(1, stopping_rule.min_num_tasks // self.max_num_segments)
+        self.segment_list = [Segment()]
+
+        self.num_tasks_at_next_check = stopping_rule.min_num_tasks
+        self.truncation_point = 0
+        self.estimate = None
+        self.half_width = None
+        self.stopped = False
+
+    def __repr__(self):
+        return (
+            "Stopper( \n"
+            f"\t stopping_rule= {self.stopping_rule} \n"
+            f"\t num_tasks= {self.num_tasks} \n"
+            f"\t block_size= {self.block_size} \n"
+            f"\t segment_size= {self.segment_size} \n"
+            f"\t truncation_point= {self.truncation_point} \n"
+            f"\t estimate= {self.estimate} \n"
+            f"\t half_width= {self.half_width} \n"
+            f"\t stopped= {self.stopped} \n"
+            ")"
+        )
+
+    def add(self, response_time: float) -> bool:
+        """Records `response_time` and returns True if the run can stop."""
+        self.num_tasks += 1
+
+        self.block_sum += response_time
+        self.num_tasks_in_block += 1
+        if self.num_tasks_in_block == self.block_size:
+            self.block_sum_array.append(self.block_sum)
+            self.block_sum = 0.0
+            self.num_tasks_in_block = 0
+            if len(self.block_sum_array) == self.stopping_rule.max_num_blocks:
+                self.merge_blocks()
+
+        segment = self.segment_list[-1]
+        segment.add(response_time)
+        if segment.stats.count == self.segment_size:
+            self.segment_list.append(Segment())
+            if len(self.segment_list) > self.max_num_segments:
+                self.merge_segments()
+
+        if self.num_tasks < self.num_tasks_at_next_check:
+            return False
+
+        self.num_tasks_at_next_check = math.ceil(self.num_tasks * self.stopping_rule.check_growth)
+        self.stopped = self.check()
+        return self.stopped
+
+    def merge_blocks(self):
+        # Called when a block has just been filled, so the block being filled
+        # is empty. If the number of blocks is odd, the last one is carried
+        # over as the first half of the block being filled.
+        num_blocks_to_carry = len(self.block_sum_array) % 2
+        if num_blocks_to_carry:
+            self.block_sum = self.block_sum_array.pop()
+            self.num_tasks_in_block = self.block_size
+
+        self.block_sum_array = array.array("d", (
+            self.block_sum_array[i] + self.block_sum_array[i + 1] for i in range(0, len(self.block_sum_array), 2)
+        ))
+        self.block_size *= 2
+
+    def merge_segments(self):
+        # The last segment is the empty one just started.
+        full_segment_list = self.segment_list[:-1]
+        self.segment_list = [
+            merged_segment(full_segment_list[i : i + 2]) for i in range(0, len(full_segment_list), 2)
+        ] + [Segment()]
+        self.segment_size *= 2
+
+    def block_mean_array(self) -> numpy.ndarray:
+        return numpy.array(self.block_sum_array) / self.block_size
+
+    def update_truncation_point(self) -> bool:
+        """Sets `truncation_point`, and returns False if the run may not be
+        past the warm-up yet.
+        """
+        block_mean_array = self.block_mean_array()
+        num_blocks_to_drop = mser_truncation_point(block_mean_array, batch_size=1)
+        self.truncation_point = num_blocks_to_drop * self.block_size
+
+        return num_blocks_to_drop < len(block_mean_array) // 2 - 1
+
+    def steady_state_segment_list(self) -> list[Segment]:
+        """Returns the segments that start at or after the truncation point,
+        which may drop up to one segment more than the warm-up.
+        """
+        first_segment_index = math.ceil(self.truncation_point / self.segment_size)
+        return [segment for segment in self.segment_list[first_segment_index:] if segment.stats.count]
+
+    def check(self) -> bool:
+        rule = self.stopping_rule
+        if not self.update_truncation_point():
+            log(DEBUG, "Warm-up may not be over", num_tasks=self.num_tasks, truncation_point=self.truncation_point)
+            return False
+
+        if rule.quantile is None:
+            block_mean_array = self.block_mean_array()[self.truncation_point // self.block_size:]
+            if len(block_mean_array) < 2 * rule.num_batches:
+                return False
+
+            self.estimate, self.half_width = batch_means_ci(
+                x_array=block_mean_array,
+                num_batches=rule.num_batches,
+                confidence=rule.confidence,
+            )
+
+        else:
+            # Only the full segments, grouped into at most `num_batches`
+            # batches of equally many segments.
+            segment_list = [segment for segment in self.steady_state_segment_list() if segment.stats.count == self.segment_size]
+            num_batches = min(rule.num_batches, len(segment_list))
+            if num_batches < 2:
+                return False
+
+            num_segments_per_batch = len(segment_list) // num_batches
+            segment_list = segment_list[len(segment_list) - num_batches * num_segments_per_batch:]
+            self.estimate, self.half_width = batch_quantiles_ci(
+                sketch_list=[
+                    merged_segment(segment_list[i : i + num_segments_per_batch]).sketch
+                    for i in range(0, len(segment_list), num_segments_per_batch)
+                ],
+                confidence=rule.confidence,
+                quantile=rule.quantile,
+            )
+
+        log(DEBUG, "", num_tasks=self.num_tasks, truncation_point=self.truncation_point, estimate=self.estimate, half_width=self.half_width)
+
+        return self.half_width <= rule.rel_half_width * abs(self.estimate)
+
+    def steady_state_stats_and_sketch(self) -> tuple[running_stats.StreamStats, quantile_sketch_module.QuantileSketch]:
+        """Returns the stats and the quantile sketch of the response times
+        after the warm-up.
+        """
+        if not self.stopped:
+            self.update_truncation_point()
+
+        segment = merged_segment(self.steady_state_segment_list())
+        return segment.stats, segment.sketch
@@ -0,0 +1,223 @@
+import dataclasses
+import itertools
+import joblib
+import numpy
+import time
+
+from typing import Any
+
+from src.agent import agent as agent_module
+from src.prob import random_variable
+from src.sim import sim as sim_module, stopping as stopping_module
+from src.sys import server as server_module, task_stream as task_stream_module
+
+from src.utils.debug import *
+
+
+@dataclasses.dataclass
+class AgentSpec:
+    """Scheduling agent that is constructed for each run as
+    `agent_class(node_list=server_list, **params)`, and appears in the results
+    under `name`.
+    """
+    name: str
+    agent_class: type[agent_module.SchingAgent]
+    params: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    def __call__(self, server_list: list[server_module.Server]) -> agent_module.SchingAgent:
+        return self.agent_class(node_list=server_list, **self.params)
+
+
+@dataclasses.dataclass
+class SweepCell:
+    """One replication of one configuration in the sweep grid."""
+    config_index: int
+    arrival_rate: float
+    num_servers: int
+    agent_spec: AgentSpec
+    task_service_time_rv: random_variable.RandomVariable
+    num_tasks_to_recv: int
+    seed: numpy.random.SeedSequence
+    # If set, the tasks are replayed from a stream sampled with this seed,
+    # which is shared by the cells that differ only in the agent.
+    task_stream_seed: numpy.random.SeedSequence = None
+
+    def load(self) -> float:
+        return self.arrival_rate * self.task_service_time_rv.mean() / self.num_servers
+
+    def cost_key(self) -> tuple:
+        """Cells with a larger key are expected to take longer: the time per
+        task grows with the number of servers for the agents that scan them,
+        and with the load through the longer queues.
+        """
+        return (self.num_tasks_to_recv * self.num_servers, self.load())
+
+
+def run_cell(
+    cell: SweepCell,
+    backend: str = "simpy",
+    use_cache: bool = False,
+    stopping_rule: stopping_module.StoppingRule = None,
+) -> tuple[sim_module.SimResult, float]:
+    start_time = time.perf_counter()
+    inter_task_gen_time_rv = random_variable.Exponential(mu=cell.arrival_rate)
+    task_stream = None
+    if cell.task_stream_seed is not None:
+        task_stream = task_stream_module.TaskStream.sample(
+            num_tasks=cell.num_tasks_to_recv,
+            inter_task_gen_time_rv=inter_task_gen_time_rv,
+            task_service_time_rv=cell.task_service_time_rv,
+            seed=cell.task_stream_seed,
+        )
+
+    sim_result = sim_module.sim_w_fresh_env(
+        num_servers=cell.num_servers,
+        inter_task_gen_time_rv=inter_task_gen_time_rv,
+        task_service_time_rv=cell.task_service_time_rv,
+        num_tasks_to_recv=cell.num_tasks_to_recv,
+        sching_agent_given_server_list=cell.agent_spec,
+        seed=cell.seed,
+        backend=backend,
+        use_cache=use_cache,
+        stopping_rule=stopping_rule,
+        task_stream=task_stream,
+    )
+
+    return sim_result, time.perf_counter() - start_time
+
+
+def sweep(
+    arrival_rate_list: list[float],
+    num_servers_list: list[int],
+    agent_spec_list: list[AgentSpec],
+    task_service_time_rv_list: list[random_variable.RandomVariable],
+    num_tasks_to_recv: int,
+    num_sim_runs: int = 1,
+    seed: int | numpy.random.SeedSequence = None,
+    n_jobs: int = -1,
+    backend: str = "simpy",
+    use_cache: bool = False,
+    stopping_rule: stopping_module.StoppingRule = None,
+    common_random_numbers: bool = False,
+) -> list[dict[str, Any]]:
+    """Simulates every combination of the given arrival rates, numbers of
+    servers, agents and service time rvs, `num_sim_runs` times each, with
+    the tasks arriving as a Poisson process.
+
+    All replications of all configurations are run on one pool of `n_jobs`
+    workers, dispatched one at a time and the longest (per `cost_key()`)
+    first so that the pool does not idle on a few long cells at the end.
+    Each configuration gets its own child of `seed`, and each replication
+    a child of that, so a configuration's result does not depend on the
+    rest of the grid or on the number of workers.
+
+    With `use_cache`, the replications found in `cache.default_cache` are
+    not rerun, so only the new or changed cells are simulated. The cache is
+    not used if `seed` is None, as the runs are then not reproducible.
+
+    With `common_random_numbers`, the i-th replication of every agent in a
+    configuration replays the same arrival and service times, so that the
+    paired differences between the agents (see the `ET_list` column) have a
+    much lower variance than with independent replications.
+
+    With `stopping_rule`, each replication runs only until its estimate is
+    as precise as the rule asks, with `num_tasks_to_recv` as a cap.
+
+    Returns one row per configuration, in the grid order, with the
+    replications combined. `sim_time` is the time spent in the runs (or in
+    reading them from the cache).
+    """
+    config_list = list(itertools.product(arrival_rate_list, num_servers_list, agent_spec_list, task_service_time_rv_list))
+    log(INFO, "Started", num_configs=len(config_list), num_sim_runs=num_sim_runs, n_jobs=n_jobs)
+
+    # The seeds of the runs and of the task streams are spawned from separate
+    # children of `seed`, so that the streams do not depend on the grid of
+    # agents.
+    config_parent_seed_seq, task_stream_seed_seq = random_variable.to_seed_seq(seed).spawn(2)
+    config_seed_seq_list = config_parent_seed_seq.spawn(len(config_list))
+    # Task stream seeds for each replication, shared by the agents.
+    task_stream_key_to_seed_seq_list_map = {}
+    if common_random_numbers:
+        task_stream_key_list = list(itertools.product(range(len(arrival_rate_list)), range(len(num_servers_list)), range(len(task_service_time_rv_list))))
+        for task_stream_key, task_stream_key_seed_seq in zip(task_stream_key_list, task_stream_seed_seq.spawn(len(task_stream_key_list))):
+            task_stream_key_to_seed_seq_list_map[task_stream_key] = task_stream_key_seed_seq.spawn(num_sim_runs)
+
+    cell_list = []
+    for config_index, (config, config_seed_seq) in enumerate(zip(config_list, config_seed_seq_list)):
+        arrival_rate, num_servers, agent_spec, task_service_time_rv = config
+        task_stream_seed_seq_list = task_stream_key_to_seed_seq_list_map.get(
+            (
+                arrival_rate_list.index(arrival_rate),
+                num_servers_list.index(num_servers),
+                task_service_time_rv_list.index(task_service_time_rv),
+            ),
+            [None] * num_sim_runs,
+        )
+        for run_seed_seq, task_stream_seed_seq in zip(config_seed_seq.spawn(num_sim_runs), task_stream_seed_seq_list):
+            cell_list.append(
+                SweepCell(
+                    config_index=config_index,
+                    arrival_rate=arrival_rate,
+                    num_servers=num_servers,
+                    agent_spec=agent_spec,
+                    task_service_time_rv=task_service_time_rv,
+                    num_tasks_to_recv=num_tasks_to_recv,
+                    seed=run_seed_seq,
+                    task_stream_seed=task_stream_seed_seq,
+                )
+            )
+    cell_list.sort(key=SweepCell.cost_key, reverse=True)
+
+    start_time = time.perf_counter()
+    result_list = joblib.Parallel(n_jobs=n_jobs, batch_size=1)(
+        joblib.delayed(run_cell)(
+            cell,
+            backend=backend,
+            # `cache.get_key()` can not tell that the runs are not reproducible
+            # without `seed`, as the cells are seeded with its children, which
+            # would be cached and never found again.
+            use_cache=use_cache and seed is not None,
+            stopping_rule=stopping_rule,
+        )
+        for cell in cell_list
+    )
+    log(INFO, "Done", num_cells=len(cell_list), wall_time=time.perf_counter() - start_time)
+
+    config_index_to_result_list_map = {}
+    for cell, result in zip(cell_list, result_list):
+        config_index_to_result_list_map.setdefault(cell.config_index, []).append(result)
+
+    row_list = []
+    for config_index, (arrival_rate, num_servers, agent_spec, task_service_time_rv) in enumerate(config_list):
+        result_list_ = config_index_to_result_list_map[config_index]
+        sim_result = sim_module.combine_sim_results([sim_result for sim_result, _ in result_list_])
+        row_list.append(
+            dict(
+                arrival_rate=arrival_rate,
+                num_servers=num_servers,
+                load=arrival_rate * task_service_time_rv.mean() / num_servers,
+                agent=agent_spec.name,
+                task_service_time_rv=task_service_time_rv,
+                num_tasks_to_recv=num_tasks_to_recv,
+                num_sim_runs=num_sim_runs,
+                num_tasks=sim_result.num_tasks,
+                ET=sim_result.ET,
+                std_T=sim_result.std_T,
+                ET_list=[sim_result_.ET for sim_result_, _ in result_list_],
+                p50_T=sim_result.quantile_T(0.5),
+                p99_T=sim_result.quantile_T(0.99),
+                max_T=sim_result.max_T,
+                sim_time=sum(sim_time for _, sim_time in result_list_),
+                sim_result=sim_result,
+            )
+        )
+
+    return row_list
+
+
+def select(row_list: list[dict[str, Any]], key: str, **kwargs) -> list[Any]:
+    """Returns the `key` column of the rows that match `kwargs`, in order."""
+    return [
+        row[key] for row in row_list
+        if all(row[k] == v for k, v in kwargs.items())
+    ]
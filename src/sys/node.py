@@ -1,6 +1,8 @@
 import abc
 import simpy
 
+from typing import Callable
+
 from src.utils.debug import *
 
 
@@ -9,9 +11,21 @@ class Node:
         self.env = env
         self._id = _id
 
+        self.state_listener_list = []
+
     def __repr__(self):
         return f"Node(id= {self._id})"
 
+    def add_state_listener(self, listener: Callable[["Node"], None]):
+        """`listener` is called with the node every time `num_tasks_left()`
+        or `work_left()` changes other than by the passing of time.
+        """
+        self.state_listener_list.append(listener)
+
+    def notify_state_listeners(self):
+        for listener in self.state_listener_list:
+            listener(self)
+
     @abc.abstractmethod
     def num_tasks_left(self):
         return
@@ -31,10 +31,13 @@ class Scheduler(node_module.Node):
 
         return f"Scheduler(id= {self._id})"
 
-    def put(self, task: task_module.Task):
+    def put(self, task: task_module.Task | list[task_module.Task]):
         slog(DEBUG, self.env, self, "recved", task=task)
 
-        self.schedule(task)
+        if isinstance(task, list):
+            self.schedule_batch(task)
+        else:
+            self.schedule(task)
 
     def schedule(self, task: task_module.Task):
         slog(DEBUG, self.env, self, "started")
@@ -50,3 +53,23 @@ class Scheduler(node_module.Node):
         self.num_tasks_sched += 1
 
         slog(DEBUG, self.env, self, "done")
+
+    def schedule_batch(self, task_list: list[task_module.Task]):
+        slog(DEBUG, self.env, self, "started", num_tasks=len(task_list))
+
+        node_id_list = self.sching_agent.node_ids_to_assign(
+            k=len(task_list),
+            time_epoch=self.env.now,
+            task_service_time_list=[task.service_time for task in task_list],
+        )
+
+        slog(DEBUG, self.env, self, "will schedule tasks",
+             num_tasks_sched=self.num_tasks_sched,
+             task_list=task_list,
+             node_id_list=node_id_list,
+        )
+        for task, node_id in zip(task_list, node_id_list):
+            self.id_to_node_map[node_id].put(task)
+        self.num_tasks_sched += len(task_list)
+
+        slog(DEBUG, self.env, self, "done")
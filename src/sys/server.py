@@ -19,6 +19,11 @@ class Server(node.Node):
 
         self.task_in_serv = None
         self.serv_start_time = None
+        # Number and total service time of the tasks that are put but have
+        # not started service yet, maintained on put and dequeue so that
+        # `num_tasks_left()` and `work_left()` do not scan the queue.
+        self.num_tasks_queued = 0
+        self.queued_work = 0
         self.task_store = simpy.Store(env)
         self.recv_tasks_proc = env.process(self.recv_tasks())
 
@@ -40,20 +45,23 @@ class Server(node.Node):
         )
 
     def num_tasks_left(self) -> int:
-        return len(self.task_store.items) + int(self.task_in_serv is not None)
+        return self.num_tasks_queued + int(self.task_in_serv is not None)
 
     def work_left(self) -> float:
         remaining_serv_time = 0
         if self.task_in_serv:
             remaining_serv_time = self.task_in_serv.service_time - (self.env.now - self.serv_start_time)
 
-        return remaining_serv_time + sum(task.service_time for task in self.task_store.items)
+        return remaining_serv_time + self.queued_work
 
     def put(self, task: task_module.Task):
         slog(DEBUG, self.env, self, "recved", task=task)
 
         task.node_id = self._id
+        self.num_tasks_queued += 1
+        self.queued_work += task.service_time
         self.task_store.put(task)
+        self.notify_state_listeners()
 
     def recv_tasks(self):
         slog(DEBUG, self.env, self, "started")
@@ -62,6 +70,13 @@ class Server(node.Node):
         while True:
             self.task_in_serv = yield self.task_store.get()
             self.serv_start_time = self.env.now
+
+            self.num_tasks_queued -= 1
+            if self.num_tasks_queued == 0:
+                # Reset rather than subtract to not accumulate rounding error
+                self.queued_work = 0
+            else:
+                self.queued_work -= self.task_in_serv.service_time
             yield self.env.timeout(self.task_in_serv.service_time)
 
             num_tasks_proced += 1
@@ -74,5 +89,6 @@ class Server(node.Node):
 
             self.sink.put(self.task_in_serv)
             self.task_in_serv = None
+            self.notify_state_listeners()
 
         slog(DEBUG, self.env, self, "done")
@@ -4,6 +4,7 @@ from src.agent import (
     agent,
     exp as exp_module,
 )
+from src.prob import quantile_sketch, running_stats
 from src.sys import (
     node,
     task as task_module,
@@ -26,7 +27,13 @@ class Sink(node.Node):
         self.task_store = simpy.Store(env)
         self.recv_tasks_proc = env.process(self.recv_tasks())
 
-        self.task_response_time_list = []
+        self.response_time_stats = running_stats.StreamStats()
+        self.response_time_sketch = quantile_sketch.QuantileSketch()
+        # If set, called with each response time, and the sink stops
+        # receiving tasks once it returns True.
+        self.response_time_listener = None
+        # If set, records each task received.
+        self.task_recorder = None
 
     def __repr__(self):
         return f"Sink(id= {self._id})"
@@ -45,14 +52,22 @@ class Sink(node.Node):
             num_tasks_recved += 1
             slog(DEBUG, self.env, self, "recved", task=task, num_tasks_recved=num_tasks_recved)
 
+            if self.task_recorder:
+                self.task_recorder.record(task=task, completion_time=self.env.now)
+
             if self.sching_agent:
                 response_time = self.env.now - task.arrival_time
-                self.task_response_time_list.append(response_time)
+                self.response_time_stats.add(response_time)
+                self.response_time_sketch.add(response_time)
 
                 if isinstance(self.sching_agent, agent.SchingAgent_wOnlineLearning):
                     exp = exp_module.get_exp(time_epoch=self.env.now, task=task)
                     self.sching_agent.record_exp(node_id=task.node_id, exp=exp)
 
+                if self.response_time_listener and self.response_time_listener(response_time):
+                    slog(DEBUG, self.env, self, "stopped by response_time_listener", num_tasks_recved=num_tasks_recved)
+                    break
+
             if num_tasks_recved >= self.num_tasks_to_recv:
                 slog(DEBUG, self.env, self, "recved requested # tasks", num_tasks_recved=num_tasks_recved)
                 break
@@ -5,6 +5,7 @@ from src.prob import random_variable
 from src.sys import (
     node,
     task as task_module,
+    task_stream as task_stream_module,
 )
 
 
@@ -17,14 +18,25 @@ class Source(node.Node):
         task_service_time_rv: random_variable.RandomVariable,
         next_hop: node.Node,
         num_msgs_to_send: int = None,
+        task_batch_size_rv: random_variable.RandomVariable = None,
+        task_stream: task_stream_module.TaskStream = None,
     ):
         super().__init__(env=env, _id=_id)
         self.inter_task_gen_time_rv = inter_task_gen_time_rv
         self.task_service_time_rv = task_service_time_rv
         self.next_hop = next_hop
         self.num_msgs_to_send = num_msgs_to_send
+        # If given, tasks arrive in batches of size sampled from this rv and
+        # are passed to `next_hop` as a list.
+        self.task_batch_size_rv = task_batch_size_rv
+        # If given, tasks are replayed from this stream, until it runs out,
+        # and the rvs above are not used.
+        self.task_stream = task_stream
 
-        self.send_messages_proc = env.process(self.send_tasks())
+        if self.task_stream is None:
+            self.send_messages_proc = env.process(self.send_tasks())
+        else:
+            self.send_messages_proc = env.process(self.send_tasks_from_stream())
 
     def __repr__(self):
         # return (
@@ -49,17 +61,50 @@ class Source(node.Node):
             )
             yield self.env.timeout(inter_msg_gen_time)
 
+            if self.task_batch_size_rv is None:
+                task = task_module.Task(
+                    _id=task_id,
+                    service_time=self.task_service_time_rv.sample(),
+                    arrival_time=self.env.now,
+                )
+
+                slog(DEBUG, self.env, self, "sending", task=task)
+                self.next_hop.put(task)
+                task_id += 1
+
+            else:
+                task_list = []
+                for _ in range(int(self.task_batch_size_rv.sample())):
+                    task_list.append(
+                        task_module.Task(
+                            _id=task_id,
+                            service_time=self.task_service_time_rv.sample(),
+                            arrival_time=self.env.now,
+                        )
+                    )
+                    task_id += 1
+
+                if task_list:
+                    slog(DEBUG, self.env, self, "sending", task_list=task_list)
+                    self.next_hop.put(task_list)
+
+            if self.num_msgs_to_send and task_id >= self.num_msgs_to_send:
+                break
+
+        slog(DEBUG, self.env, self, "started")
+
+    def send_tasks_from_stream(self):
+        slog(DEBUG, self.env, self, "started", task_stream=self.task_stream)
+
+        for task_id, (arrival_time, service_time) in enumerate(self.task_stream):
+            yield self.env.timeout(max(arrival_time - self.env.now, 0))
+
             task = task_module.Task(
                 _id=task_id,
-                service_time=self.task_service_time_rv.sample(),
+                service_time=service_time,
                 arrival_time=self.env.now,
             )
-
             slog(DEBUG, self.env, self, "sending", task=task)
             self.next_hop.put(task)
 
-            task_id += 1
-            if self.num_msgs_to_send and task_id >= self.num_msgs_to_send:
-                break
-
-        slog(DEBUG, self.env, self, "started")
+        slog(DEBUG, self.env, self, "done")
@@ -1,4 +1,7 @@
 class Task:
+    # One is allocated per task, so without a `__dict__`.
+    __slots__ = ("_id", "service_time", "arrival_time", "node_id")
+
     def __init__(
         self,
         _id: str,
@@ -0,0 +1,87 @@
+"""Binary log of the tasks that finish in a simulation, with one
+fixed-width `TASK_RECORD_DTYPE` record per task, for the offline analysis
+of the scheduling decisions.
+
+Records are written into a preallocated chunk that is appended to the file
+whenever it fills up, so recording costs a few array assignments per task
+and the memory used does not grow with the number of tasks. The file is
+raw records without a header, and is read back with `load()`.
+"""
+import numpy
+
+from src.sys import task as task_module
+
+from src.utils.debug import *
+
+
+DEFAULT_CHUNK_SIZE = 2**16
+
+TASK_RECORD_DTYPE = numpy.dtype([
+    ("task_id", "<i8"),
+    ("arrival_time", "<f8"),
+    ("node_index", "<i4"),
+    ("service_time", "<f8"),
+    ("wait_time", "<f8"),
+    ("completion_time", "<f8"),
+])
+
+
+class TaskRecorder:
+    def __init__(
+        self,
+        path: str,
+        node_id_list: list[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.path = path
+        # Nodes are recorded by their index in `node_id_list`.
+        self.node_id_to_index_map = {node_id: i for i, node_id in enumerate(node_id_list)}
+
+        self.chunk = numpy.empty(chunk_size, dtype=TASK_RECORD_DTYPE)
+        self.chunk_index = 0
+        self.num_tasks_recorded = 0
+        self.file = open(path, "wb")
+
+    def __repr__(self):
+        return f"TaskRecorder(path= {self.path}, num_tasks_recorded= {self.num_tasks_recorded})"
+
+    def record(self, task: task_module.Task, completion_time: float):
+        self.chunk[self.chunk_index] = (
+            task._id,
+            task.arrival_time,
+            self.node_id_to_index_map.get(task.node_id, -1),
+            task.service_time,
+            completion_time - task.arrival_time - task.service_time,
+            completion_time,
+        )
+        self.chunk_index += 1
+        self.num_tasks_recorded += 1
+
+        if self.chunk_index == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        self.chunk[:self.chunk_index].tofile(self.file)
+        self.file.flush()
+        self.chunk_index = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+
+        self.flush()
+        self.file.close()
+        log(DEBUG, "Done", task_recorder=self)
+
+    def __enter__(self) -> "TaskRecorder":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def load(path: str) -> numpy.ndarray:
+    """Returns the records in the file at `path`, memory-mapped, in the
+    order the tasks finished.
+    """
+    return numpy.memmap(path, dtype=TASK_RECORD_DTYPE, mode="r")
@@ -0,0 +1,168 @@
+"""Pre-sampled or recorded sequences of tasks for `Source` to replay.
+
+Traces are stored as `.npy` files of `TRACE_DTYPE` records and read
+through a memory map, so replaying a trace only holds one chunk of it in
+memory at a time. A CSV trace is converted with
+
+    python -m src.sys.task_stream trace.csv trace.npy
+"""
+import argparse
+import itertools
+import numpy
+
+from typing import Iterator
+
+from src.prob import random_variable
+
+from src.utils.debug import *
+
+
+# Number of tasks converted to Python floats at a time while replaying.
+DEFAULT_CHUNK_SIZE = 4096
+
+TRACE_DTYPE = numpy.dtype([("arrival_time", "<f8"), ("service_time", "<f8")])
+
+
+class TaskStream:
+    """Arrival and service times of a sequence of tasks, in the order of
+    arrival, that `Source` replays instead of sampling them. Replaying the
+    same stream for every agent gives the agents common random numbers, so
+    the differences between them are not buried under the noise of
+    independent arrivals and service times.
+    """
+
+    def __init__(
+        self,
+        arrival_time_array: numpy.ndarray,
+        service_time_array: numpy.ndarray,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.arrival_time_array = arrival_time_array
+        self.service_time_array = service_time_array
+        self.chunk_size = chunk_size
+
+    def __repr__(self):
+        return f"TaskStream(num_tasks= {len(self)})"
+
+    def __len__(self) -> int:
+        return len(self.arrival_time_array)
+
+    def chunks(self) -> Iterator[tuple[numpy.ndarray, numpy.ndarray]]:
+        for i in range(0, len(self), self.chunk_size):
+            yield (
+                numpy.asarray(self.arrival_time_array[i : i + self.chunk_size], dtype=float),
+                numpy.asarray(self.service_time_array[i : i + self.chunk_size], dtype=float),
+            )
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        """Yields (arrival_time, service_time) for each task."""
+        for arrival_time_array, service_time_array in self.chunks():
+            yield from zip(arrival_time_array.tolist(), service_time_array.tolist())
+
+    @classmethod
+    def sample(
+        cls,
+        num_tasks: int,
+        inter_task_gen_time_rv: random_variable.RandomVariable,
+        task_service_time_rv: random_variable.RandomVariable,
+        seed: int | numpy.random.SeedSequence = None,
+    ) -> "TaskStream":
+        inter_task_gen_time_rng, task_service_time_rng = random_variable.spawn_rngs(seed=seed, n=2)
+        return cls(
+            arrival_time_array=numpy.cumsum(inter_task_gen_time_rv.with_rng(inter_task_gen_time_rng).sample_n(num_tasks)),
+            service_time_array=task_service_time_rv.with_rng(task_service_time_rng).sample_n(num_tasks).astype(float),
+        )
+
+    @classmethod
+    def from_file(cls, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "TaskStream":
+        """Returns the stream of the trace at `path`, which is memory-mapped
+        rather than read. The trace is a `.npy` file of either `TRACE_DTYPE`
+        records, or of shape (num_tasks, 2) with the arrival and service
+        times as columns. The arrival times must be in increasing order.
+        """
+        trace_array = numpy.load(path, mmap_mode="r")
+        if trace_array.dtype.names:
+            return cls(
+                arrival_time_array=trace_array["arrival_time"],
+                service_time_array=trace_array["service_time"],
+                chunk_size=chunk_size,
+            )
+
+        check(trace_array.ndim == 2 and trace_array.shape[1] == 2, f"Trace is not of shape (num_tasks, 2): {trace_array.shape}")
+        return cls(
+            arrival_time_array=trace_array[:, 0],
+            service_time_array=trace_array[:, 1],
+            chunk_size=chunk_size,
+        )
+
+    def to_file(self, path: str):
+        """Writes the stream as a trace of `TRACE_DTYPE` records, chunk by chunk."""
+        trace_array = numpy.lib.format.open_memmap(path, mode="w+", dtype=TRACE_DTYPE, shape=(len(self),))
+        i = 0
+        for arrival_time_array, service_time_array in self.chunks():
+            trace_array["arrival_time"][i : i + len(arrival_time_array)] = arrival_time_array
+            trace_array["service_time"][i : i + len(service_time_array)] = service_time_array
+            i += len(arrival_time_array)
+
+        trace_array.flush()
+
+
+def csv_to_npy(
+    csv_path: str,
+    npy_path: str,
+    arrival_time_column: int = 0,
+    service_time_column: int = 1,
+    delimiter: str = ",",
+    skip_header: bool = True,
+    chunk_size: int = 2**20,
+) -> int:
+    """Converts the CSV trace at `csv_path` into a trace at `npy_path` that
+    `TaskStream.from_file()` reads, `chunk_size` rows at a time, and returns
+    the number of tasks. The CSV file is read twice: once to count the rows
+    and once to convert them.
+    """
+    with open(csv_path) as f:
+        num_tasks = sum(1 for line in f if line.strip()) - int(skip_header)
+
+    trace_array = numpy.lib.format.open_memmap(npy_path, mode="w+", dtype=TRACE_DTYPE, shape=(num_tasks,))
+    with open(csv_path) as f:
+        line_iter = (line for line in f if line.strip())
+        if skip_header:
+            next(line_iter, None)
+
+        i = 0
+        while line_list := list(itertools.islice(line_iter, chunk_size)):
+            chunk_array = numpy.loadtxt(
+                line_list,
+                delimiter=delimiter,
+                usecols=(arrival_time_column, service_time_column),
+                ndmin=2,
+            )
+            trace_array["arrival_time"][i : i + len(chunk_array)] = chunk_array[:, 0]
+            trace_array["service_time"][i : i + len(chunk_array)] = chunk_array[:, 1]
+            i += len(chunk_array)
+            log(DEBUG, "Converted", num_tasks=i)
+
+    trace_array.flush()
+    return num_tasks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts a CSV trace of arrival and service times into a .npy trace.")
+    parser.add_argument("csv_path")
+    parser.add_argument("npy_path")
+    parser.add_argument("--arrival_time_column", type=int, default=0)
+    parser.add_argument("--service_time_column", type=int, default=1)
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--no_header", action="store_true")
+    args = parser.parse_args()
+
+    num_tasks = csv_to_npy(
+        csv_path=args.csv_path,
+        npy_path=args.npy_path,
+        arrival_time_column=args.arrival_time_column,
+        service_time_column=args.service_time_column,
+        delimiter=args.delimiter,
+        skip_header=not args.no_header,
+    )
+    log(INFO, f"Wrote {num_tasks} tasks to {args.npy_path}")
@@ -1,9 +1,10 @@
-import inspect
 import logging
 import os
 import pprint
 import sys
 
+from typing import Callable
+
 
 # Ref:
 # - https://stackoverflow.com/questions/384076/how-can-i-color-python-logging-output
@@ -77,6 +78,25 @@ level_log_m = {
     CRITICAL: logger.critical,
 }
 
+level_to_logging_level_map = {
+    DEBUG: logging.DEBUG,
+    INFO: logging.INFO,
+    WARNING: logging.WARNING,
+    ERROR: logging.ERROR,
+    CRITICAL: logging.CRITICAL,
+}
+
+# DEBUG logs are dropped before any other work if this is False, regardless of
+# the logger level. Set at import time by `python -O` or `NO_DEBUG_LOG=1`.
+DEBUG_LOG_ENABLED = __debug__ and os.environ.get("NO_DEBUG_LOG", "0") != "1"
+
+
+def is_enabled(level: int) -> bool:
+    if level == DEBUG and not DEBUG_LOG_ENABLED:
+        return False
+
+    return logger.isEnabledFor(level_to_logging_level_map[level])
+
 
 def log_to_file(filename, directory=None):
     if directory and not os.path.exists(directory):
@@ -92,15 +112,27 @@ def log_to_file(filename, directory=None):
 
 
 def get_extra():
-    frame, file_path, lineno, function, code_context, index = inspect.stack()[2]
+    # `sys._getframe()` instead of `inspect.stack()`, which builds frame
+    # records with source context for the whole stack.
+    frame = sys._getframe(2)
     return {
-        "file_name": os.path.split(file_path)[1],
-        "func_name": function,
-        "line_number": lineno,
+        "file_name": os.path.split(frame.f_code.co_filename)[1],
+        "func_name": frame.f_code.co_name,
+        "line_number": frame.f_lineno,
     }
 
 
-def log(level: int, _msg_: str, **kwargs):
+def log(level: int, _msg_: str | Callable[[], str], **kwargs):
+    """Logs `_msg_` followed by `kwargs`. The level is checked before
+    anything is formatted, and `_msg_` can be a thunk that is only called if
+    the message is going to be logged.
+    """
+    if not is_enabled(level):
+        return
+
+    if callable(_msg_):
+        _msg_ = _msg_()
+
     level_log_m[level](f"{_msg_}{pstr(**kwargs)}", extra=get_extra())
 
 
@@ -127,6 +159,9 @@ def pstr(**kwargs):
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~  Sim log  ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
 def slog(level: int, env, caller: str, _msg_: str, **kwargs):
+    if not is_enabled(level):
+        return
+
     level_log_m[level](
         "t: {:.2f}] {}: {} {}".format(env.now, caller, _msg_, pstr(**kwargs)),
         extra=get_extra(),
@@ -0,0 +1,93 @@
+from typing import Any
+
+
+class IndexedMinHeap:
+    """Binary min-heap over the items 0, ..., n - 1 that supports changing
+    (or removing) the key of any item in O(log n) and reading the item with
+    the min key in O(1). Items with equal keys come out in the order of their
+    index.
+    """
+
+    def __init__(self, n: int):
+        self.heap = []
+        self.pos = [-1] * n
+        self.key = [None] * n
+
+    def __repr__(self):
+        return f"IndexedMinHeap(len= {len(self.heap)})"
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, i: int) -> bool:
+        return self.pos[i] != -1
+
+    def peek(self) -> int:
+        return self.heap[0]
+
+    def update(self, i: int, key: Any):
+        """Inserts item `i` with `key`, or changes its key if it is already in."""
+        if self.pos[i] == -1:
+            self.key[i] = key
+            self.pos[i] = len(self.heap)
+            self.heap.append(i)
+            self._sift_up(self.pos[i])
+            return
+
+        key_prev = self.key[i]
+        self.key[i] = key
+        if self._less(i, key_prev, i):
+            self._sift_up(self.pos[i])
+        else:
+            self._sift_down(self.pos[i])
+
+    def remove(self, i: int):
+        p = self.pos[i]
+        if p == -1:
+            return
+
+        last = self.heap.pop()
+        self.pos[i] = -1
+        if last != i:
+            self.heap[p] = last
+            self.pos[last] = p
+            self._sift_up(p)
+            self._sift_down(self.pos[last])
+
+    def _less(self, i: int, key_j: Any, j: int) -> bool:
+        return (self.key[i], i) < (key_j, j)
+
+    def _swap(self, p: int, q: int):
+        heap = self.heap
+        heap[p], heap[q] = heap[q], heap[p]
+        self.pos[heap[p]] = p
+        self.pos[heap[q]] = q
+
+    def _sift_up(self, p: int):
+        while p > 0:
+            parent = (p - 1) // 2
+            j = self.heap[parent]
+            if not self._less(self.heap[p], self.key[j], j):
+                break
+
+            self._swap(p, parent)
+            p = parent
+
+    def _sift_down(self, p: int):
+        n = len(self.heap)
+        while True:
+            child = 2 * p + 1
+            if child >= n:
+                break
+
+            if child + 1 < n:
+                j = self.heap[child]
+                if self._less(self.heap[child + 1], self.key[j], j):
+                    child += 1
+
+            j = self.heap[child]
+            if not self._less(j, self.key[self.heap[p]], self.heap[p]):
+                break
+
+            self._swap(p, child)
+            p = child
@@ -0,0 +1,106 @@
+import numpy
+import random
+import simpy
+
+from src.agent import (
+    exp as exp_module,
+    optimal as optimal_module,
+    random as random_module,
+    ts as ts_module,
+)
+from src.prob import random_variable
+from src.sim import sim as sim_module
+from src.sys import node as node_module, server as server_module
+
+
+class FakeNode(node_module.Node):
+    def __init__(self, _id: str, work_left: float, num_tasks_left: int):
+        super().__init__(env=simpy.Environment(), _id=_id)
+        self.work_left_ = work_left
+        self.num_tasks_left_ = num_tasks_left
+
+    def repr_w_state(self) -> str:
+        return f"FakeNode(id= {self._id}, work_left= {self.work_left_}, num_tasks_left= {self.num_tasks_left_})"
+
+    def work_left(self) -> float:
+        return self.work_left_
+
+    def num_tasks_left(self) -> int:
+        return self.num_tasks_left_
+
+    def put(self, service_time: float):
+        self.work_left_ += service_time
+        self.num_tasks_left_ += 1
+        self.notify_state_listeners()
+
+
+def get_node_list() -> list[FakeNode]:
+    random.seed(0)
+    return [
+        FakeNode(_id=f"s{i}", work_left=random.uniform(0, 10), num_tasks_left=random.randint(0, 5))
+        for i in range(8)
+    ]
+
+
+def test_optimal_batch_matches_sequential():
+    task_service_time_list = [random.uniform(0.5, 3) for _ in range(20)]
+
+    for sching_agent_class in [optimal_module.AssignToLeastWorkLeft, optimal_module.AssignToFewestTasksLeft]:
+        node_list = get_node_list()
+        sching_agent = sching_agent_class(node_list=node_list)
+        node_id_list = sching_agent.node_ids_to_assign(
+            k=len(task_service_time_list), task_service_time_list=task_service_time_list
+        )
+
+        node_list = get_node_list()
+        id_to_node_map = {node._id: node for node in node_list}
+        sching_agent = sching_agent_class(node_list=node_list)
+        sequential_node_id_list = []
+        for service_time in task_service_time_list:
+            node_id = sching_agent.node_id_to_assign()
+            id_to_node_map[node_id].put(service_time)
+            sequential_node_id_list.append(node_id)
+
+        assert node_id_list == sequential_node_id_list
+
+
+def test_ts_batch():
+    node_list = get_node_list()
+    for sching_agent in [
+        ts_module.AssignWithThompsonSampling_slidingWin(node_list=node_list, win_len=10),
+        ts_module.AssignWithThompsonSampling_slidingWinForEachNode(node_list=node_list, win_len=10),
+        ts_module.AssignWithThompsonSampling_resetWinOnRareEvent(node_list=node_list, win_len=10, threshold_prob_rare=0.9),
+    ]:
+        # Make s0 clearly the fastest node
+        for i in range(10):
+            for node in node_list:
+                wait_time = 0.01 if node._id == "s0" else 100 + i
+                sching_agent.record_exp(node_id=node._id, exp=exp_module.Exp(service_time=1, wait_time=wait_time))
+
+        node_id_list = sching_agent.node_ids_to_assign(k=50, time_epoch=1)
+        assert len(node_id_list) == 50
+        assert all(node_id in sching_agent.node_id_list for node_id in node_id_list)
+        assert node_id_list.count("s0") > 25
+
+
+def test_sim_w_task_batches():
+    def assign_to_least_work_left(server_list: list[server_module.Server]):
+        return optimal_module.AssignToLeastWorkLeft(node_list=server_list)
+
+    def assign_w_ts_sliding_win_for_each_node(server_list: list[server_module.Server]):
+        return ts_module.AssignWithThompsonSampling_slidingWinForEachNode(node_list=server_list, win_len=100)
+
+    def assign_w_random(server_list: list[server_module.Server]):
+        return random_module.AssignToRandom(node_list=server_list)
+
+    for sching_agent_given_server_list in [assign_to_least_work_left, assign_w_ts_sliding_win_for_each_node, assign_w_random]:
+        sim_result = sim_module.sim(
+            env=simpy.Environment(),
+            num_servers=4,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=200,
+            sching_agent_given_server_list=sching_agent_given_server_list,
+            task_batch_size_rv=random_variable.DiscreteUniform(min_value=1, max_value=3),
+        )
+        assert numpy.isfinite(sim_result.ET)
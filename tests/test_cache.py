@@ -0,0 +1,135 @@
+import numpy
+import os
+import pytest
+
+from src.agent import random as random_module
+from src.prob import random_variable
+from src.sim import cache as cache_module, sim as sim_module, sweep as sweep_module
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> cache_module.Cache:
+    cache = cache_module.Cache(cache_dir=tmp_path)
+    monkeypatch.setattr(cache_module, "default_cache", cache)
+    return cache
+
+
+def sim_kwargs(mu: float = 1, seed: int = 0) -> dict:
+    return dict(
+        num_servers=2,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=1.5),
+        task_service_time_rv=random_variable.Exponential(mu=mu),
+        num_tasks_to_recv=500,
+        sching_agent_given_server_list=sweep_module.AgentSpec(name="Random", agent_class=random_module.AssignToRandom),
+        seed=seed,
+    )
+
+
+def test_get_key():
+    assert cache_module.get_key(sim_kwargs()) == cache_module.get_key(sim_kwargs())
+    assert cache_module.get_key(sim_kwargs()) != cache_module.get_key(sim_kwargs(mu=2))
+    assert cache_module.get_key(sim_kwargs()) != cache_module.get_key(sim_kwargs(seed=1))
+    assert cache_module.get_key(sim_kwargs(seed=None)) is None
+
+    def assign_w_random(server_list):
+        return random_module.AssignToRandom(node_list=server_list)
+
+    assert cache_module.get_key({**sim_kwargs(), "sching_agent_given_server_list": assign_w_random}) is None
+
+    # Sampling does not change the key.
+    config = sim_kwargs()
+    key = cache_module.get_key(config)
+    config["task_service_time_rv"].sample()
+    assert cache_module.get_key(config) == key
+
+
+def test_sim_w_fresh_env_reads_from_cache(cache):
+    sim_result = sim_module.sim_w_fresh_env(**sim_kwargs(), use_cache=True)
+    assert len(cache.path_list()) == 1
+
+    sim_result_from_cache = sim_module.sim_w_fresh_env(**sim_kwargs(), use_cache=True)
+    assert len(cache.path_list()) == 1
+    assert sim_result_from_cache.num_tasks == sim_result.num_tasks
+    assert (sim_result_from_cache.ET, sim_result_from_cache.std_T, sim_result_from_cache.max_T) == (sim_result.ET, sim_result.std_T, sim_result.max_T)
+    assert sim_result_from_cache.quantile_T(0.99) == sim_result.quantile_T(0.99)
+
+    # Not cached without a seed.
+    sim_module.sim_w_fresh_env(**sim_kwargs(seed=None), use_cache=True)
+    assert len(cache.path_list()) == 1
+
+    assert cache.clear() == 1
+    assert cache.path_list() == []
+
+
+def test_Cache_evicts_least_recently_used(cache):
+    array_dict = dict(a=numpy.zeros(1000))
+    for i, key in enumerate(["k0", "k1", "k2"]):
+        cache.put(key, array_dict)
+        os.utime(cache.path(key), (i, i))
+
+    cache.get("k0")
+    cache.max_size_bytes = 2.5 * cache.path("k0").stat().st_size
+    cache.evict()
+
+    assert sorted(path.stem for path in cache.path_list()) == ["k0", "k2"]
+
+
+def test_sweep_w_cache(cache):
+    sweep_kwargs = dict(
+        arrival_rate_list=[0.5, 1.5],
+        num_servers_list=[2],
+        agent_spec_list=[sweep_module.AgentSpec(name="Random", agent_class=random_module.AssignToRandom)],
+        task_service_time_rv_list=[random_variable.Exponential(mu=1)],
+        num_tasks_to_recv=500,
+        seed=0,
+        n_jobs=1,
+        use_cache=True,
+    )
+    row_list = sweep_module.sweep(**sweep_kwargs)
+    assert len(cache.path_list()) == 2
+
+    row_list_from_cache = sweep_module.sweep(**sweep_kwargs)
+    assert [row["ET"] for row in row_list_from_cache] == [row["ET"] for row in row_list]
+    assert len(cache.path_list()) == 2
+
+    # Not cached without a seed, even though each cell gets a child seed.
+    sweep_module.sweep(**{**sweep_kwargs, "seed": None})
+    assert len(cache.path_list()) == 2
+
+
+def test_Cache_get_removes_corrupt_entry(cache):
+    array_dict = dict(a=numpy.arange(1000))
+    cache.put("k0", array_dict)
+    cache.put("k1", array_dict)
+
+    # Truncated, as by an interrupted write.
+    data = cache.path("k0").read_bytes()
+    cache.path("k0").write_bytes(data[: len(data) // 2])
+    cache.path("k1").write_bytes(b"not an npz file")
+
+    assert cache.get("k0") is None
+    assert cache.get("k1") is None
+    assert cache.path_list() == []
+
+
+def test_Cache_put_scans_entries_only_when_over_size(cache, monkeypatch):
+    array_dict = dict(a=numpy.zeros(1000))
+    cache.put("k0", array_dict)
+    cache.max_size_bytes = 10.5 * cache.path("k0").stat().st_size
+
+    num_evicts = 0
+    evict = cache.evict
+    def evict_():
+        nonlocal num_evicts
+        num_evicts += 1
+        evict()
+
+    monkeypatch.setattr(cache, "evict", evict_)
+    for i in range(1, 20):
+        cache.put(f"k{i}", array_dict)
+        assert cache.size_bytes() <= cache.max_size_bytes
+
+    # No eviction until the 11th entry, and each one then frees up space for
+    # the next write too.
+    assert num_evicts <= 5
+    assert not list(cache.cache_dir.glob("*.tmp"))
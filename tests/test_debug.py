@@ -0,0 +1,28 @@
+import logging
+
+from src.utils import debug
+
+
+def test_log_is_lazy_when_disabled():
+    def msg_thunk():
+        raise AssertionError("Should not be called")
+
+    debug.logger.setLevel(logging.INFO)
+    debug.log(debug.DEBUG, msg_thunk)
+    assert not debug.is_enabled(debug.DEBUG)
+
+
+def test_log_extra_points_to_caller(caplog, monkeypatch):
+    monkeypatch.setattr(debug.logger, "propagate", True)
+    # Restores the level of the logger on exit.
+    with caplog.at_level(logging.DEBUG, logger=debug.LOGGER_NAME):
+        debug.log(debug.DEBUG, lambda: "lazy msg", x=1)
+
+    if not debug.DEBUG_LOG_ENABLED:
+        assert len(caplog.records) == 0
+        return
+
+    record = caplog.records[-1]
+    assert record.getMessage().startswith("lazy msg")
+    assert record.file_name == "test_debug.py"
+    assert record.func_name == "test_log_extra_points_to_caller"
@@ -0,0 +1,41 @@
+import numpy
+import pytest
+import random
+
+from src.agent import exp as exp_module, exp_queue as exp_queue_module
+
+
+@pytest.mark.parametrize("exp_queue_class", [exp_queue_module.ExpQueue, exp_queue_module.WaitTimeRingBuffer])
+def test_ExpQueue_matches_numpy(exp_queue_class):
+    random.seed(0)
+    win_len = 20
+    exp_queue = exp_queue_class(win_len=win_len)
+
+    wait_time_list = []
+    for i in range(10 * win_len):
+        wait_time = random.expovariate(1) * (1 + i % 7)
+        exp_queue.append(exp_module.Exp(service_time=1, wait_time=wait_time))
+        wait_time_list.append(wait_time)
+
+        mean, stdev = exp_queue.mean_stdev_wait_time()
+        win = wait_time_list[-win_len:]
+        assert len(exp_queue) == len(win)
+        if exp_queue_class is exp_queue_module.WaitTimeRingBuffer:
+            assert list(exp_queue) == win
+        assert numpy.isclose(mean, numpy.mean(win))
+        assert numpy.isclose(stdev, numpy.std(win))
+
+    exp_queue.clear()
+    assert len(exp_queue) == 0
+    assert exp_queue.mean_stdev_wait_time() == (0, 0)
+
+
+@pytest.mark.parametrize("exp_queue_class", [exp_queue_module.ExpQueue, exp_queue_module.WaitTimeRingBuffer])
+def test_ExpQueue_constant_wait_time(exp_queue_class):
+    exp_queue = exp_queue_class(win_len=5)
+    for wait_time in [3.1, 0.7, 2.2, 1.3, 1.3, 1.3, 1.3, 1.3]:
+        exp_queue.append(exp_module.Exp(service_time=1, wait_time=wait_time))
+
+    mean, stdev = exp_queue.mean_stdev_wait_time()
+    assert numpy.isclose(mean, 1.3)
+    assert stdev == 0
@@ -0,0 +1,50 @@
+import numpy
+import pytest
+import simpy
+
+from src.agent import optimal, ts as ts_module
+from src.prob import random_variable
+from src.sim import heap_engine, sim as sim_module
+from src.sys import server as server_module
+
+
+def test_Environment_processes_events_in_time_then_schedule_order():
+    env = heap_engine.Environment()
+    event_list = []
+    env.schedule(2, event_list.append, "c")
+    env.schedule(1, event_list.append, "a")
+    env.schedule(1, event_list.append, "b")
+    env.schedule(3, lambda _: env.stop())
+    env.schedule(4, event_list.append, "d")
+    env.run()
+
+    assert event_list == ["a", "b", "c"]
+    assert env.now == 3
+
+
+def assign_to_least_work_left(server_list: list[server_module.Server]):
+    return optimal.AssignToLeastWorkLeft(node_list=server_list)
+
+
+def assign_w_ts(server_list: list[server_module.Server]):
+    return ts_module.AssignWithThompsonSampling_slidingWinForEachNode(node_list=server_list, win_len=10)
+
+
+@pytest.mark.parametrize("sching_agent_given_server_list", [assign_to_least_work_left, assign_w_ts])
+def test_heap_engine_matches_simpy(sching_agent_given_server_list):
+    num_servers = 4
+    sim_kwargs = dict(
+        num_servers=num_servers,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=0.8 * num_servers),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=2000,
+        sching_agent_given_server_list=sching_agent_given_server_list,
+        task_batch_size_rv=random_variable.DiscreteUniform(min_value=0, max_value=2),
+        seed=0,
+    )
+    sim_result = sim_module.sim(env=simpy.Environment(), **sim_kwargs)
+    sim_result_w_heap = sim_module.sim(env=None, backend="heap", **sim_kwargs)
+
+    assert sim_result_w_heap.num_tasks == sim_result.num_tasks
+    assert numpy.isclose(sim_result_w_heap.ET, sim_result.ET)
+    assert numpy.isclose(sim_result_w_heap.std_T, sim_result.std_T)
@@ -0,0 +1,25 @@
+import random
+
+from src.utils import indexed_heap
+
+
+def test_IndexedMinHeap():
+    random.seed(0)
+    n = 50
+    heap = indexed_heap.IndexedMinHeap(n=n)
+    i_to_key_map = {}
+
+    for _ in range(5000):
+        i = random.randrange(n)
+        if random.random() < 0.2:
+            heap.remove(i)
+            i_to_key_map.pop(i, None)
+        else:
+            key = random.randint(0, 20)
+            heap.update(i, key)
+            i_to_key_map[i] = key
+
+        assert len(heap) == len(i_to_key_map)
+        assert all((i in heap) == (i in i_to_key_map) for i in range(n))
+        if i_to_key_map:
+            assert heap.peek() == min(i_to_key_map, key=lambda i: (i_to_key_map[i], i))
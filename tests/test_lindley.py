@@ -0,0 +1,97 @@
+import numpy
+import pytest
+import simpy
+import time
+
+from src.agent import optimal as optimal_module, random as random_module, ts as ts_module
+from src.prob import random_variable
+from src.sim import lindley as lindley_module, sim as sim_module, sweep as sweep_module
+from src.sys import server as server_module
+
+from src.utils.debug import *
+
+
+def assign_w_random(server_list: list[server_module.Server]):
+    return random_module.AssignToRandom(node_list=server_list)
+
+
+def test_departure_times_matches_loop():
+    rng = numpy.random.default_rng(0)
+    arrival_time_array = numpy.cumsum(rng.exponential(size=1000))
+    service_time_array = rng.exponential(0.9, size=1000)
+
+    departure_time_list = []
+    departure_time = 0
+    for arrival_time, service_time in zip(arrival_time_array, service_time_array):
+        departure_time = max(departure_time, arrival_time) + service_time
+        departure_time_list.append(departure_time)
+
+    assert numpy.allclose(lindley_module.departure_times(arrival_time_array, service_time_array), departure_time_list)
+
+
+def test_lindley_matches_simpy_on_single_server():
+    sim_kwargs = dict(
+        num_servers=1,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+        task_service_time_rv=random_variable.Exponential(mu=1.25),
+        num_tasks_to_recv=1000,
+        sching_agent_given_server_list=assign_w_random,
+        seed=0,
+    )
+    sim_result = sim_module.sim(env=simpy.Environment(), **sim_kwargs)
+    sim_result_w_lindley = sim_module.sim(env=None, backend="lindley", **sim_kwargs)
+
+    assert sim_result_w_lindley.num_tasks == sim_result.num_tasks
+    assert numpy.isclose(sim_result_w_lindley.ET, sim_result.ET)
+    assert numpy.isclose(sim_result_w_lindley.max_T, sim_result.max_T)
+
+
+def test_lindley_vs_simpy():
+    num_servers = 4
+    sim_kwargs = dict(
+        num_servers=num_servers,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=0.8 * num_servers),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=20000,
+        sching_agent_given_server_list=assign_w_random,
+        task_batch_size_rv=random_variable.DiscreteUniform(min_value=0, max_value=2),
+        seed=0,
+    )
+
+    start_time = time.perf_counter()
+    sim_result = sim_module.sim(env=simpy.Environment(), **sim_kwargs)
+    time_w_simpy = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    sim_result_w_lindley = sim_module.sim(env=None, backend="lindley", **sim_kwargs)
+    time_w_lindley = time.perf_counter() - start_time
+    log(INFO, "", sim_result=sim_result, sim_result_w_lindley=sim_result_w_lindley, time_w_simpy=time_w_simpy, time_w_lindley=time_w_lindley)
+
+    # Tasks arrive in batches of DiscreteUniform(0, 2) tasks, 1 on average,
+    # and are dispatched at random, so the load at each server is 0.8. Each
+    # estimate has a relative error of a few percent.
+    assert sim_result_w_lindley.num_tasks == sim_result.num_tasks
+    assert abs(sim_result_w_lindley.ET - sim_result.ET) < 0.15 * sim_result.ET
+    assert abs(sim_result_w_lindley.quantile_T(0.9) - sim_result.quantile_T(0.9)) < 0.15 * sim_result.quantile_T(0.9)
+
+
+@pytest.mark.parametrize(
+    "sching_agent_given_server_list",
+    [
+        sweep_module.AgentSpec(name="AssignToLeastWorkLeft", agent_class=optimal_module.AssignToLeastWorkLeft),
+        lambda server_list: optimal_module.AssignToLeastWorkLeft(node_list=server_list),
+        lambda server_list: ts_module.AssignWithThompsonSampling_slidingWin(node_list=server_list, win_len=10),
+    ],
+)
+def test_lindley_w_state_dependent_agent_raises(sching_agent_given_server_list):
+    with pytest.raises(ValueError, match="lindley"):
+        sim_module.sim(
+            env=None,
+            num_servers=2,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=100,
+            sching_agent_given_server_list=sching_agent_given_server_list,
+            seed=0,
+            backend="lindley",
+        )
@@ -0,0 +1,39 @@
+import simpy
+
+from src.agent import optimal as optimal_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+from src.sys import server as server_module
+
+
+class AssignToLeastWorkLeft_checked(optimal_module.AssignToLeastWorkLeft):
+    def node_id_to_assign(self, time_epoch: float=None) -> str:
+        node_id = super().node_id_to_assign(time_epoch=time_epoch)
+
+        least_work = min(node.work_left() for node in self.node_list)
+        assert abs(self.node_list[self.node_id_to_index_map[node_id]].work_left() - least_work) < 1e-9
+        return node_id
+
+
+class AssignToFewestTasksLeft_checked(optimal_module.AssignToFewestTasksLeft):
+    def node_id_to_assign(self, time_epoch: float=None) -> str:
+        node_id = super().node_id_to_assign(time_epoch=time_epoch)
+
+        node_w_fewest_tasks_left = min(self.node_list, key=lambda node: node.num_tasks_left())
+        assert node_id == node_w_fewest_tasks_left._id
+        return node_id
+
+
+def test_indexed_agents_match_linear_scan():
+    for sching_agent_class in [AssignToLeastWorkLeft_checked, AssignToFewestTasksLeft_checked]:
+        def sching_agent_given_server_list(server_list: list[server_module.Server]):
+            return sching_agent_class(node_list=server_list)
+
+        sim_module.sim(
+            env=simpy.Environment(),
+            num_servers=8,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=7),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=5000,
+            sching_agent_given_server_list=sching_agent_given_server_list,
+        )
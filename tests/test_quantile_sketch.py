@@ -0,0 +1,48 @@
+import numpy
+import pytest
+
+from src.prob import quantile_sketch
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_QuantileSketch_within_relative_accuracy(relative_accuracy: float):
+    rng = numpy.random.default_rng(0)
+    value_array = numpy.concatenate([numpy.zeros(10), rng.lognormal(mean=0, sigma=2, size=10000)])
+
+    sketch = quantile_sketch.QuantileSketch(relative_accuracy=relative_accuracy)
+    for value in value_array:
+        sketch.add(value)
+
+    assert sketch.quantile(0) == 0
+    for q in [0.01, 0.5, 0.95, 0.99, 0.999, 1]:
+        value = numpy.quantile(value_array, q, method="lower")
+        assert abs(sketch.quantile(q) - value) <= relative_accuracy * value * (1 + 1e-9)
+
+
+def test_QuantileSketch_merge_is_exact():
+    rng = numpy.random.default_rng(0)
+    value_array = rng.exponential(size=1000)
+
+    sketch = quantile_sketch.QuantileSketch()
+    sketch_list = [quantile_sketch.QuantileSketch() for _ in range(3)]
+    for i, value in enumerate(value_array):
+        sketch.add(value)
+        sketch_list[i % 3].add(value)
+
+    merged_sketch = quantile_sketch.QuantileSketch()
+    for sketch_ in sketch_list:
+        merged_sketch.merge(sketch_)
+
+    assert merged_sketch.count == sketch.count
+    assert merged_sketch.bucket_to_count_map == sketch.bucket_to_count_map
+
+
+def test_QuantileSketch_collapse_keeps_high_quantiles():
+    sketch = quantile_sketch.QuantileSketch(max_num_buckets=100)
+    value_array = numpy.geomspace(1e-6, 1e6, 10000)
+    for value in value_array:
+        sketch.add(value)
+
+    assert len(sketch.bucket_to_count_map) <= 100
+    value = numpy.quantile(value_array, 0.99, method="lower")
+    assert abs(sketch.quantile(0.99) - value) <= 0.01 * value * (1 + 1e-9)
@@ -0,0 +1,67 @@
+import numpy
+import scipy.stats
+
+from src.prob import random_variable
+
+
+def test_sample_truncated_normal():
+    mu_array = numpy.array([0, 0.5, 2, 10])
+    sigma_array = numpy.array([1, 2, 0.5, 3])
+
+    sample_array = random_variable.sample_truncated_normal(
+        mu=mu_array, sigma=sigma_array, num_samples=100000, rng=numpy.random.default_rng(0)
+    )
+    assert sample_array.shape == (100000, 4)
+    assert numpy.all(sample_array >= 0)
+
+    for i, (mu, sigma) in enumerate(zip(mu_array, sigma_array)):
+        dist = scipy.stats.truncnorm(a=-mu / sigma, b=10, loc=mu, scale=sigma)
+        assert numpy.isclose(numpy.mean(sample_array[:, i]), dist.mean(), rtol=0.02)
+        assert numpy.isclose(numpy.std(sample_array[:, i]), dist.std(), rtol=0.02)
+
+
+def test_sample_truncated_normal_w_zero_sigma():
+    sample_array = random_variable.sample_truncated_normal(mu=[1.5, -1], sigma=[0, 0])
+    assert numpy.array_equal(sample_array, [1.5, 0])
+
+
+def test_TruncatedNormal_matches_scipy():
+    for mu, sigma in [(0, 1), (0.5, 2), (3, 0.5), (10, 3)]:
+        rv = random_variable.TruncatedNormal(mu=mu, sigma=sigma)
+        dist = scipy.stats.truncnorm(a=-mu / sigma, b=10, loc=mu, scale=sigma)
+
+        assert numpy.isclose(rv.mean(), dist.mean())
+        assert numpy.isclose(rv.std(), dist.std())
+        for x in [-1, 0, 0.3, mu, mu + sigma, mu + 20 * sigma]:
+            assert numpy.isclose(rv.cdf(x), dist.cdf(x))
+            assert numpy.isclose(rv.tail_prob(x), dist.sf(x))
+
+        assert isinstance(rv.sample(), float)
+        assert rv.sample(n=10).shape == (10,)
+
+
+def test_buffered_sample():
+    for rv in [
+        random_variable.Normal(mu=1, sigma=2),
+        random_variable.Exponential(mu=2, D=1),
+        random_variable.Uniform(min_value=1, max_value=3),
+        random_variable.DiscreteUniform(min_value=1, max_value=5),
+        random_variable.CustomDiscrete(value_list=[1, 2, 4], prob_weight_list=[1, 2, 1]),
+        random_variable.BoundedZipf(min_value=1, max_value=10, a=1.5),
+    ]:
+        rv.buffer_size = 1000
+        rv.rng = numpy.random.default_rng(0)
+        sample_list = [rv.sample() for _ in range(2500)]
+        assert all(isinstance(x, (int, float)) for x in sample_list)
+        assert all(rv.min_value <= x <= rv.max_value for x in sample_list)
+
+        rv.rng = numpy.random.default_rng(0)
+        assert sample_list[:1000] == rv.sample_n(1000).tolist()
+
+
+def test_buffered_sample_mean():
+    rv = random_variable.Exponential(mu=2, D=1, buffer_size=100)
+    assert numpy.isclose(numpy.mean([rv.sample() for _ in range(100000)]), rv.mean(), rtol=0.02)
+
+    rv = random_variable.DiscreteUniform(min_value=1, max_value=5, buffer_size=100)
+    assert numpy.isclose(numpy.mean([rv.sample() for _ in range(100000)]), rv.mean(), rtol=0.02)
@@ -0,0 +1,40 @@
+import numpy
+import random
+
+from src.prob import running_stats
+
+
+def test_StreamStats_merge_matches_numpy():
+    random.seed(0)
+    value_list_list = [[random.expovariate(1) * (1 + i) for _ in range(n)] for i, n in enumerate([0, 1, 7, 100])]
+
+    stream_stats = running_stats.StreamStats()
+    for value_list in value_list_list:
+        stream_stats_ = running_stats.StreamStats()
+        for value in value_list:
+            stream_stats_.add(value)
+
+        stream_stats.merge(stream_stats_)
+
+    value_list = sum(value_list_list, [])
+    assert stream_stats.count == len(value_list)
+    assert numpy.isclose(stream_stats.mean(), numpy.mean(value_list))
+    assert numpy.isclose(stream_stats.stdev(), numpy.std(value_list))
+    assert stream_stats.min_value == min(value_list)
+    assert stream_stats.max_value == max(value_list)
+
+
+def test_RunningStats_small_spread_at_large_mean():
+    random.seed(0)
+    win_len = 50
+    value_list = [1e6 + random.uniform(0, 1) for _ in range(10 * win_len)]
+
+    running_stats_ = running_stats.RunningStats()
+    for i, value in enumerate(value_list):
+        running_stats_.add(value)
+        if i >= win_len:
+            running_stats_.remove(value_list[i - win_len])
+
+    win = value_list[-win_len:]
+    assert numpy.isclose(running_stats_.mean(), numpy.mean(win))
+    assert numpy.isclose(running_stats_.stdev(), numpy.std(win), rtol=1e-3)
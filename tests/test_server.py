@@ -0,0 +1,84 @@
+import math
+import random
+import simpy
+
+from src.sys import server as server_module, sink as sink_module, task as task_module
+
+
+def put_tasks(env: simpy.Environment, server: server_module.Server, arrival_time_and_service_time_list: list[tuple[float, float]]):
+    for i, (arrival_time, service_time) in enumerate(arrival_time_and_service_time_list):
+        yield env.timeout(arrival_time - env.now)
+        server.put(task_module.Task(_id=i, service_time=service_time, arrival_time=env.now))
+
+
+def test_Server_counters_at_transitions_and_between():
+    env = simpy.Environment()
+    sink = sink_module.Sink(env=env, _id="sink", num_tasks_to_recv=3)
+    server = server_module.Server(env=env, _id="s0", sink=sink)
+
+    # Tasks arrive at 0, 1 and 1.5, and are served in [0, 2], [2, 5] and [5, 6].
+    env.process(put_tasks(env, server, [(0, 2), (1, 3), (1.5, 1)]))
+
+    # The state listener sees the counters right after each put and departure.
+    time_and_state_list = []
+    server.add_state_listener(lambda node: time_and_state_list.append((env.now, node.num_tasks_left(), node.work_left())))
+
+    # Between the events, there is nothing left to process at `env.now`.
+    for time, num_tasks_left, work_left in [
+        (0.5, 1, 1.5),
+        (1.25, 2, 3.75),
+        (1.75, 3, 4.25),
+        (3, 2, 3),
+        (5.5, 1, 0.5),
+    ]:
+        env.run(until=time)
+        assert server.num_tasks_left() == num_tasks_left
+        assert math.isclose(server.work_left(), work_left)
+
+    env.run(until=sink.recv_tasks_proc)
+    assert server.num_tasks_left() == 0
+    assert server.work_left() == 0
+
+    assert time_and_state_list == [
+        # Puts
+        (0, 1, 2),
+        (1, 2, 4),
+        (1.5, 3, 4.5),
+        # Departures
+        (2, 2, 4),
+        (5, 1, 1),
+        (6, 0, 0),
+    ]
+
+
+def test_Server_work_left():
+    random.seed(0)
+    env = simpy.Environment()
+    sink = sink_module.Sink(env=env, _id="sink", num_tasks_to_recv=100)
+    server = server_module.Server(env=env, _id="s0", sink=sink)
+
+    def work_left_by_scan() -> float:
+        remaining_serv_time = 0
+        if server.task_in_serv:
+            remaining_serv_time = server.task_in_serv.service_time - (env.now - server.serv_start_time)
+
+        return remaining_serv_time + sum(task.service_time for task in server.task_store.items)
+
+    arrival_time_list = []
+    arrival_time = 0
+    for _ in range(100):
+        arrival_time += random.expovariate(1.2)
+        arrival_time_list.append(arrival_time)
+    env.process(put_tasks(env, server, [(arrival_time, random.expovariate(1)) for arrival_time in arrival_time_list]))
+
+    # Checked at times that (almost surely) fall between the events, so that
+    # every event at `env.now` has been processed.
+    time = 0.05
+    while sink.recv_tasks_proc.is_alive:
+        env.run(until=time)
+        assert math.isclose(server.work_left(), work_left_by_scan(), abs_tol=1e-9)
+        assert server.num_tasks_left() == len(server.task_store.items) + int(server.task_in_serv is not None)
+        time += 0.1
+
+    assert server.work_left() == 0
+    assert server.num_tasks_left() == 0
@@ -0,0 +1,93 @@
+import numpy
+
+from src.agent import random as random_module, ts as ts_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+from src.sys import server as server_module
+
+
+def assign_w_random(server_list: list[server_module.Server]):
+    return random_module.AssignToRandom(node_list=server_list)
+
+
+def test_sim_w_joblib_runs_are_independent():
+    num_sim_runs, num_tasks_to_recv = 4, 200
+    sim_kwargs = dict(
+        num_servers=2,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=num_tasks_to_recv,
+        sching_agent_given_server_list=assign_w_random,
+    )
+    sim_result = sim_module.sim_w_joblib(**sim_kwargs, num_sim_runs=num_sim_runs, n_jobs=2, seed=0)
+
+    sim_result_list = [
+        sim_module.sim_w_fresh_env(**sim_kwargs, seed=seed_seq)
+        for seed_seq in numpy.random.SeedSequence(0).spawn(num_sim_runs)
+    ]
+    assert len({sim_result_.ET for sim_result_ in sim_result_list}) == num_sim_runs
+
+    assert sim_result.num_tasks == num_sim_runs * num_tasks_to_recv
+    assert numpy.isclose(sim_result.ET, numpy.mean([sim_result_.ET for sim_result_ in sim_result_list]))
+    assert sim_result.max_T == max(sim_result_.max_T for sim_result_ in sim_result_list)
+    assert sim_result.response_time_sketch.count == sim_result.num_tasks
+    assert sim_result.quantile_T(0.5) <= sim_result.percentile_T(99) <= sim_result.max_T * 1.01
+
+
+def assign_w_ts(server_list: list[server_module.Server]):
+    return ts_module.AssignWithThompsonSampling_slidingWinForEachNode(node_list=server_list, win_len=10)
+
+
+def test_sim_is_reproducible_w_seed():
+    def sim_(seed: int) -> sim_module.SimResult:
+        return sim_module.sim_w_fresh_env(
+            num_servers=2,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=200,
+            sching_agent_given_server_list=assign_w_ts,
+            task_batch_size_rv=random_variable.DiscreteUniform(min_value=0, max_value=2),
+            seed=seed,
+        )
+
+    sim_result = sim_(seed=0)
+    sim_result_w_same_seed = sim_(seed=0)
+    assert (sim_result.ET, sim_result.std_T, sim_result.max_T) == (sim_result_w_same_seed.ET, sim_result_w_same_seed.std_T, sim_result_w_same_seed.max_T)
+    assert sim_result.ET != sim_(seed=1).ET
+
+
+def test_sim_w_joblib_is_reproducible_w_seed():
+    def sim_w_joblib(n_jobs: int) -> sim_module.SimResult:
+        return sim_module.sim_w_joblib(
+            num_servers=2,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=100,
+            sching_agent_given_server_list=assign_w_random,
+            num_sim_runs=3,
+            n_jobs=n_jobs,
+            seed=0,
+        )
+
+    sim_result, sim_result_w_2_jobs = sim_w_joblib(n_jobs=1), sim_w_joblib(n_jobs=2)
+    assert (sim_result.ET, sim_result.std_T) == (sim_result_w_2_jobs.ET, sim_result_w_2_jobs.std_T)
+
+
+def test_sim_w_joblib_is_reproducible_w_same_SeedSequence():
+    seed_seq = numpy.random.SeedSequence(0)
+
+    def sim_w_joblib() -> sim_module.SimResult:
+        return sim_module.sim_w_joblib(
+            num_servers=2,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=100,
+            sching_agent_given_server_list=assign_w_random,
+            num_sim_runs=3,
+            n_jobs=1,
+            seed=seed_seq,
+        )
+
+    sim_result, sim_result_2 = sim_w_joblib(), sim_w_joblib()
+    assert (sim_result.ET, sim_result.std_T, sim_result.max_T) == (sim_result_2.ET, sim_result_2.std_T, sim_result_2.max_T)
+    assert seed_seq.n_children_spawned == 0
@@ -0,0 +1,115 @@
+import numpy
+import pytest
+import simpy
+
+from src.agent import random as random_module
+from src.prob import random_variable
+from src.sim import sim as sim_module, stopping as stopping_module
+from src.sys import server as server_module
+
+
+def test_mser_truncation_point_drops_transient():
+    rng = numpy.random.default_rng(0)
+    x_array = rng.exponential(size=10000)
+    x_array[:1000] += numpy.linspace(50, 0, 1000)
+
+    truncation_point = stopping_module.mser_truncation_point(x_array)
+    assert 500 <= truncation_point <= 1500
+    assert stopping_module.mser_truncation_point(rng.exponential(size=10000)) < 1000
+
+
+@pytest.mark.parametrize("quantile", [None, 0.9])
+def test_batch_means_ci_covers(quantile: float):
+    rng = numpy.random.default_rng(0)
+    true_value = 1 if quantile is None else -numpy.log(1 - quantile)
+
+    num_covered = 0
+    for _ in range(100):
+        estimate, half_width = stopping_module.batch_means_ci(
+            x_array=rng.exponential(size=2000), num_batches=20, confidence=0.95, quantile=quantile,
+        )
+        num_covered += abs(estimate - true_value) <= half_width
+
+    assert num_covered >= 85
+
+
+def assign_w_random(server_list: list[server_module.Server]):
+    return random_module.AssignToRandom(node_list=server_list)
+
+
+@pytest.mark.parametrize("backend", ["simpy", "heap"])
+def test_sim_w_stopping_rule(backend: str):
+    num_tasks_cap = 200000
+    stopping_rule = stopping_module.StoppingRule(rel_half_width=0.05)
+    # Each server is M/M/1 with arrival rate 0.5, so E[T] = 1 / (1 - 0.5) = 2.
+    sim_result = sim_module.sim(
+        env=simpy.Environment(),
+        num_servers=2,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=num_tasks_cap,
+        sching_agent_given_server_list=assign_w_random,
+        seed=0,
+        backend=backend,
+        stopping_rule=stopping_rule,
+    )
+
+    assert sim_result.num_tasks < num_tasks_cap // 10
+    assert abs(sim_result.ET - 2) < 3 * 0.05 * 2
+
+
+def test_Stopper_memory_is_bounded():
+    stopping_rule = stopping_module.StoppingRule(rel_half_width=0, min_num_tasks=1000, max_num_blocks=64)
+    stopper = stopping_module.Stopper(stopping_rule)
+    rng = numpy.random.default_rng(0)
+    x_array = rng.exponential(size=100000)
+    for x in x_array:
+        stopper.add(float(x))
+
+    assert len(stopper.block_sum_array) < stopping_rule.max_num_blocks
+    assert len(stopper.segment_list) <= stopper.max_num_segments
+
+    response_time_stats, response_time_sketch = stopper.steady_state_stats_and_sketch()
+    steady_state_x_array = x_array[stopper.truncation_point:]
+    # The segments may start up to one segment after the truncation point.
+    assert len(steady_state_x_array) - stopper.segment_size < response_time_stats.count <= len(steady_state_x_array)
+    assert numpy.isclose(response_time_stats.mean(), steady_state_x_array.mean(), rtol=0.01)
+    assert numpy.isclose(response_time_sketch.quantile(0.9), numpy.quantile(steady_state_x_array, 0.9), rtol=0.05)
+
+
+@pytest.mark.parametrize("max_num_blocks", [2, 3, 63, 64])
+def test_Stopper_merges_blocks_w_any_max_num_blocks(max_num_blocks: int):
+    stopper = stopping_module.Stopper(stopping_module.StoppingRule(rel_half_width=0, max_num_blocks=max_num_blocks))
+    x_array = numpy.random.default_rng(0).exponential(size=10000)
+    for x in x_array:
+        stopper.add(float(x))
+
+        # Each response time is in exactly one block.
+        assert len(stopper.block_sum_array) < max_num_blocks
+        assert len(stopper.block_sum_array) * stopper.block_size + stopper.num_tasks_in_block == stopper.num_tasks
+
+    assert numpy.isclose(sum(stopper.block_sum_array) + stopper.block_sum, x_array.sum())
+
+
+def test_StoppingRule_w_too_few_blocks_raises():
+    with pytest.raises(ValueError):
+        stopping_module.StoppingRule(max_num_blocks=1)
+
+
+def test_sim_w_stopping_rule_on_quantile():
+    stopping_rule = stopping_module.StoppingRule(rel_half_width=0.05, quantile=0.9)
+    # E[T] = 2 as above, and T ~ Exp(1 / 2), so the 0.9 quantile is 2 * ln(10).
+    sim_result = sim_module.sim(
+        env=simpy.Environment(),
+        num_servers=2,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=200000,
+        sching_agent_given_server_list=assign_w_random,
+        seed=0,
+        backend="heap",
+        stopping_rule=stopping_rule,
+    )
+
+    assert sim_result.num_tasks < 200000
+    assert abs(sim_result.response_time_sketch.quantile(0.9) - 2 * numpy.log(10)) < 3 * 0.05 * 2 * numpy.log(10)
@@ -0,0 +1,53 @@
+import numpy
+
+from src.agent import optimal as optimal_module, random as random_module
+from src.prob import random_variable
+from src.sim import sweep as sweep_module
+
+
+def test_sweep():
+    agent_spec_list = [
+        sweep_module.AgentSpec(name="Random", agent_class=random_module.AssignToRandom),
+        sweep_module.AgentSpec(name="AssignToLeastWorkLeft", agent_class=optimal_module.AssignToLeastWorkLeft),
+    ]
+    sweep_kwargs = dict(
+        arrival_rate_list=[0.5, 1.6],
+        num_servers_list=[2],
+        agent_spec_list=agent_spec_list,
+        task_service_time_rv_list=[random_variable.Exponential(mu=1)],
+        num_tasks_to_recv=500,
+        num_sim_runs=2,
+        seed=0,
+    )
+    row_list = sweep_module.sweep(**sweep_kwargs, n_jobs=2)
+
+    assert [(row["arrival_rate"], row["agent"]) for row in row_list] == [
+        (0.5, "Random"), (0.5, "AssignToLeastWorkLeft"), (1.6, "Random"), (1.6, "AssignToLeastWorkLeft"),
+    ]
+    assert sweep_module.select(row_list, "load", agent="Random") == [0.25, 0.8]
+    assert all(row["sim_result"].num_tasks == 2 * 500 for row in row_list)
+
+    # Least work left beats random at high load.
+    ET_random, ET_least_work_left = sweep_module.select(row_list, "ET", arrival_rate=1.6)
+    assert ET_least_work_left < ET_random
+
+    row_list_w_1_job = sweep_module.sweep(**sweep_kwargs, n_jobs=1)
+    assert [row["ET"] for row in row_list_w_1_job] == [row["ET"] for row in row_list]
+
+
+def test_sweep_is_reproducible_w_same_SeedSequence():
+    seed_seq = numpy.random.SeedSequence(0)
+    sweep_kwargs = dict(
+        arrival_rate_list=[0.5, 1.6],
+        num_servers_list=[2],
+        agent_spec_list=[sweep_module.AgentSpec(name="Random", agent_class=random_module.AssignToRandom)],
+        task_service_time_rv_list=[random_variable.Exponential(mu=1)],
+        num_tasks_to_recv=200,
+        num_sim_runs=2,
+        seed=seed_seq,
+        n_jobs=1,
+    )
+
+    row_list = sweep_module.sweep(**sweep_kwargs)
+    row_list_2 = sweep_module.sweep(**sweep_kwargs)
+    assert [row["ET"] for row in row_list] == [row["ET"] for row in row_list_2]
@@ -0,0 +1,87 @@
+import numpy
+import pytest
+import simpy
+
+from src.agent import optimal as optimal_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+from src.sys import task as task_module, task_recorder as task_recorder_module
+
+
+@pytest.mark.parametrize("backend", ["simpy", "heap"])
+def test_sim_w_task_record_path(tmp_path, backend):
+    num_servers = 4
+    task_record_path = tmp_path / "task_records.bin"
+    sim_result = sim_module.sim(
+        env=simpy.Environment(),
+        num_servers=num_servers,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=0.8 * num_servers),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=1000,
+        sching_agent_given_server_list=lambda server_list: optimal_module.AssignToLeastWorkLeft(node_list=server_list),
+        seed=0,
+        backend=backend,
+        task_record_path=task_record_path,
+    )
+
+    record_array = task_recorder_module.load(task_record_path)
+    assert len(record_array) == sim_result.num_tasks == 1000
+    assert set(record_array["node_index"]) == set(range(num_servers))
+    assert numpy.all(numpy.diff(record_array["completion_time"]) >= 0)
+    assert numpy.all(record_array["wait_time"] >= -1e-9)
+
+    response_time_array = record_array["completion_time"] - record_array["arrival_time"]
+    assert numpy.isclose(response_time_array.mean(), sim_result.ET)
+    assert numpy.allclose(response_time_array, record_array["wait_time"] + record_array["service_time"])
+
+
+def test_TaskRecorder_flushes_in_chunks(tmp_path):
+    task_record_path = tmp_path / "task_records.bin"
+    with task_recorder_module.TaskRecorder(path=task_record_path, node_id_list=["s0", "s1"], chunk_size=3) as task_recorder:
+        for i in range(7):
+            task = task_module.Task(_id=i, service_time=1, arrival_time=i)
+            task.node_id = f"s{i % 2}"
+            task_recorder.record(task=task, completion_time=i + 2)
+
+        # Only the full chunks are written before closing.
+        assert task_record_path.stat().st_size == 6 * task_recorder_module.TASK_RECORD_DTYPE.itemsize
+
+    record_array = task_recorder_module.load(task_record_path)
+    assert record_array["task_id"].tolist() == list(range(7))
+    assert record_array["node_index"].tolist() == [0, 1, 0, 1, 0, 1, 0]
+    assert record_array["wait_time"].tolist() == [1] * 7
+
+
+class FailingAgent(optimal_module.AssignToLeastWorkLeft):
+    def __init__(self, node_list, num_decisions_to_fail_at: int):
+        super().__init__(node_list=node_list)
+        self.num_decisions_to_fail_at = num_decisions_to_fail_at
+        self.num_decisions = 0
+
+    def node_id_to_assign(self, time_epoch: float = None) -> str:
+        self.num_decisions += 1
+        if self.num_decisions == self.num_decisions_to_fail_at:
+            raise RuntimeError("Agent failed")
+
+        return super().node_id_to_assign(time_epoch=time_epoch)
+
+
+def test_sim_w_task_record_path_keeps_records_on_failure(tmp_path):
+    task_record_path = tmp_path / "task_records.bin"
+    with pytest.raises(RuntimeError):
+        sim_module.sim(
+            env=None,
+            num_servers=2,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=1000,
+            sching_agent_given_server_list=lambda server_list: FailingAgent(node_list=server_list, num_decisions_to_fail_at=500),
+            seed=0,
+            backend="heap",
+            task_record_path=task_record_path,
+        )
+
+    # The tasks that finished before the failure are all in the file.
+    record_array = task_recorder_module.load(task_record_path)
+    assert 400 < len(record_array) < 500
+    assert record_array["task_id"].max() < 499
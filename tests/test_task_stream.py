@@ -0,0 +1,147 @@
+import numpy
+import simpy
+import tracemalloc
+
+from src.agent import optimal as optimal_module
+from src.prob import random_variable
+from src.sim import sim as sim_module, sweep as sweep_module
+from src.sys import task_stream as task_stream_module
+
+
+def test_TaskStream_replays_the_same_tasks():
+    task_stream = task_stream_module.TaskStream.sample(
+        num_tasks=1000,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=1),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        seed=0,
+    )
+    task_stream.chunk_size = 64
+
+    arrival_time_list = [arrival_time for arrival_time, _ in task_stream]
+    assert len(arrival_time_list) == len(task_stream) == 1000
+    assert arrival_time_list == task_stream.arrival_time_array.tolist()
+    assert list(task_stream) == list(task_stream)
+
+
+def test_sim_w_task_stream():
+    task_stream = task_stream_module.TaskStream.sample(
+        num_tasks=2000,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=3.2),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        seed=0,
+    )
+    sim_kwargs = dict(
+        num_servers=4,
+        inter_task_gen_time_rv=None,
+        task_service_time_rv=None,
+        num_tasks_to_recv=5000,
+        sching_agent_given_server_list=lambda server_list: optimal_module.AssignToLeastWorkLeft(node_list=server_list),
+        task_stream=task_stream,
+    )
+    # The seed does not matter for a deterministic agent on a given stream.
+    sim_result = sim_module.sim(env=simpy.Environment(), seed=0, **sim_kwargs)
+    sim_result_w_heap = sim_module.sim(env=None, backend="heap", seed=1, **sim_kwargs)
+
+    assert sim_result.num_tasks == sim_result_w_heap.num_tasks == 2000
+    assert numpy.isclose(sim_result_w_heap.ET, sim_result.ET)
+    assert numpy.isclose(sim_result_w_heap.max_T, sim_result.max_T)
+
+
+def test_sweep_w_common_random_numbers():
+    sweep_kwargs = dict(
+        arrival_rate_list=[1.6],
+        num_servers_list=[2],
+        agent_spec_list=[
+            sweep_module.AgentSpec(name="AssignToFewestTasksLeft", agent_class=optimal_module.AssignToFewestTasksLeft),
+            sweep_module.AgentSpec(name="AssignToLeastWorkLeft", agent_class=optimal_module.AssignToLeastWorkLeft),
+        ],
+        task_service_time_rv_list=[random_variable.Exponential(mu=1)],
+        num_tasks_to_recv=500,
+        num_sim_runs=10,
+        seed=0,
+        n_jobs=1,
+        backend="heap",
+    )
+
+    def std_of_paired_ET_diff(row_list):
+        ET_fewest_tasks_left_list, ET_least_work_left_list = sweep_module.select(row_list, "ET_list")
+        return numpy.std(numpy.array(ET_fewest_tasks_left_list) - numpy.array(ET_least_work_left_list))
+
+    row_list = sweep_module.sweep(**sweep_kwargs)
+    row_list_w_crn = sweep_module.sweep(**sweep_kwargs, common_random_numbers=True)
+
+    assert all(row["sim_result"].num_tasks == 10 * 500 for row in row_list_w_crn)
+    assert std_of_paired_ET_diff(row_list_w_crn) < std_of_paired_ET_diff(row_list) / 4
+
+
+def test_TaskStream_from_csv_trace(tmp_path):
+    task_stream = task_stream_module.TaskStream.sample(
+        num_tasks=1000,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=3.2),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        seed=0,
+    )
+    csv_path = tmp_path / "trace.csv"
+    with open(csv_path, "w") as f:
+        f.write("task_id,arrival_time,service_time\n")
+        for task_id, (arrival_time, service_time) in enumerate(task_stream):
+            f.write(f"{task_id},{arrival_time!r},{service_time!r}\n")
+
+    npy_path = tmp_path / "trace.npy"
+    num_tasks = task_stream_module.csv_to_npy(
+        csv_path=csv_path,
+        npy_path=npy_path,
+        arrival_time_column=1,
+        service_time_column=2,
+        chunk_size=300,
+    )
+    task_stream_from_file = task_stream_module.TaskStream.from_file(npy_path, chunk_size=256)
+
+    assert num_tasks == len(task_stream_from_file) == 1000
+    assert isinstance(task_stream_from_file.arrival_time_array, numpy.memmap)
+    assert list(task_stream_from_file) == list(task_stream)
+
+    task_stream.to_file(tmp_path / "trace_2.npy")
+    assert list(task_stream_module.TaskStream.from_file(tmp_path / "trace_2.npy")) == list(task_stream)
+
+
+def test_TaskStream_from_file_streams_in_chunks(tmp_path):
+    num_tasks = 2**20
+    npy_path = tmp_path / "trace.npy"
+    task_stream_module.TaskStream(
+        arrival_time_array=numpy.arange(num_tasks, dtype=float),
+        service_time_array=numpy.ones(num_tasks),
+    ).to_file(npy_path)
+
+    task_stream = task_stream_module.TaskStream.from_file(npy_path)
+    tracemalloc.start()
+    num_tasks_replayed = sum(1 for _ in task_stream)
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert num_tasks_replayed == num_tasks
+    # The trace is 16 MB.
+    assert peak_size < 2**20
+
+
+def test_sweep_w_common_random_numbers_streams_do_not_depend_on_agents():
+    def ET_list_of_least_work_left(agent_spec_list):
+        row_list = sweep_module.sweep(
+            arrival_rate_list=[1.6],
+            num_servers_list=[2],
+            agent_spec_list=agent_spec_list,
+            task_service_time_rv_list=[random_variable.Exponential(mu=1)],
+            num_tasks_to_recv=200,
+            num_sim_runs=3,
+            seed=0,
+            n_jobs=1,
+            backend="heap",
+            common_random_numbers=True,
+        )
+        return sweep_module.select(row_list, "ET_list", agent="AssignToLeastWorkLeft")
+
+    agent_spec = sweep_module.AgentSpec(name="AssignToLeastWorkLeft", agent_class=optimal_module.AssignToLeastWorkLeft)
+    # The agent is deterministic, so its results only depend on the streams.
+    assert ET_list_of_least_work_left([agent_spec]) == ET_list_of_least_work_left(
+        [sweep_module.AgentSpec(name="AssignToFewestTasksLeft", agent_class=optimal_module.AssignToFewestTasksLeft), agent_spec]
+    )
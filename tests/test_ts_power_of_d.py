@@ -0,0 +1,90 @@
+import numpy
+import pytest
+import simpy
+
+from src.agent import exp as exp_module, ts as ts_module
+from src.prob import random_variable
+from src.sim import sim as sim_module
+from src.sys import node as node_module, server as server_module
+
+
+def power_of_d_agent(num_nodes: int, d: int, sample_prev_best: bool = True, seed: int = 0):
+    """Returns the agent with `win_len` wait times recorded at each node, and
+    the list to which the node indices sampled at each decision are appended.
+    """
+    node_list = [node_module.Node(env=None, _id=f"s{i}") for i in range(num_nodes)]
+    sching_agent = ts_module.AssignWithThompsonSampling_slidingWinForEachNode_powerOfD(
+        node_list=node_list, win_len=10, d=d, sample_prev_best=sample_prev_best,
+    )
+    sching_agent.set_rng(numpy.random.default_rng(seed))
+
+    rng = numpy.random.default_rng(seed)
+    for node_id in sching_agent.node_id_list:
+        for _ in range(10):
+            sching_agent.record_exp(node_id=node_id, exp=exp_module.Exp(service_time=1, wait_time=float(rng.exponential())))
+
+    node_id_to_index_map = {node_id: i for i, node_id in enumerate(sching_agent.node_id_list)}
+    sampled_node_index_list_list = []
+    mean_stdev_wait_time = sching_agent.mean_stdev_wait_time
+    def mean_stdev_wait_time_(node_id: str):
+        sampled_node_index_list_list[-1].append(node_id_to_index_map[node_id])
+        return mean_stdev_wait_time(node_id)
+
+    sching_agent.mean_stdev_wait_time = mean_stdev_wait_time_
+    return sching_agent, sampled_node_index_list_list
+
+
+@pytest.mark.parametrize("sample_prev_best", [True, False])
+def test_power_of_d_samples_only_d_nodes_and_prev_best(sample_prev_best: bool):
+    d = 3
+    sching_agent, sampled_node_index_list_list = power_of_d_agent(num_nodes=100, d=d, sample_prev_best=sample_prev_best)
+
+    prev_best_node_index = None
+    for _ in range(200):
+        sampled_node_index_list_list.append([])
+        node_id = sching_agent.node_id_to_assign()
+        sampled_node_index_list = sampled_node_index_list_list[-1]
+
+        if sample_prev_best and prev_best_node_index is not None:
+            assert len(sampled_node_index_list) == d + 1
+            assert sampled_node_index_list[-1] == prev_best_node_index
+        else:
+            assert len(sampled_node_index_list) == d
+
+        # The node assigned is one of the sampled nodes.
+        prev_best_node_index = sching_agent.node_id_list.index(node_id)
+        assert prev_best_node_index in sampled_node_index_list
+
+
+def test_power_of_d_is_reproducible_w_same_seed():
+    node_id_list_list = []
+    for _ in range(2):
+        sching_agent, sampled_node_index_list_list = power_of_d_agent(num_nodes=100, d=2, seed=1)
+        node_id_list = []
+        for _ in range(100):
+            sampled_node_index_list_list.append([])
+            node_id_list.append(sching_agent.node_id_to_assign())
+        node_id_list_list.append(node_id_list)
+
+    assert node_id_list_list[0] == node_id_list_list[1]
+
+
+def test_sim_w_power_of_d_is_reproducible_w_same_seed():
+    def assign_w_ts_power_of_d(server_list: list[server_module.Server]):
+        return ts_module.AssignWithThompsonSampling_slidingWinForEachNode_powerOfD(node_list=server_list, win_len=100, d=2)
+
+    sim_result_list = [
+        sim_module.sim(
+            env=simpy.Environment(),
+            num_servers=20,
+            inter_task_gen_time_rv=random_variable.Exponential(mu=0.8 * 20),
+            task_service_time_rv=random_variable.Exponential(mu=1),
+            num_tasks_to_recv=2000,
+            sching_agent_given_server_list=assign_w_ts_power_of_d,
+            seed=0,
+        )
+        for _ in range(2)
+    ]
+
+    assert sim_result_list[0].ET == sim_result_list[1].ET
+    assert sim_result_list[0].max_T == sim_result_list[1].max_T
@@ -1,9 +1,13 @@
+import collections
+import numpy
+import pytest
+import random
 import simpy
 
-from src.agent import ts as ts_module
+from src.agent import exp as exp_module, ts as ts_module
 from src.prob import random_variable
 from src.sim import sim as sim_module
-from src.sys import server as server_module
+from src.sys import node as node_module, server as server_module
 
 from src.utils.debug import *
 from src.utils.plot import *
@@ -39,6 +43,68 @@ def test_AssignWithThompsonSampling(
     log(INFO, "", sim_result=sim_result)
 
 
+@pytest.mark.parametrize("store_wait_times_only", [False, True])
+def test_AssignWithThompsonSampling_slidingWin_wait_time_stats(store_wait_times_only: bool):
+    random.seed(0)
+    win_len = 50
+    node_list = [node_module.Node(env=None, _id=f"s{i}") for i in range(3)]
+    sching_agent = ts_module.AssignWithThompsonSampling_slidingWin(node_list=node_list, win_len=win_len, store_wait_times_only=store_wait_times_only)
+
+    for node_id in sching_agent.node_id_list:
+        assert sching_agent.mean_stdev_wait_time(node_id) == (0, 1)
+
+    node_id_and_wait_time_list = []
+    for i in range(10 * win_len):
+        node_id = random.choice(["s0", "s0", "s1"])
+        wait_time = random.expovariate(1) * (1 + i % 5)
+        sching_agent.record_exp(node_id=node_id, exp=exp_module.Exp(service_time=1, wait_time=wait_time))
+        node_id_and_wait_time_list.append((node_id, wait_time))
+
+        node_id_to_wait_times_map = collections.defaultdict(list)
+        for (node_id_, wait_time_) in node_id_and_wait_time_list[-win_len:]:
+            node_id_to_wait_times_map[node_id_].append(wait_time_)
+
+        for node_id_, wait_times in node_id_to_wait_times_map.items():
+            mean, stdev = sching_agent.mean_stdev_wait_time(node_id_)
+            assert numpy.isclose(mean, numpy.mean(wait_times))
+            assert numpy.isclose(stdev, numpy.std(wait_times) or 1)
+
+        assert sching_agent.node_id_to_assign() in sching_agent.node_id_list
+
+    assert sching_agent.mean_stdev_wait_time("s2") == (0, 1)
+
+
+@pytest.mark.parametrize(
+    "sching_agent_class",
+    [
+        ts_module.AssignWithThompsonSampling_slidingWin,
+        ts_module.AssignWithThompsonSampling_slidingWinForEachNode,
+    ],
+)
+def test_store_wait_times_only_does_not_change_decisions(sching_agent_class):
+    num_servers = 4
+    sim_kwargs = dict(
+        env=None,
+        num_servers=num_servers,
+        inter_task_gen_time_rv=random_variable.Exponential(mu=0.8 * num_servers),
+        task_service_time_rv=random_variable.Exponential(mu=1),
+        num_tasks_to_recv=2000,
+        seed=0,
+        backend="heap",
+    )
+    sim_result = sim_module.sim(
+        sching_agent_given_server_list=lambda server_list: sching_agent_class(node_list=server_list, win_len=20),
+        **sim_kwargs,
+    )
+    sim_result_w_wait_times_only = sim_module.sim(
+        sching_agent_given_server_list=lambda server_list: sching_agent_class(node_list=server_list, win_len=20, store_wait_times_only=True),
+        **sim_kwargs,
+    )
+
+    assert numpy.isclose(sim_result_w_wait_times_only.ET, sim_result.ET)
+    assert numpy.isclose(sim_result_w_wait_times_only.std_T, sim_result.std_T)
+
+
 def test_AssignWithThompsonSampling_slidingWin_vs_slidingWinForEachNode(
     env: simpy.Environment,
     num_servers: int,